@@ -19,8 +19,29 @@ def create_app(config_object=DevelopmentConfig):
         os.makedirs(app.config['UPLOAD_FOLDER'])
         app.logger.info(f"Created UPLOAD_FOLDER at {app.config['UPLOAD_FOLDER']}")
 
-    from .core import database
+    from .core import metrics, profiling
+    metrics.init_app(app)
+    profiling.init_app(app)
+
+    from .core import database, migrations
     database.init_app(app)
+    migrations.init_app(app)
+
+    from .core import hashing, metadata_cache
+    hashing.init_app(app)
+    metadata_cache.init_app(app)
+
+    from .core import storage
+    storage.init_app(app)
+
+    from .core import blobstore, layout
+    blobstore.init_app(app)
+    layout.init_app(app)
+
+    from .core import quota, reaper, search
+    quota.init_app(app)
+    reaper.init_app(app)
+    search.init_app(app)
 
     from .auth.routes import auth_bp
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
@@ -28,6 +49,11 @@ def create_app(config_object=DevelopmentConfig):
     from .files.routes import files_bp
     app.register_blueprint(files_bp, url_prefix='/api')
 
+    from .multipart.routes import multipart_bp
+    app.register_blueprint(multipart_bp, url_prefix='/api/multipart')
+    from .multipart import cleanup as multipart_cleanup
+    multipart_cleanup.init_app(app)
+
     # 👇 새로운 main_bp 블루프린트를 등록합니다. (웹 페이지용)
     from .main.routes import main_bp # from .main import main_bp 로 해도 됩니다.
     app.register_blueprint(main_bp) # 웹 페이지는 보통 prefix 없이 최상위 URL 사용
@@ -1,12 +1,14 @@
 # app/auth/routes.py
 from flask import Blueprint, request, jsonify, current_app, g
-import bcrypt
 import jwt
 import datetime
 import sqlite3
-import os # 파일 삭제를 위해 os 모듈 임포트
+from app.core.blobstore import BLOB_SUBDIR, release_user_blobs
 from app.core.database import get_db
-from app.core.decorators import token_required # 기존 토큰 데코레이터 사용
+from app.core.hashing import hash_password, check_password
+from app.core.decorators import token_required, revoke_token, revoke_user_tokens # 기존 토큰 데코레이터 사용
+from app.core.metadata_cache import invalidate_files
+from app.multipart.cleanup import MULTIPART_SUBDIR
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -32,8 +34,7 @@ def register():
         if cursor.fetchone():
             return jsonify({"message": "Username already exists"}), 409
         
-        hashed_password_bytes = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
-        hashed_password_str = hashed_password_bytes.decode('utf-8') 
+        hashed_password_str = hash_password(password)
 
         cursor.execute("INSERT INTO users (username, password_hash) VALUES (?, ?)",
                        (username, hashed_password_str))
@@ -68,9 +69,7 @@ def login():
     if not user:
         return jsonify({"message": "Invalid credentials"}), 401
 
-    stored_password_hash_bytes = user['password_hash'].encode('utf-8')
-
-    if bcrypt.checkpw(password.encode('utf-8'), stored_password_hash_bytes):
+    if check_password(password, user['password_hash']):
         token_payload = {
             'user_id': user['id'],
             'username': user['username'],
@@ -87,6 +86,14 @@ def login():
     else:
         return jsonify({"message": "Invalid credentials"}), 401
 
+@auth_bp.route('/logout', methods=['POST'])
+@token_required
+def logout():
+    # 현재 토큰을 만료 시각까지 거부하도록 DB(revoked_tokens)에 기록합니다.
+    revoke_token(g.current_token_digest, g.current_token_exp)
+    current_app.logger.info(f"User {g.current_username} logged out.")
+    return jsonify({"message": "Logged out"}), 200
+
 # 👇 회원 탈퇴 API 엔드포인트
 @auth_bp.route('/user', methods=['DELETE'])
 @token_required # JWT 토큰으로 인증된 사용자만 접근 가능
@@ -98,46 +105,37 @@ def delete_user_account():
     cursor = db.cursor()
 
     try:
-        # 1. 사용자가 업로드한 파일 정보 조회
-        cursor.execute("SELECT id, filepath FROM files WHERE user_id = ?", (user_id_to_delete,))
-        user_files = cursor.fetchall()
-
-        upload_folder_abs = current_app.config.get('UPLOAD_FOLDER')
-        if not upload_folder_abs or not os.path.isabs(upload_folder_abs):
-            current_app.logger.error("CRITICAL: UPLOAD_FOLDER is not configured correctly or is not an absolute path for user deletion.")
-            # 이 경우 DB는 롤백하고 오류 반환
-            db.rollback()
-            return jsonify({"message": "Server configuration error preventing file deletion."}), 500
-
-        # 2. 실제 파일 시스템에서 파일 삭제
-        for file_record in user_files:
-            db_stored_filepath = file_record['filepath'] # 예: 'unique_filename.ext'
-            # UPLOAD_FOLDER 기준 상대 경로이므로, 절대 경로로 변환
-            server_filepath_to_delete_abs = os.path.join(upload_folder_abs, os.path.basename(db_stored_filepath))
-            if os.path.exists(server_filepath_to_delete_abs):
-                try:
-                    os.remove(server_filepath_to_delete_abs)
-                    current_app.logger.info(f"Deleted physical file: {server_filepath_to_delete_abs} for user {username_to_delete}")
-                except OSError as e:
-                    current_app.logger.error(f"Error deleting physical file {server_filepath_to_delete_abs}: {e}")
-                    # 파일 삭제 실패 시 일단 계속 진행하고 DB는 롤백할지, 아니면 이 파일만 남기고 DB는 삭제할지 결정 필요.
-                    # 여기서는 DB 롤백을 위해 예외를 다시 발생시키거나, 플래그를 설정할 수 있습니다.
-                    # 일단은 로그만 남기고 DB 삭제는 시도합니다. (더 견고하게 하려면 여기서 롤백)
-            else:
-                current_app.logger.warning(f"Physical file not found for deletion: {server_filepath_to_delete_abs} (DB record ID: {file_record['id']})")
-
-        # 3. `files` 테이블에서 해당 사용자의 파일 레코드 삭제
-        # ON DELETE CASCADE가 users 테이블의 user_id 외래키에 설정되어 있다면 이 부분은 자동으로 처리될 수 있습니다.
-        # 하지만 명시적으로 삭제하는 것이 더 안전할 수 있습니다. (schema.sql 확인 필요)
-        # 현재 schema.sql에는 ON DELETE CASCADE가 없으므로 명시적 삭제 필요 [cite: uploaded:v2/schema.sql]
-        cursor.execute("DELETE FROM files WHERE user_id = ?", (user_id_to_delete,))
-        current_app.logger.info(f"Deleted file records from DB for user {username_to_delete} (ID: {user_id_to_delete})")
+        # 파일 시스템 작업은 요청 안에서 하지 않습니다. 지울 경로는 삭제 큐에 같은 트랜잭션으로 기록하고
+        # 'flask reap-deletions'(또는 백그라운드 reaper)가 나중에 지우므로 파일 수와 관계없이 바로 응답합니다.
+
+        # 1. blob 저장소에 있는 파일은 참조 수만 한 번에 줄입니다 (실제 삭제는 'flask gc-blobs').
+        release_user_blobs(db, user_id_to_delete)
+
+        # 2. blob 도입 이전의 개별 파일과 진행 중이던 멀티파트 업로드의 파트 디렉토리를 삭제 큐에 넣습니다.
+        cursor.execute("""
+            INSERT INTO deletion_queue (path, reason)
+            SELECT filepath, 'account' FROM files WHERE user_id = ? AND filepath NOT LIKE ?
+        """, (user_id_to_delete, f"{BLOB_SUBDIR}/%"))
+        queued_files = cursor.rowcount
+        cursor.execute("""
+            INSERT INTO deletion_queue (path, reason)
+            SELECT ? || upload_id, 'account' FROM multipart_uploads WHERE user_id = ?
+        """, (f"{MULTIPART_SUBDIR}/", user_id_to_delete))
+        queued_files += cursor.rowcount
+
+        # 3. 메타데이터 캐시에서 지울 파일 키를 모아 둡니다.
+        cursor.execute("SELECT id, download_link_id FROM files WHERE user_id = ?", (user_id_to_delete,))
+        deleted_files = cursor.fetchall()
 
         # 4. `users` 테이블에서 사용자 레코드 삭제
+        # files / multipart_uploads의 외래 키에 ON DELETE CASCADE가 있으므로 사용자의 파일 레코드도 함께 삭제됩니다.
         cursor.execute("DELETE FROM users WHERE id = ?", (user_id_to_delete,))
-        current_app.logger.info(f"Deleted user record from DB for user {username_to_delete} (ID: {user_id_to_delete})")
+        current_app.logger.info(f"Deleted user record from DB for user {username_to_delete} (ID: {user_id_to_delete}); {queued_files} path(s) queued for deletion.")
 
         db.commit()
+        # 캐시에 남은 이 사용자의 토큰과 파일 메타데이터가 더 이상 쓰이지 않도록 지웁니다.
+        revoke_user_tokens(user_id_to_delete)
+        invalidate_files(deleted_files)
         current_app.logger.info(f"User account {username_to_delete} (ID: {user_id_to_delete}) and associated files deleted successfully.")
         return jsonify({"message": "Account and all associated files deleted successfully."}), 200
 
@@ -0,0 +1,153 @@
+# app/core/archive.py
+import datetime
+import io
+import tarfile
+import time
+import zipfile
+from dataclasses import dataclass
+from flask import Response, current_app
+from app.core.compression import open_original
+from app.core.delivery import STREAM_CHUNK_SIZE, set_attachment
+from app.core.storage import ObjectNotFound, get_storage
+
+# 여러 파일을 zip / tar 하나로 묶어 만들면서 바로 스트리밍합니다 (POST/GET /api/files/archive).
+# 아카이브는 디스크에도 메모리에도 만들지 않습니다. 파일을 STREAM_CHUNK_SIZE씩 읽어 쓰고,
+# 그 조각이 만든 출력을 곧바로 내보내므로 연결 하나가 잡는 메모리는 파일 수·크기와 관계없이 일정합니다.
+# - zip: 항목마다 data descriptor(크기·CRC를 내용 뒤에 기록)를 쓰고, 4 GB를 넘는 파일은 ZIP64로 기록합니다.
+#        ARCHIVE_STORED_EXTENSIONS(이미 압축된 형식)는 stored, 나머지는 deflate로 담습니다.
+# - tar: PAX 형식 (UTF-8 이름, 8 GB 이상 크기).
+# 압축해 저장한 객체(files.codec)는 원본으로 풀어서 담습니다.
+# 전체 크기를 미리 알 수 없으므로 Content-Length 없이(chunked) 보냅니다.
+FORMATS = {
+    'zip': 'application/zip',
+    'tar': 'application/x-tar',
+}
+_TAR_BLOCK = tarfile.BLOCKSIZE
+
+
+@dataclass
+class ArchiveEntry:
+    name: str # 아카이브 안의 이름
+    key: str # 저장소 키 (files.filepath)
+    size: int # 원본 크기 (files.filesize)
+    codec: str | None
+    mtime: datetime.datetime | None
+
+
+class _ChunkSink(io.RawIOBase):
+    """쓰인 바이트를 모아 두었다가 take()로 꺼내 주는 쓰기 전용 스트림. seek할 수 없으므로 zipfile이 data descriptor를 씁니다."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def take(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def unique_names(names) -> list[str]:
+    """아카이브 안의 이름을 정리합니다. 경로 구분자는 '_'로 바꾸고, 겹치는 이름에는 ' (2)', ' (3)' ...을 붙입니다."""
+    used = set()
+    result = []
+    for name in names:
+        name = name.replace('/', '_').replace('\\', '_').lstrip('.') or 'file'
+        candidate = name
+        stem, dot, ext = name.rpartition('.')
+        if not dot:
+            stem, ext = name, ''
+        counter = 2
+        while candidate.lower() in used:
+            candidate = f"{stem} ({counter}){dot}{ext}"
+            counter += 1
+        used.add(candidate.lower())
+        result.append(candidate)
+    return result
+
+
+def _read_chunks(storage, entry: ArchiveEntry):
+    """항목의 원본 바이트를 조각 단위로 읽습니다. 기록된 크기와 다르면 아카이브가 깨지므로 IOError."""
+    with open_original(storage, entry.key, entry.codec, entry.size) as f:
+        remaining = entry.size
+        while remaining > 0:
+            chunk = f.read(min(STREAM_CHUNK_SIZE, remaining))
+            if not chunk:
+                raise IOError(f"Object '{entry.key}' is shorter than its recorded size {entry.size}.")
+            remaining -= len(chunk)
+            yield chunk
+
+
+def _zip_date_time(mtime: datetime.datetime | None):
+    # zip의 날짜는 1980년부터 표현할 수 있습니다.
+    if mtime is None or mtime.year < 1980:
+        return time.localtime()[:6]
+    return mtime.astimezone().timetuple()[:6]
+
+
+def _stream_zip(storage, entries, stored_extensions, logger):
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, 'w', allowZip64=True) as zf:
+        for entry in entries:
+            ext = entry.name.rsplit('.', 1)[1].lower() if '.' in entry.name else ''
+            info = zipfile.ZipInfo(entry.name, date_time=_zip_date_time(entry.mtime))
+            info.file_size = entry.size # 4 GB가 넘으면 zipfile이 ZIP64 헤더를 씁니다.
+            info.external_attr = 0o644 << 16
+            info.compress_type = zipfile.ZIP_STORED if ext in stored_extensions else zipfile.ZIP_DEFLATED
+            try:
+                chunks = _read_chunks(storage, entry)
+                first = next(chunks, b'')
+            except ObjectNotFound:
+                logger.warning(f"Object '{entry.key}' not found in storage; '{entry.name}' left out of the archive.")
+                continue
+            with zf.open(info, 'w') as member:
+                member.write(first)
+                yield sink.take()
+                for chunk in chunks:
+                    member.write(chunk)
+                    yield sink.take()
+            yield sink.take()
+    yield sink.take() # central directory
+
+
+def _stream_tar(storage, entries, logger):
+    for entry in entries:
+        info = tarfile.TarInfo(entry.name)
+        info.size = entry.size
+        info.mode = 0o644
+        info.mtime = entry.mtime.timestamp() if entry.mtime else time.time()
+        try:
+            chunks = _read_chunks(storage, entry)
+            first = next(chunks, b'')
+        except ObjectNotFound:
+            logger.warning(f"Object '{entry.key}' not found in storage; '{entry.name}' left out of the archive.")
+            continue
+        yield info.tobuf(format=tarfile.PAX_FORMAT, encoding='utf-8')
+        yield first
+        yield from chunks
+        padding = -entry.size % _TAR_BLOCK
+        if padding:
+            yield b'\0' * padding
+    yield b'\0' * (_TAR_BLOCK * 2) # 아카이브 끝 표시
+
+
+def archive_response(entries: list[ArchiveEntry], fmt: str, download_name: str) -> Response:
+    """entries를 fmt('zip' | 'tar') 아카이브로 만들며 스트리밍하는 응답을 돌려줍니다."""
+    config = current_app.config
+    storage = get_storage()
+    # 본문은 요청 컨텍스트가 끝난 뒤에 만들어지므로 필요한 값은 여기서 꺼내 둡니다.
+    logger = current_app.logger
+    if fmt == 'zip':
+        body = _stream_zip(storage, entries, config['ARCHIVE_STORED_EXTENSIONS'], logger)
+    else:
+        body = _stream_tar(storage, entries, logger)
+    response = Response(body, mimetype=FORMATS[fmt], direct_passthrough=True)
+    set_attachment(response, download_name)
+    response.headers['Cache-Control'] = 'private, no-store'
+    return response
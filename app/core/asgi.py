@@ -0,0 +1,278 @@
+# app/core/asgi.py
+import asyncio
+import io
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.wsgi import FileWrapper, _RangeWrapper
+from app.core.streaming import SPOOLED_UPLOAD_ENVIRON_KEY, SpooledUpload
+
+# Flask(WSGI) 앱을 ASGI 서버(uvicorn 등)에서 실행하기 위한 어댑터.
+# 라우트와 DB 접근은 그대로 동기 코드이며 ASGI_WORKER_THREADS 크기의 스레드 풀에서 실행됩니다.
+# 스레드를 오래 붙잡는 두 구간만 이벤트 루프로 옮깁니다.
+# - 다운로드: send_file이 돌려준 파일 본문(wsgi.file_wrapper, 단일 Range 포함)은 스레드를 반납한 뒤
+#   이벤트 루프가 ASGI_IO_THREADS 풀에서 조각씩 읽어(논블로킹) 클라이언트 속도에 맞춰 보냅니다.
+#   느린 클라이언트 수천 개가 연결되어 있어도 작업 스레드는 요청 처리 시간 동안만 쓰입니다.
+# - 업로드: ASGI_BUFFER_UPLOADS가 켜져 있으면 요청 본문을 먼저 이벤트 루프에서 임시 파일로 받은 뒤
+#   라우트를 실행합니다 (nginx의 request buffering과 같은 방식). 라우트는 디스크 속도로 본문을 읽습니다.
+#   큰 본문은 UPLOAD_FOLDER 안에 받으면서 해시를 계산해 두므로, 원시 본문 업로드는 이 파일을 rename으로
+#   넘겨받아 디스크에 한 번만 씁니다 (SpooledUpload, stream_to_temp()).
+
+
+class AsyncFileWrapper(FileWrapper):
+    """wsgi.file_wrapper로 제공됩니다. 동기 반복도 그대로 동작하며, 어댑터는 이 타입을 보고 비동기 전송으로 넘깁니다."""
+
+
+class _ReceiveStream(io.RawIOBase):
+    """요청 본문을 ASGI receive()에서 조각씩 받아 오는 동기 스트림 (작업 스레드에서 읽음)."""
+
+    def __init__(self, receive, loop):
+        self._receive = receive
+        self._loop = loop
+        self._buffer = b''
+        self.complete = False
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while not self._buffer and not self.complete:
+            message = asyncio.run_coroutine_threadsafe(self._receive(), self._loop).result()
+            if message['type'] == 'http.disconnect':
+                self.complete = True
+                break
+            self._buffer = message.get('body', b'')
+            self.complete = not message.get('more_body', False)
+        n = min(len(b), len(self._buffer))
+        b[:n] = self._buffer[:n]
+        self._buffer = self._buffer[n:]
+        return n
+
+
+class ASGIAdapter:
+    def __init__(self, app):
+        self.app = app
+        config = app.config
+        self.executor = ThreadPoolExecutor(max_workers=config['ASGI_WORKER_THREADS'], thread_name_prefix='asgi-worker')
+        self.io_executor = ThreadPoolExecutor(max_workers=config['ASGI_IO_THREADS'], thread_name_prefix='asgi-io')
+        self.buffer_uploads = config['ASGI_BUFFER_UPLOADS']
+        self.spool_bytes = config['ASGI_UPLOAD_SPOOL_BYTES']
+        self.spool_dir = config['UPLOAD_FOLDER']
+        self.chunk_size = config['ASGI_READ_CHUNK_SIZE']
+        self.max_content_length = config.get('MAX_CONTENT_LENGTH')
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'http':
+            await self._handle_http(scope, receive, send)
+        elif scope['type'] == 'lifespan':
+            await self._handle_lifespan(receive, send)
+        else:
+            raise RuntimeError(f"Unsupported ASGI scope type '{scope['type']}'.")
+
+    async def _handle_lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                self.app.logger.info('ASGI worker started.')
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.executor.shutdown(wait=True)
+                self.io_executor.shutdown(wait=True)
+                from app.core.database import get_pool
+                get_pool(self.app).close_all()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    def _build_environ(self, scope, body_stream, content_length, spooled=None):
+        server = scope.get('server') or ('localhost', 80)
+        client = scope.get('client') or ('', 0)
+        environ = {
+            'REQUEST_METHOD': scope['method'],
+            'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+            'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+            'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+            'SERVER_NAME': server[0],
+            'SERVER_PORT': str(server[1]),
+            'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+            'REMOTE_ADDR': client[0],
+            'REMOTE_PORT': str(client[1]),
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': scope.get('scheme', 'http'),
+            'wsgi.input': body_stream,
+            'wsgi.input_terminated': True, # 길이 없는(chunked) 본문도 EOF까지 읽도록
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': True,
+            'wsgi.run_once': False,
+            'wsgi.file_wrapper': AsyncFileWrapper,
+        }
+        for raw_name, raw_value in scope.get('headers', []):
+            name = raw_name.decode('latin-1').upper().replace('-', '_')
+            value = raw_value.decode('latin-1')
+            if name == 'CONTENT_TYPE':
+                environ['CONTENT_TYPE'] = value
+                continue
+            if name == 'CONTENT_LENGTH':
+                environ['CONTENT_LENGTH'] = value
+                continue
+            key = f"HTTP_{name}"
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+        if content_length is not None:
+            environ['CONTENT_LENGTH'] = str(content_length)
+            environ.pop('HTTP_TRANSFER_ENCODING', None)
+        if spooled is not None:
+            environ[SPOOLED_UPLOAD_ENVIRON_KEY] = spooled
+        return environ
+
+    async def _buffer_body(self, receive):
+        """
+        요청 본문 전체를 UPLOAD_FOLDER 안의 임시 파일(작으면 메모리)로 받으면서 SHA-256을 계산합니다.
+        (SpooledUpload, 크기, 상한 초과 여부)를 반환합니다. 상한을 넘거나 연결이 끊기면 본문은 None입니다.
+        """
+        loop = asyncio.get_running_loop()
+        spool = SpooledUpload(self.spool_dir, self.spool_bytes)
+        try:
+            while True:
+                message = await receive()
+                if message['type'] == 'http.disconnect':
+                    spool.close()
+                    return None, spool.size, False
+                chunk = message.get('body', b'')
+                if chunk:
+                    if self.max_content_length and spool.size + len(chunk) > self.max_content_length:
+                        spool.close()
+                        return None, spool.size + len(chunk), True
+                    if spool.spills(len(chunk)):
+                        # 디스크 쓰기와 해시 계산은 이벤트 루프를 막지 않도록 I/O 스레드에서 합니다.
+                        await loop.run_in_executor(self.io_executor, spool.write_chunk, chunk)
+                    else:
+                        spool.write_chunk(chunk)
+                if not message.get('more_body', False):
+                    break
+        except BaseException:
+            spool.close()
+            raise
+        spool.finish()
+        return spool, spool.size, False
+
+    async def _handle_http(self, scope, receive, send):
+        loop = asyncio.get_running_loop()
+        headers = dict(scope.get('headers', []))
+        has_body = b'content-length' in headers or b'transfer-encoding' in headers
+
+        declared = headers.get(b'content-length')
+        if declared and declared.isdigit() and self.max_content_length and int(declared) > self.max_content_length:
+            await self._send_json(send, 413, {"message": "File is too large."})
+            return
+
+        body_complete = True
+        spooled = None
+        if self.buffer_uploads or not has_body:
+            body_stream, size, too_large = await self._buffer_body(receive)
+            spooled = body_stream
+            if body_stream is None:
+                if too_large:
+                    await self._send_json(send, 413, {"message": "File is too large."})
+                return # 클라이언트가 본문을 보내는 중에 연결을 끊음
+            content_length = size if has_body else None
+        else:
+            body_stream = io.BufferedReader(_ReceiveStream(receive, loop))
+            content_length = None
+            body_complete = False
+
+        environ = self._build_environ(scope, body_stream, content_length, spooled)
+        try:
+            status, response_headers, body = await loop.run_in_executor(self.executor, self._call_app, environ)
+        finally:
+            if self.buffer_uploads or not has_body:
+                body_stream.close()
+
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in response_headers],
+        })
+
+        # 본문을 끝까지 받은 경우에만 연결 끊김을 감시합니다 (그 전에는 receive()가 본문 조각을 돌려줌).
+        disconnected = asyncio.Event()
+        watcher = loop.create_task(self._watch_disconnect(receive, disconnected)) if body_complete else None
+        try:
+            source = self._file_source(body)
+            if source is not None:
+                await self._send_file(send, disconnected, *source)
+            else:
+                await self._send_iterable(send, disconnected, body)
+            if not disconnected.is_set():
+                await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+        finally:
+            if watcher is not None:
+                watcher.cancel()
+            if hasattr(body, 'close'):
+                await loop.run_in_executor(self.io_executor, body.close)
+
+    def _call_app(self, environ):
+        """작업 스레드에서 Flask 앱을 호출합니다. 본문 반복은 하지 않고 (상태, 헤더, 본문)만 돌려줍니다."""
+        captured = {}
+
+        def write(data):
+            raise NotImplementedError("The WSGI write() callable is not supported.")
+
+        def start_response(status, headers, exc_info=None):
+            captured['status'] = int(status.split(' ', 1)[0])
+            captured['headers'] = headers
+            return write
+
+        body = self.app(environ, start_response)
+        return captured['status'], captured['headers'], body
+
+    @staticmethod
+    def _file_source(body):
+        """본문이 파일(send_file)이면 (파일 객체, 시작 위치, 길이 또는 None)을, 아니면 None을 반환합니다."""
+        if isinstance(body, AsyncFileWrapper):
+            return body.file, None, None
+        # 단일 구간 Range 응답은 Werkzeug가 파일 래퍼를 _RangeWrapper로 한 번 더 감쌉니다.
+        if isinstance(body, _RangeWrapper) and isinstance(body.iterable, AsyncFileWrapper) and body.seekable:
+            return body.iterable.file, body.start_byte, body.byte_range
+        return None
+
+    async def _send_file(self, send, disconnected, file, start, length):
+        loop = asyncio.get_running_loop()
+        if start is not None:
+            await loop.run_in_executor(self.io_executor, file.seek, start)
+        remaining = length
+        while not disconnected.is_set():
+            size = self.chunk_size if remaining is None else min(self.chunk_size, remaining)
+            if size <= 0:
+                break
+            chunk = await loop.run_in_executor(self.io_executor, file.read, size)
+            if not chunk:
+                break
+            if remaining is not None:
+                remaining -= len(chunk)
+            await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+
+    async def _send_iterable(self, send, disconnected, body):
+        loop = asyncio.get_running_loop()
+        iterator = iter(body)
+        while not disconnected.is_set():
+            # 제너레이터 본문(multipart/byteranges 등)은 파일을 읽을 수 있으므로 작업 스레드에서 꺼냅니다.
+            chunk = await loop.run_in_executor(self.executor, next, iterator, None)
+            if chunk is None:
+                break
+            if chunk:
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+
+    @staticmethod
+    async def _watch_disconnect(receive, disconnected):
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                disconnected.set()
+                return
+
+    @staticmethod
+    async def _send_json(send, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        await send({'type': 'http.response.start', 'status': status, 'headers': [
+            (b'content-type', b'application/json'), (b'content-length', str(len(body)).encode('ascii'))]})
+        await send({'type': 'http.response.body', 'body': body})
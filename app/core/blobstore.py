@@ -0,0 +1,219 @@
+# app/core/blobstore.py
+import os
+import time
+import uuid
+import click
+from dataclasses import dataclass
+from flask import current_app
+from app.core.compression import compress_file
+from app.core.database import get_db
+from app.core.layout import sharded_relpath
+from app.core.storage import get_storage
+from app.core.streaming import StreamedFile, discard_temp
+from app.core.thumbnails import delete_thumbnails
+
+# 내용 주소 기반(content-addressed) 저장소.
+# 같은 내용의 파일은 SHA-256으로 식별되는 blob 하나를 공유하고, blobs.refcount로 참조 수를 셉니다.
+# files.filepath는 blob 경로(예: 'blobs/ab/cd/abcd...')를 가리킵니다.
+BLOB_SUBDIR = 'blobs'
+# gc_blobs()의 표시가 이보다 오래되면 중간에 멈춘 실행으로 보고 다시 가져갑니다 (초).
+GC_CLAIM_TIMEOUT = 3600
+
+
+def blob_relpath(sha256: str) -> str:
+    """
+    새 blob 객체의 상대 경로를 만듭니다 (예: 'blobs/ab/cd/abcd....<토큰>').
+    SHA-256 접두사로 분산(fan-out)하고, 이름 끝에 무작위 토큰을 붙여 객체마다 키가 겹치지 않게 합니다.
+    그래서 잠금 없이 놓은 객체를 gc_blobs()가 같은 내용의 이전 객체로 여겨 지우는 일이 없습니다.
+    """
+    return sharded_relpath(f"{sha256}.{uuid.uuid4().hex[:16]}", BLOB_SUBDIR)
+
+
+@dataclass
+class StoredBlob:
+    path: str # blob 상대 경로
+    deduplicated: bool # 이미 저장된 blob을 재사용했는지
+    codec: str | None # 저장 시 압축 codec (None이면 원본)
+    stored_size: int # 저장소에 놓인 객체의 크기
+    unused_path: str | None = None # 놓았지만 같은 내용을 먼저 등록한 요청이 있어 쓰지 않게 된 객체
+
+
+@dataclass
+class StagedBlob:
+    """stage_blob()의 결과. 저장소 작업은 끝났고 blobs 행 등록(register_blob)만 남은 상태."""
+    sha256: str
+    size: int # 원본 크기
+    reuse_path: str | None # 재사용할 기존 blob 경로 (없으면 put_path에 새로 놓음)
+    put_path: str | None # 새로 놓은 객체 경로
+    codec: str | None
+    stored_size: int
+    replaces_path: str | None = None # 행은 있지만 객체가 없던 경로: 등록할 때 새 객체로 바꿉니다
+
+
+class BlobChanged(Exception):
+    """stage_blob() 이후 재사용하려던 blob이 지워졌거나 옮겨짐. 다시 stage_blob()부터 시작합니다."""
+
+
+def is_blob_path(filepath: str) -> bool:
+    return filepath.split('/', 1)[0] == BLOB_SUBDIR
+
+
+def stage_blob(db, streamed: StreamedFile, codec: str | None = None) -> StagedBlob:
+    """
+    쓰기 잠금을 잡기 전에 저장소 작업을 끝냅니다. 같은 내용의 blob이 있고 객체도 있으면 재사용하도록 표시만 하고,
+    없으면 (codec이 있으면 압축해서) 새 키에 객체를 놓습니다. 원격 드라이버(s3 등)의 업로드가
+    DB 쓰기 잠금을 쥔 채 일어나지 않게 하기 위한 단계입니다.
+    재사용이면 streamed의 임시 파일은 그대로 두고, 새로 놓았으면 저장소로 옮겨졌습니다.
+    """
+    row = db.execute("SELECT path, gc_claimed_at FROM blobs WHERE hash = ?", (streamed.sha256,)).fetchone()
+    storage = get_storage()
+    if row is not None and row['gc_claimed_at'] is None and storage.exists(row['path']):
+        return StagedBlob(streamed.sha256, streamed.size, row['path'], None, None, streamed.size)
+
+    encoded = None
+    if codec:
+        encoded = compress_file(streamed.temp_path, streamed.size, codec, os.path.dirname(streamed.temp_path))
+    relpath = blob_relpath(streamed.sha256)
+    try:
+        if encoded:
+            storage.put_file(relpath, encoded.temp_path)
+            discard_temp(streamed.temp_path)
+        else:
+            storage.put_file(relpath, streamed.temp_path)
+    finally:
+        if encoded:
+            discard_temp(encoded.temp_path)
+    return StagedBlob(streamed.sha256, streamed.size, None, relpath,
+                      encoded.codec if encoded else None, encoded.size if encoded else streamed.size,
+                      replaces_path=row['path'] if row is not None else None)
+
+
+def register_blob(db, staged: StagedBlob) -> StoredBlob:
+    """
+    stage_blob()의 결과를 blobs에 등록합니다. 호출한 쪽이 쓰기 잠금(BEGIN IMMEDIATE)을 잡은 트랜잭션 안에서
+    실행하며 commit도 호출한 쪽이 합니다. 잠금 안에서는 저장소를 건드리지 않고 행만 고칩니다.
+    재사용하려던 blob이 그 사이 바뀌었거나 gc_blobs()가 지우는 중이면 BlobChanged. 먼저 등록된 같은 내용의 blob이 있으면 그것을 쓰고,
+    새로 놓은 객체는 StoredBlob.unused_path로 돌려주므로 commit 후 finish_blob()으로 지웁니다.
+    """
+    row = db.execute("SELECT path, codec, stored_size, gc_claimed_at FROM blobs WHERE hash = ?",
+                     (staged.sha256,)).fetchone()
+    if staged.reuse_path is not None:
+        if row is None or row['path'] != staged.reuse_path or row['gc_claimed_at'] is not None:
+            raise BlobChanged(staged.sha256)
+        db.execute("UPDATE blobs SET refcount = refcount + 1 WHERE hash = ?", (staged.sha256,))
+        return StoredBlob(row['path'], True, row['codec'], row['stored_size'] or staged.size)
+
+    if row is None:
+        db.execute("""
+            INSERT INTO blobs (hash, path, size, refcount, codec, stored_size) VALUES (?, ?, ?, 1, ?, ?)
+        """, (staged.sha256, staged.put_path, staged.size, staged.codec, staged.stored_size))
+        return StoredBlob(staged.put_path, False, staged.codec, staged.stored_size)
+
+    if row['gc_claimed_at'] is not None or row['path'] == staged.replaces_path:
+        # gc_blobs()가 지우는 중이거나 객체가 없던 행: 행과 이를 가리키는 레코드를 새로 놓은 객체로 바꿉니다.
+        # 표시(gc_claimed_at)를 지우므로 gc_blobs()는 옛 객체만 지우고 이 행은 남겨 둡니다.
+        db.execute("""
+            UPDATE blobs SET path = ?, refcount = MAX(refcount, 0) + 1, codec = ?, stored_size = ?, gc_claimed_at = NULL
+            WHERE hash = ?
+        """, (staged.put_path, staged.codec, staged.stored_size, staged.sha256))
+        db.execute("UPDATE files SET filepath = ?, codec = ?, stored_size = ? WHERE filepath = ?",
+                   (staged.put_path, staged.codec, staged.stored_size, row['path']))
+        return StoredBlob(staged.put_path, False, staged.codec, staged.stored_size)
+
+    # 그 사이 다른 요청이 같은 내용을 먼저 등록함
+    db.execute("UPDATE blobs SET refcount = refcount + 1 WHERE hash = ?", (staged.sha256,))
+    return StoredBlob(row['path'], True, row['codec'], row['stored_size'] or staged.size, unused_path=staged.put_path)
+
+
+def discard_staged(staged: StagedBlob | None) -> None:
+    """등록하지 못한(rollback 된) stage_blob()의 객체를 지웁니다. 새 키이므로 다른 레코드가 가리킬 수 없습니다."""
+    if staged is not None and staged.put_path:
+        get_storage().delete(staged.put_path)
+
+
+def finish_blob(streamed: StreamedFile, blob: StoredBlob) -> None:
+    """commit 후 정리: 재사용한 경우 남은 임시 파일과, 먼저 등록된 blob에 밀려 쓰지 않게 된 객체를 지웁니다."""
+    discard_temp(streamed.temp_path)
+    if blob.unused_path:
+        get_storage().delete(blob.unused_path)
+
+
+def release_blob(db, sha256: str, count: int = 1) -> None:
+    """blob 참조 수를 줄입니다. 실제 파일 삭제는 gc_blobs()가 담당합니다 (commit은 호출한 쪽)."""
+    db.execute("UPDATE blobs SET refcount = refcount - ? WHERE hash = ?", (count, sha256))
+
+
+def release_user_blobs(db, user_id: int) -> None:
+    """사용자가 가진 모든 파일의 blob 참조를 한 번의 UPDATE로 줄입니다 (commit은 호출한 쪽)."""
+    db.execute("""
+        UPDATE blobs SET refcount = refcount - (
+            SELECT COUNT(*) FROM files
+            WHERE files.user_id = ? AND files.content_hash = blobs.hash AND files.filepath = blobs.path
+        )
+        WHERE hash IN (SELECT content_hash FROM files WHERE user_id = ? AND content_hash IS NOT NULL)
+    """, (user_id, user_id))
+
+
+def gc_blobs(batch_size: int = 500) -> int:
+    """
+    참조 수가 0 이하인 blob의 객체와 썸네일을 지우고 행을 지웁니다. 지운 blob 수를 반환합니다.
+    쓰기 잠금은 지울 행을 표시(gc_claimed_at)할 때와, 객체를 지운 뒤 행을 지울 때 두 번만 짧게 잡고,
+    저장소의 삭제(원격 드라이버면 네트워크 요청)는 그 사이 잠금 없이 합니다.
+    표시된 행은 register_blob()이 재사용하지 않고 새 객체로 바꾸며 표시를 지우므로, 그런 행은 남겨 둡니다.
+    객체를 지우지 못한 행은 표시를 남겨 두었다가 GC_CLAIM_TIMEOUT 뒤 다시 시도합니다.
+    """
+    db = get_db()
+    storage = get_storage()
+    removed = 0
+    while True:
+        claimed_at = time.time()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            claimed = db.execute("""
+                UPDATE blobs SET gc_claimed_at = ?
+                WHERE hash IN (
+                    SELECT hash FROM blobs
+                    WHERE refcount <= 0 AND (gc_claimed_at IS NULL OR gc_claimed_at < ?)
+                    LIMIT ?
+                )
+                RETURNING hash, path
+            """, (claimed_at, claimed_at - GC_CLAIM_TIMEOUT, batch_size)).fetchall()
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        if not claimed:
+            break
+
+        deleted = []
+        for row in claimed:
+            try:
+                if not storage.delete(row['path']):
+                    current_app.logger.warning(f"Blob file already missing: {row['path']}")
+                delete_thumbnails(storage, row['hash'])
+            except Exception as e: # 로컬 OSError / 원격 저장소 오류
+                current_app.logger.error(f"Could not delete blob '{row['path']}', will retry later: {e}")
+                continue
+            deleted.append((row['hash'], claimed_at))
+
+        try:
+            cursor = db.executemany("DELETE FROM blobs WHERE hash = ? AND gc_claimed_at = ?", deleted)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        removed += max(cursor.rowcount, 0)
+    return removed
+
+
+@click.command('gc-blobs')
+@click.option('--batch-size', type=int, default=500, help='Blobs claimed and deleted per batch.')
+def gc_blobs_command(batch_size):
+    """Delete unreferenced blobs from disk and the blobs table."""
+    removed = gc_blobs(batch_size)
+    click.echo(f'Removed {removed} unreferenced blob(s).')
+    current_app.logger.info(f'Blob GC removed {removed} blob(s).')
+
+
+def init_app(app):
+    app.cli.add_command(gc_blobs_command)
@@ -0,0 +1,86 @@
+# app/core/cache.py
+import threading
+import time
+from collections import OrderedDict
+
+# 없는 키를 나타내는 표식. 캐시에 None을 값으로 저장할 수 있도록 None과 구분합니다.
+MISSING = object()
+
+
+class TTLCache:
+    """
+    크기가 제한된 스레드 안전 LRU 캐시이며, 항목마다 만료 시간(TTL)을 가질 수 있습니다.
+    가득 차면 가장 오래 쓰이지 않은 항목부터 내보내고, 만료된 항목은 조회 시점에 지웁니다.
+    적중/실패/내보냄/만료 횟수를 stats()로 확인할 수 있습니다.
+    """
+
+    def __init__(self, maxsize: int, default_ttl: float | None = None):
+        self.maxsize = maxsize
+        self.default_ttl = default_ttl
+        self._data: OrderedDict = OrderedDict() # key -> (value, 만료 시각(monotonic) 또는 None)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def get(self, key, default=MISSING):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self._misses += 1
+                return default
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                self._expirations += 1
+                self._misses += 1
+                return default
+            self._data.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def set(self, key, value, ttl: float | None = None) -> None:
+        ttl = self.default_ttl if ttl is None else ttl
+        if ttl is not None and ttl <= 0:
+            return
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self._evictions += 1
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.pop(key, None)
+            return default if entry is None else entry[0]
+
+    def evict_where(self, predicate) -> int:
+        """predicate(key, value)가 참인 항목들을 지우고 지운 개수를 반환합니다."""
+        with self._lock:
+            doomed = [k for k, (v, _) in self._data.items() if predicate(k, v)]
+            for k in doomed:
+                del self._data[k]
+            return len(doomed)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": round(self._hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+            }
@@ -0,0 +1,170 @@
+# app/core/compression.py
+import gzip
+import io
+import os
+import tempfile
+import zlib
+from dataclasses import dataclass
+from flask import current_app, request
+from app.core.streaming import discard_temp
+
+try:
+    import zstandard
+except ImportError: # 선택 의존성: 없으면 gzip만 사용합니다.
+    zstandard = None
+
+# 저장 시 압축 (compression at rest).
+# COMPRESSION_EXTENSIONS에 있는 확장자의 새 blob은 저장하기 전에 압축하고, 크기가 COMPRESSION_MIN_SAVING 비율 이상
+# 줄어들 때만 압축본을 저장합니다 (이미 압축된 내용이면 도중에 포기하고 원본을 저장).
+# 사용한 codec은 blobs.codec / files.codec에, 압축된 크기는 stored_size에 기록하며 NULL이면 원본 그대로입니다.
+# 내용 해시(SHA-256), files.filesize, 사용량은 모두 원본 기준입니다.
+CODECS = ('gzip', 'zstd')
+READ_CHUNK_SIZE = 256 * 1024
+
+
+@dataclass
+class EncodedFile:
+    temp_path: str # 압축된 임시 파일
+    size: int # 압축된 크기 (bytes)
+    codec: str
+
+
+def choose_codec(filename: str) -> str | None:
+    """파일 이름의 확장자로 codec을 고릅니다. 압축하지 않을 형식이면 None."""
+    config = current_app.config
+    if not config['COMPRESSION_ENABLED'] or '.' not in filename:
+        return None
+    codec = config['COMPRESSION_EXTENSIONS'].get(filename.rsplit('.', 1)[1].lower())
+    if codec is None:
+        return None
+    if codec == 'auto':
+        codec = 'zstd' if zstandard is not None else 'gzip'
+    if codec == 'zstd' and zstandard is None:
+        codec = 'gzip'
+    return codec if codec in CODECS else None
+
+
+def _compressor(codec: str):
+    config = current_app.config
+    if codec == 'zstd':
+        return zstandard.ZstdCompressor(level=config['COMPRESSION_ZSTD_LEVEL']).compressobj()
+    return zlib.compressobj(config['COMPRESSION_GZIP_LEVEL'], zlib.DEFLATED, 31) # 31: gzip 헤더
+
+
+def compress_file(src_path: str, src_size: int, codec: str, staging_dir: str) -> EncodedFile | None:
+    """
+    src_path를 codec으로 압축한 임시 파일을 staging_dir에 만듭니다.
+    압축본이 원본의 (1 - COMPRESSION_MIN_SAVING)배를 넘어서는 순간 중단하고 None을 반환합니다.
+    """
+    limit = int(src_size * (1 - current_app.config['COMPRESSION_MIN_SAVING']))
+    compressor = _compressor(codec)
+    fd, temp_path = tempfile.mkstemp(dir=staging_dir, prefix='.upload-', suffix='.part')
+    written = 0
+    try:
+        with os.fdopen(fd, 'wb') as out, open(src_path, 'rb') as src:
+            while True:
+                chunk = src.read(READ_CHUNK_SIZE)
+                data = compressor.compress(chunk) if chunk else compressor.flush()
+                written += len(data)
+                if written > limit:
+                    discard_temp(temp_path)
+                    return None
+                out.write(data)
+                if not chunk:
+                    break
+    except BaseException:
+        discard_temp(temp_path)
+        raise
+    return EncodedFile(temp_path=temp_path, size=written, codec=codec)
+
+
+def client_accepts(codec: str) -> bool:
+    """요청의 Accept-Encoding이 codec을 받는지 확인합니다 (q=0은 거부)."""
+    return request.accept_encodings[codec] > 0
+
+
+def open_original(storage, key: str, codec: str | None, size: int | None):
+    """저장된 객체를 원본 바이트로 읽는 스트림을 엽니다. codec이 없으면 저장소 스트림을 그대로 반환합니다."""
+    if codec:
+        return DecodedReader(lambda: storage.open(key), codec, size)
+    return storage.open(key)
+
+
+class DecodedReader(io.RawIOBase):
+    """
+    압축된 객체를 풀어 원본 바이트를 읽는 seek 가능한 스트림. size는 원본 크기입니다.
+    앞으로의 seek은 풀어서 버리며 진행하고, 뒤로 가면 opener()로 처음부터 다시 엽니다.
+    Range 응답(구간은 오름차순)은 객체를 한 번만 읽습니다.
+    """
+
+    def __init__(self, opener, codec: str, size: int):
+        self._opener = opener
+        self._codec = codec
+        self._size = size
+        self._pos = 0
+        self._raw = None
+        self._decoded = None
+        self._decoded_pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            pos = offset
+        elif whence == io.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == io.SEEK_END:
+            pos = self._size + offset
+        else:
+            raise ValueError(f"Invalid whence {whence}.")
+        if pos < 0:
+            raise ValueError("Negative seek position.")
+        self._pos = pos
+        return pos
+
+    def _reopen(self):
+        self._close_streams()
+        self._raw = self._opener()
+        if self._codec == 'zstd':
+            if zstandard is None:
+                raise RuntimeError("Object is stored with zstd but the 'zstandard' package is not installed.")
+            self._decoded = zstandard.ZstdDecompressor().stream_reader(self._raw, read_size=READ_CHUNK_SIZE)
+        else:
+            self._decoded = gzip.GzipFile(fileobj=self._raw, mode='rb')
+        self._decoded_pos = 0
+
+    def readinto(self, b):
+        if self._pos >= self._size:
+            return 0
+        if self._decoded is None or self._decoded_pos > self._pos:
+            self._reopen()
+        while self._decoded_pos < self._pos:
+            skipped = self._decoded.read(min(READ_CHUNK_SIZE, self._pos - self._decoded_pos))
+            if not skipped:
+                return 0
+            self._decoded_pos += len(skipped)
+        data = self._decoded.read(len(b))
+        n = len(data)
+        b[:n] = data
+        self._pos += n
+        self._decoded_pos += n
+        return n
+
+    def _close_streams(self):
+        if self._decoded is not None:
+            self._decoded.close()
+            self._decoded = None
+        if self._raw is not None:
+            self._raw.close()
+            self._raw = None
+
+    def close(self):
+        self._close_streams()
+        super().close()
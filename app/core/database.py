@@ -1,32 +1,211 @@
 # app/core/database.py
 import sqlite3
-from flask import current_app, g
+from flask import current_app, g, jsonify
 import click
 import os # <--- 이 줄을 추가해주세요!
+import queue
+import threading
+
+class PoolTimeout(Exception):
+    """풀의 모든 연결이 사용 중이고 DB_POOL_TIMEOUT 안에 반환되지 않았을 때 발생합니다."""
+
+
+class ConnectionPool:
+    """
+    프로세스 단위 SQLite 연결 풀입니다.
+    요청마다 sqlite3.connect를 새로 여는 대신 연결을 재사용하고, 연결을 만들 때
+    WAL 모드와 PRAGMA 설정(synchronous, mmap_size, cache_size, busy_timeout)을 한 번만 적용합니다.
+    fork 이후(예: gunicorn preload) 자식 프로세스에서는 부모의 연결을 버리고 새로 만듭니다.
+    """
+
+    def __init__(self, db_path: str, max_size: int, timeout: float, pragmas: dict,
+                 connection_factory=sqlite3.Connection, slow_query_ms: int = 0):
+        self.db_path = db_path
+        self.connection_factory = connection_factory
+        self.slow_query_ms = slow_query_ms
+        self.max_size = max_size
+        self.timeout = timeout
+        self.pragmas = pragmas
+        self._idle = queue.LifoQueue() # 가장 최근에 쓴(캐시가 따뜻한) 연결부터 재사용
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._created = 0
+        self._in_use = 0
+        self._stats = {"acquired": 0, "reused": 0, "created": 0, "waited": 0, "timeouts": 0, "discarded": 0}
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.pragmas['busy_timeout'] / 1000.0,
+            check_same_thread=False, # 풀을 통해 여러 스레드가 번갈아 사용합니다.
+            factory=self.connection_factory,
+        )
+        conn.row_factory = sqlite3.Row
+        if self.slow_query_ms:
+            conn.slow_query_seconds = self.slow_query_ms / 1000.0 # TimedConnection 전용 속성
+        conn.execute("PRAGMA journal_mode=WAL") # 읽기가 쓰기(업로드 INSERT)를 기다리지 않도록
+        conn.execute(f"PRAGMA synchronous={self.pragmas['synchronous']}")
+        conn.execute(f"PRAGMA busy_timeout={int(self.pragmas['busy_timeout'])}")
+        conn.execute(f"PRAGMA cache_size={-int(self.pragmas['cache_size_kb'])}") # 음수: KiB 단위
+        conn.execute(f"PRAGMA mmap_size={int(self.pragmas['mmap_size'])}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA foreign_keys=ON") # ON DELETE CASCADE 동작에 필요 (연결마다 설정)
+        return conn
+
+    def _reset_after_fork(self):
+        # 부모 프로세스에서 만든 연결은 자식에서 쓰면 안 되므로 닫지 않고 버립니다.
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._in_use = 0
+        self._pid = os.getpid()
+
+    def acquire(self) -> sqlite3.Connection:
+        with self._lock:
+            if self._pid != os.getpid():
+                self._reset_after_fork()
+            self._stats["acquired"] += 1
+            try:
+                conn = self._idle.get_nowait()
+                self._stats["reused"] += 1
+                self._in_use += 1
+                return conn
+            except queue.Empty:
+                pass
+            if self._created < self.max_size:
+                self._created += 1
+                self._stats["created"] += 1
+                self._in_use += 1
+                create = True
+            else:
+                self._stats["waited"] += 1
+                create = False
+
+        if create:
+            try:
+                return self._connect()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                    self._in_use -= 1
+                raise
+
+        try:
+            conn = self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            with self._lock:
+                self._stats["timeouts"] += 1
+            raise PoolTimeout(f"No SQLite connection available within {self.timeout}s (pool size {self.max_size}).")
+        with self._lock:
+            self._in_use += 1
+        return conn
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        healthy = True
+        try:
+            if conn.in_transaction: # 커밋되지 않은 작업은 다음 요청으로 넘기지 않습니다.
+                conn.rollback()
+        except sqlite3.Error:
+            healthy = False
+        with self._lock:
+            self._in_use -= 1
+            if self._pid != os.getpid():
+                return
+            if not healthy:
+                self._created -= 1
+                self._stats["discarded"] += 1
+        if healthy:
+            self._idle.put(conn)
+        else:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+    def close_all(self) -> None:
+        with self._lock:
+            while True:
+                try:
+                    conn = self._idle.get_nowait()
+                except queue.Empty:
+                    break
+                conn.close()
+                self._created -= 1
+
+    def stats(self) -> dict:
+        """풀 상태(크기, 사용 중/유휴 연결 수, 누적 카운터)를 반환합니다."""
+        with self._lock:
+            return {
+                "max_size": self.max_size,
+                "open": self._created,
+                "in_use": self._in_use,
+                "idle": self._idle.qsize(),
+                **self._stats,
+            }
+
+
+_pool_lock = threading.Lock()
+
+
+def _ensure_db_dir(db_path: str) -> None:
+    # 데이터베이스 파일이 저장될 디렉토리가 없으면 생성합니다.
+    # 이 로직은 instance 폴더가 자동으로 생성되도록 도와줍니다.
+    db_dir = os.path.dirname(db_path)
+    if not os.path.exists(db_dir):
+        try:
+            os.makedirs(db_dir)
+            current_app.logger.info(f"Successfully created database directory: {db_dir}")
+        except OSError as e:
+            current_app.logger.error(f"Error creating database directory {db_dir}: {e}")
+            # 디렉토리 생성 실패 시, 여기서 에러를 발생시키거나 다른 처리를 할 수 있습니다.
+            # 하지만 connect 시도 시 어차피 파일이 없으면 에러가 발생할 것입니다.
+
+
+def get_pool(app=None) -> ConnectionPool:
+    """앱에 연결된 연결 풀을 반환합니다. 처음 호출될 때 만듭니다."""
+    app = app or current_app._get_current_object()
+    pool = app.extensions.get('db_pool')
+    if pool is None:
+        with _pool_lock:
+            pool = app.extensions.get('db_pool')
+            if pool is None:
+                db_path = app.config['DATABASE']
+                _ensure_db_dir(db_path)
+                connection_factory = sqlite3.Connection
+                slow_query_ms = app.config['SLOW_QUERY_THRESHOLD_MS']
+                if app.config['METRICS_ENABLED'] or slow_query_ms > 0:
+                    # 쿼리 실행 시간을 /metrics 히스토그램과 느린 쿼리 로그에 기록하는 연결 클래스
+                    from .metrics import TimedConnection
+                    connection_factory = TimedConnection
+                pool = ConnectionPool(
+                    db_path,
+                    max_size=app.config['DB_POOL_SIZE'],
+                    timeout=app.config['DB_POOL_TIMEOUT'],
+                    pragmas={
+                        "synchronous": app.config['SQLITE_SYNCHRONOUS'],
+                        "busy_timeout": app.config['SQLITE_BUSY_TIMEOUT_MS'],
+                        "cache_size_kb": app.config['SQLITE_CACHE_SIZE_KB'],
+                        "mmap_size": app.config['SQLITE_MMAP_SIZE'],
+                    },
+                    connection_factory=connection_factory,
+                    slow_query_ms=max(slow_query_ms, 0),
+                )
+                app.extensions['db_pool'] = pool
+    return pool
+
+
+def get_pool_stats(app=None) -> dict:
+    return get_pool(app).stats()
+
 
 def get_db():
     if 'db' not in g:
-        db_path = current_app.config['DATABASE']
-        # 데이터베이스 파일이 저장될 디렉토리가 없으면 생성합니다.
-        # 이 로직은 instance 폴더가 자동으로 생성되도록 도와줍니다.
-        db_dir = os.path.dirname(db_path)
-        if not os.path.exists(db_dir):
-            try:
-                os.makedirs(db_dir)
-                current_app.logger.info(f"Successfully created database directory: {db_dir}")
-            except OSError as e:
-                current_app.logger.error(f"Error creating database directory {db_dir}: {e}")
-                # 디렉토리 생성 실패 시, 여기서 에러를 발생시키거나 다른 처리를 할 수 있습니다.
-                # 하지만 connect 시도 시 어차피 파일이 없으면 에러가 발생할 것입니다.
-
-        g.db = sqlite3.connect(db_path)
-        g.db.row_factory = sqlite3.Row
+        g.db = get_pool().acquire()
     return g.db
 
 def close_db(e=None):
     db = g.pop('db', None)
     if db is not None:
-        db.close()
+        get_pool().release(db)
 
 def init_db():
     db = get_db()
@@ -50,6 +229,9 @@ def init_db():
         with current_app.open_resource(schema_path, mode='r') as f:
             db.cursor().executescript(f.read())
         db.commit()
+        # schema.sql은 항상 최신 스키마이므로 모든 마이그레이션을 적용된 것으로 기록합니다.
+        from .migrations import stamp_all
+        stamp_all(db)
         click.echo('Initialized the database.')
         current_app.logger.info('Database initialized successfully.')
     except Exception as e:
@@ -62,6 +244,13 @@ def init_db_command():
     """Clear existing data and create new tables."""
     init_db()
 
+def _pool_timeout_handler(e):
+    current_app.logger.warning(f"SQLite connection pool exhausted: {e}")
+    response = jsonify({"message": "Server is busy. Please retry shortly."})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
 def init_app(app):
     app.teardown_appcontext(close_db)
+    app.register_error_handler(PoolTimeout, _pool_timeout_handler)
     app.cli.add_command(init_db_command)
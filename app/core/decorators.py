@@ -1,7 +1,142 @@
 # app/core/decorators.py
 from functools import wraps
 from flask import request, jsonify, g, current_app
+import hashlib
+import sqlite3
+import threading
+import time
 import jwt
+from app.core.cache import TTLCache, MISSING
+from app.core.database import get_db
+
+# 검증이 끝난 JWT의 클레임을 토큰 다이제스트(SHA-256) 기준으로 exp까지 캐시합니다.
+# 같은 토큰이 반복해서 들어오면 HMAC 검증과 클레임 파싱(jwt.decode)을 건너뜁니다.
+# 폐기(로그아웃, 계정 삭제)는 캐시가 아니라 DB의 revoked_tokens에 exp까지 기록하므로 크기 제한으로 밀려나지 않고
+# 모든 워커가 봅니다. 캐시 설정과 관계없이 매 요청마다 확인하되, 요청마다 DB를 조회하지 않고
+# 프로세스마다 가진 사본(RevocationSet)에서 확인합니다. 사본은 최대 TOKEN_REVOCATION_SYNC_INTERVAL_MS마다
+# 새로 기록된 행(seq 기준)만 읽어 갱신하며, 같은 프로세스에서 폐기한 토큰은 바로 반영합니다.
+# - 키 '<다이제스트>'      : 토큰 하나 (로그아웃)
+# - 키 'user:<user_id>'   : 그 사용자의 모든 토큰 (계정 삭제). users.id는 AUTOINCREMENT라 다시 쓰이지 않습니다.
+_cache_lock = threading.Lock()
+_revocations_lock = threading.Lock()
+
+
+class RevocationSet:
+    """
+    revoked_tokens의 프로세스 내 사본 (키 -> 만료 시각). 첫 확인에서 전부 읽고, 그 뒤로는 sync_interval마다
+    마지막으로 본 seq보다 큰 행만 읽습니다. seq는 AUTOINCREMENT이고 쓰기 잠금 안에서 정해지므로
+    commit 순서대로 커지며 다시 쓰이지 않습니다.
+    """
+
+    def __init__(self, sync_interval: float):
+        self._entries: dict[str, float] = {}
+        self._sync_interval = sync_interval
+        self._last_seq = 0
+        self._last_sync = None # 아직 한 번도 읽지 않음
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+
+    def add(self, key: str, expires_at: float) -> None:
+        with self._lock:
+            self._entries[key] = expires_at
+
+    def is_revoked(self, *keys) -> bool:
+        self._maybe_sync()
+        now = time.time()
+        entries = self._entries
+        return any(entries.get(key, 0) > now for key in keys)
+
+    def _maybe_sync(self) -> None:
+        now = time.monotonic()
+        if self._last_sync is not None and now - self._last_sync < self._sync_interval:
+            return
+        # 처음 읽기 전에는 아무 토큰도 통과시키지 않도록 기다리고, 그 뒤로는 다른 스레드가 읽는 중이면 건너뜁니다.
+        if not self._sync_lock.acquire(blocking=self._last_sync is None):
+            return
+        try:
+            if self._last_sync is not None and now - self._last_sync < self._sync_interval:
+                return
+            rows = get_db().execute("SELECT seq, key, expires_at FROM revoked_tokens WHERE seq > ? ORDER BY seq",
+                                    (self._last_seq,)).fetchall()
+            expired_before = time.time()
+            with self._lock:
+                for row in rows:
+                    self._entries[row['key']] = row['expires_at']
+                # 토큰이 만료된 기록은 더 확인할 필요가 없으므로 버립니다.
+                self._entries = {key: exp for key, exp in self._entries.items() if exp > expired_before}
+            if rows:
+                self._last_seq = rows[-1]['seq']
+            self._last_sync = now
+        finally:
+            self._sync_lock.release()
+
+
+def _get_token_cache() -> TTLCache:
+    cache = current_app.extensions.get('token_cache')
+    if cache is None:
+        with _cache_lock:
+            cache = current_app.extensions.get('token_cache')
+            if cache is None:
+                cache = TTLCache(maxsize=current_app.config['TOKEN_CACHE_SIZE'])
+                current_app.extensions['token_cache'] = cache
+    return cache
+
+
+def token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+
+def _user_revocation_key(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+def _get_revocations() -> RevocationSet:
+    revocations = current_app.extensions.get('token_revocations')
+    if revocations is None:
+        with _revocations_lock:
+            revocations = current_app.extensions.get('token_revocations')
+            if revocations is None:
+                revocations = RevocationSet(current_app.config['TOKEN_REVOCATION_SYNC_INTERVAL_MS'] / 1000)
+                current_app.extensions['token_revocations'] = revocations
+    return revocations
+
+
+def _record_revocation(key: str, expires_at: float) -> None:
+    now = time.time()
+    db = get_db()
+    try:
+        db.execute("INSERT OR REPLACE INTO revoked_tokens (key, expires_at) VALUES (?, ?)", (key, expires_at))
+        db.execute("DELETE FROM revoked_tokens WHERE expires_at <= ?", (now,)) # 만료된 기록 정리
+        db.commit()
+    except sqlite3.Error:
+        db.rollback()
+        raise
+    _get_revocations().add(key, expires_at)
+
+
+def _is_revoked(digest: str, user_id) -> bool:
+    return _get_revocations().is_revoked(digest, _user_revocation_key(user_id))
+
+
+def revoke_token(digest: str, exp: float) -> None:
+    """토큰 하나를 만료 시각(exp)까지 거부하도록 기록합니다 (로그아웃)."""
+    _get_token_cache().pop(digest)
+    _record_revocation(digest, exp)
+
+
+def revoke_user_tokens(user_id: int) -> int:
+    """
+    사용자의 모든 토큰을 거부하도록 기록합니다 (계정 삭제). 지금 발급된 토큰이 모두 만료될 때까지 유지합니다.
+    캐시에서 지운 토큰 수를 반환합니다.
+    """
+    expires_at = time.time() + current_app.config['JWT_EXPIRATION_DELTA'].total_seconds()
+    _record_revocation(_user_revocation_key(user_id), expires_at)
+    return _get_token_cache().evict_where(lambda digest, claims: claims.get('user_id') == user_id)
+
+
+def get_token_cache_stats() -> dict:
+    return _get_token_cache().stats()
+
 
 def token_required(f):
     @wraps(f)
@@ -17,16 +152,39 @@ def token_required(f):
         if not token:
             return jsonify({"message": "Token is missing!"}), 401
 
+        use_cache = current_app.config['TOKEN_CACHE_ENABLED']
+        digest = token_digest(token)
+        data = _get_token_cache().get(digest) if use_cache else MISSING
+
+        if data is MISSING:
+            try:
+                data = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=["HS256"])
+            except jwt.ExpiredSignatureError:
+                return jsonify({"message": "Token has expired!"}), 401
+            except jwt.InvalidTokenError:
+                return jsonify({"message": "Token is invalid!"}), 401
+            except Exception as e:
+                current_app.logger.error(f"Error processing token: {e}")
+                return jsonify({"message": "Error processing token"}), 500
+            if use_cache:
+                # exp까지만 캐시하므로 만료된 토큰이 캐시에서 통과되는 일은 없습니다.
+                _get_token_cache().set(digest, data, ttl=data.get('exp', 0) - time.time())
+
+        try:
+            revoked = _is_revoked(digest, data.get('user_id'))
+        except sqlite3.Error as e:
+            current_app.logger.error(f"Error checking token revocation: {e}", exc_info=True)
+            return jsonify({"message": "Error processing token"}), 500
+        if revoked:
+            return jsonify({"message": "Token has been revoked!"}), 401
+
         try:
-            data = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=["HS256"])
             g.current_user_id = data['user_id']
             g.current_username = data['username']
-        except jwt.ExpiredSignatureError:
-            return jsonify({"message": "Token has expired!"}), 401
-        except jwt.InvalidTokenError:
-            return jsonify({"message": "Token is invalid!"}), 401
+            g.current_token_digest = digest
+            g.current_token_exp = data.get('exp', 0)
         except Exception as e:
             current_app.logger.error(f"Error processing token: {e}")
             return jsonify({"message": "Error processing token"}), 500
         return f(*args, **kwargs)
-    return decorated_function
\ No newline at end of file
+    return decorated_function
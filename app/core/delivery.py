@@ -0,0 +1,376 @@
+# app/core/delivery.py
+import datetime
+import mimetypes
+import os
+import unicodedata
+import uuid
+from urllib.parse import quote
+from flask import current_app, request, send_file, Response
+from werkzeug.http import (
+    is_resource_modified, parse_if_range_header, http_date
+)
+from app.core.compression import DecodedReader, client_accepts
+from app.core.storage import ObjectNotFound, get_storage
+
+STREAM_CHUNK_SIZE = 256 * 1024  # 256 KB
+
+# FILE_DELIVERY_MODE 값
+# - 'sendfile'  : 워커가 직접 전송 (wsgi.file_wrapper가 있으면 zero-copy sendfile)
+# - 'x-accel'   : nginx X-Accel-Redirect. 본문과 Range 처리는 nginx의 internal location이 담당
+# - 'x-sendfile': Apache mod_xsendfile / lighttpd X-Sendfile (절대 경로 전달)
+DELIVERY_MODES = ('sendfile', 'x-accel', 'x-sendfile')
+
+
+def parse_db_timestamp(value) -> datetime.datetime | None:
+    """SQLite CURRENT_TIMESTAMP 문자열('YYYY-MM-DD HH:MM:SS', UTC)을 aware datetime으로 변환합니다."""
+    if not value:
+        return None
+    if isinstance(value, datetime.datetime):
+        return value if value.tzinfo else value.replace(tzinfo=datetime.timezone.utc)
+    try:
+        return datetime.datetime.fromisoformat(str(value)).replace(tzinfo=datetime.timezone.utc)
+    except ValueError:
+        return None
+
+
+def _sends_encoded(codec: str) -> bool:
+    """압축해 저장한 바이트를 Content-Encoding과 함께 그대로 보낼지 결정합니다 (Range 요청은 원본 기준)."""
+    return 'Range' not in request.headers and client_accepts(codec)
+
+
+def representation_etag(etag: str | None, codec: str | None) -> str | None:
+    """이 요청에 보낼 표현의 ETag. 압축된 바이트를 그대로 보낼 때는 '<해시>-<codec>'입니다."""
+    if etag and codec and _sends_encoded(codec):
+        return f"{etag}-{codec}"
+    return etag
+
+
+def not_modified_response(etag: str | None, last_modified: datetime.datetime | None,
+                          codec: str | None = None) -> Response | None:
+    """
+    If-None-Match / If-Modified-Since 조건을 DB에 저장된 메타데이터(해시, 업로드 시간)만으로 검사합니다.
+    클라이언트 사본이 최신이면 파일을 열거나 stat 하지 않고 304 응답을 돌려주고, 아니면 None을 반환합니다.
+    codec이 있으면 send_stored_object()가 이 요청에 보낼 표현의 ETag와 비교합니다.
+    """
+    if request.method not in ('GET', 'HEAD'):
+        return None
+    if not request.headers.get('If-None-Match') and not request.headers.get('If-Modified-Since'):
+        return None
+    etag = representation_etag(etag, codec)
+    if is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        return None
+    response = Response(status=304)
+    if etag:
+        response.set_etag(etag)
+    if last_modified:
+        response.headers['Last-Modified'] = http_date(last_modified)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    if codec:
+        response.vary.add('Accept-Encoding')
+    return response
+
+
+def _if_range_allows(etag: str | None, last_modified: datetime.datetime | None) -> bool:
+    """If-Range 헤더가 없거나 현재 표현과 (강한 비교로) 일치하면 True."""
+    header = request.headers.get('If-Range')
+    if not header:
+        return True
+    if_range = parse_if_range_header(header)
+    if if_range.etag is not None:
+        return etag is not None and not header.lstrip().startswith('W/') and if_range.etag == etag
+    if if_range.date is not None and last_modified is not None:
+        return if_range.date == last_modified.replace(microsecond=0)
+    return False
+
+
+def _parse_byte_ranges(header: str) -> list[tuple[int, int | None]] | None:
+    """
+    Range 헤더를 (start, stop) 목록으로 읽습니다. stop은 배타적이며 끝까지면 None, suffix 구간(bytes=-N)은 (-N, None).
+    Werkzeug의 parse_range_header는 겹치거나 순서가 바뀐 구간이 있으면 헤더 전체를 거부하므로(None),
+    여기서는 문법만 확인하고 합치기는 _normalize_ranges()에 맡깁니다. 문법이 틀리면 None.
+    """
+    unit, _, spec = header.partition('=')
+    if unit.strip().lower() != 'bytes':
+        return None
+    ranges = []
+    for item in spec.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        first, sep, last = (part.strip() for part in item.partition('-'))
+        if not sep or not all(p.isascii() and p.isdigit() for p in (first, last) if p):
+            return None
+        if not first:
+            if not last:
+                return None
+            ranges.append((-int(last), None))
+            continue
+        start = int(first)
+        stop = int(last) + 1 if last else None
+        if stop is not None and stop <= start:
+            return None
+        ranges.append((start, stop))
+    return ranges or None
+
+
+def _normalize_ranges(ranges, size: int) -> list[tuple[int, int]]:
+    """Range 헤더의 구간들을 [start, stop) 절대 구간으로 바꾸고, 겹치거나 맞닿은 구간은 합칩니다."""
+    spans = []
+    for start, stop in ranges:
+        if start < 0:  # suffix range: bytes=-N
+            start, stop = max(size + start, 0), size
+        else:
+            stop = size if stop is None else min(stop, size)
+        if start < stop:
+            spans.append((start, stop))
+    spans.sort()
+    merged = []
+    for start, stop in spans:
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], stop))
+        else:
+            merged.append((start, stop))
+    return merged
+
+
+def _multipart_byteranges_response(opener, spans, size: int, mimetype: str) -> Response:
+    """
+    여러 구간 요청에 대한 multipart/byteranges (206) 응답을 파일을 조각 단위로 읽으며 스트리밍합니다.
+    opener: seek 가능한 읽기 스트림을 여는 함수 (로컬 파일 또는 저장소 드라이버의 open).
+    """
+    boundary = uuid.uuid4().hex
+    headers_per_part = [
+        (f"--{boundary}\r\nContent-Type: {mimetype}\r\n"
+         f"Content-Range: bytes {start}-{stop - 1}/{size}\r\n\r\n").encode('ascii')
+        for start, stop in spans
+    ]
+    closing = f"--{boundary}--\r\n".encode('ascii')
+    content_length = sum(len(h) + (stop - start) + 2 for h, (start, stop) in zip(headers_per_part, spans)) + len(closing)
+
+    def generate():
+        with opener() as f:
+            for part_header, (start, stop) in zip(headers_per_part, spans):
+                yield part_header
+                f.seek(start)
+                remaining = stop - start
+                while remaining > 0:
+                    chunk = f.read(min(STREAM_CHUNK_SIZE, remaining))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                    yield chunk
+                yield b"\r\n"
+        yield closing
+
+    response = Response(generate(), status=206, mimetype=f"multipart/byteranges; boundary={boundary}",
+                        direct_passthrough=True)
+    response.headers['Content-Length'] = str(content_length)
+    return response
+
+
+def set_attachment(response: Response, download_name: str) -> None:
+    """send_file과 같은 방식으로 Content-Disposition을 설정합니다 (ASCII가 아니면 RFC 5987 filename*)."""
+    try:
+        download_name.encode('ascii')
+    except UnicodeEncodeError:
+        simple = unicodedata.normalize('NFKD', download_name).encode('ascii', 'ignore').decode('ascii')
+        quoted = quote(download_name, safe="!#$&+^`|~")
+        names = {"filename": simple, "filename*": f"UTF-8''{quoted}"}
+    else:
+        names = {"filename": download_name}
+    response.headers.set('Content-Disposition', 'attachment', **names)
+
+
+def _offloaded_response(mode: str, abs_path: str, download_name: str, etag: str | None,
+                        last_modified: datetime.datetime | None) -> Response:
+    """
+    본문 없이 프록시에게 파일 전송을 맡기는 응답을 만듭니다. 인증/권한 확인은 이미 끝난 상태여야 합니다.
+    Range / If-Range 처리도 프록시가 하므로 여기서는 구간을 해석하지 않습니다.
+    """
+    response = Response(status=200, mimetype=mimetypes.guess_type(download_name)[0] or 'application/octet-stream')
+    if mode == 'x-accel':
+        relpath = os.path.relpath(abs_path, current_app.config['UPLOAD_FOLDER']).replace(os.sep, '/')
+        prefix = current_app.config['FILE_DELIVERY_ACCEL_PREFIX'].rstrip('/')
+        response.headers['X-Accel-Redirect'] = f"{prefix}/{quote(relpath)}"
+    else:
+        response.headers['X-Sendfile'] = abs_path
+    set_attachment(response, download_name)
+    if etag:
+        response.set_etag(etag)
+    if last_modified:
+        response.headers['Last-Modified'] = http_date(last_modified)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def _under_upload_folder(abs_path: str) -> bool:
+    upload_folder = os.path.abspath(current_app.config['UPLOAD_FOLDER'])
+    return os.path.commonpath([upload_folder, os.path.abspath(abs_path)]) == upload_folder
+
+
+def delivery_mode() -> str:
+    mode = current_app.config['FILE_DELIVERY_MODE'].lower()
+    if mode not in DELIVERY_MODES:
+        current_app.logger.error(f"Unknown FILE_DELIVERY_MODE '{mode}', falling back to 'sendfile'.")
+        return 'sendfile'
+    return mode
+
+
+def _multi_range_response(opener, get_size, download_name: str, etag: str | None,
+                          last_modified: datetime.datetime | None) -> Response | None:
+    """
+    Range 헤더가 여러 구간이면 multipart/byteranges(또는 416) 응답을 만듭니다.
+    합쳐서 하나의 구간이 되면 요청의 Range를 그 구간으로 바꾸고 None을 반환해 단일 구간 처리에 맡깁니다.
+    """
+    range_header = request.headers.get('Range')
+    if not range_header or request.method not in ('GET', 'HEAD') or not _if_range_allows(etag, last_modified):
+        return None
+    ranges = _parse_byte_ranges(range_header)
+    if ranges is None or len(ranges) <= 1:
+        return None
+    size = get_size()
+    spans = _normalize_ranges(ranges, size)
+    if not spans:
+        response = Response(status=416)
+        response.headers['Content-Range'] = f"bytes */{size}"
+        return response
+    if len(spans) > 1:
+        mimetype = mimetypes.guess_type(download_name)[0] or 'application/octet-stream'
+        response = _multipart_byteranges_response(opener, spans, size, mimetype)
+        set_attachment(response, download_name)
+        response.headers['Accept-Ranges'] = 'bytes'
+        if etag:
+            response.set_etag(etag)
+        if last_modified:
+            response.headers['Last-Modified'] = http_date(last_modified)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+    request.environ['HTTP_RANGE'] = f"bytes={spans[0][0]}-{spans[0][1] - 1}"
+    return None
+
+
+def send_stored_file(abs_path: str, download_name: str, etag: str | None = None,
+                     last_modified: datetime.datetime | None = None) -> Response:
+    """
+    저장된 파일을 Range / 조건부 요청을 지원하며 전송합니다.
+    - etag: 내용 해시(SHA-256) 기반의 강한 ETag 값 (따옴표 없이)
+    - last_modified: 업로드 시간
+    단일 구간과 전체 전송은 Werkzeug send_file(conditional=True)에 맡겨 wsgi.file_wrapper(sendfile)를
+    그대로 활용하고, 여러 구간(multi-range)은 multipart/byteranges로 직접 스트리밍합니다.
+    호출하기 전에 not_modified_response()로 304 여부를 먼저 확인하는 것을 권장합니다.
+    FILE_DELIVERY_MODE가 'x-accel' / 'x-sendfile'이면 본문은 앞단 웹 서버가 보냅니다.
+    """
+    mode = delivery_mode()
+    if mode == 'x-accel' and not _under_upload_folder(abs_path):
+        # nginx internal location은 UPLOAD_FOLDER만 가리키므로 cold 볼륨의 객체는 직접 보냅니다.
+        mode = 'sendfile'
+    if mode != 'sendfile':
+        return _offloaded_response(mode, abs_path, download_name, etag, last_modified)
+
+    multi = _multi_range_response(lambda: open(abs_path, 'rb'), lambda: os.path.getsize(abs_path),
+                                  download_name, etag, last_modified)
+    if multi is not None:
+        return multi
+
+    response = send_file(
+        abs_path,
+        as_attachment=True,
+        download_name=download_name,
+        conditional=True,
+        etag=etag if etag else True,
+        last_modified=last_modified,
+    )
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def _send_stream(opener, size: int, download_name: str, etag: str | None,
+                 last_modified: datetime.datetime | None) -> Response:
+    """seek 가능한 스트림(opener)을 Range / 조건부 요청을 지원하며 보냅니다. size는 보내는 표현의 크기입니다."""
+    multi = _multi_range_response(opener, lambda: size, download_name, etag, last_modified)
+    if multi is not None:
+        return multi
+
+    fileobj = opener()
+    try:
+        # 파일 객체에는 크기가 없으므로 send_file의 조건부 처리 대신 크기를 알려 주고 직접 처리합니다.
+        response = send_file(fileobj, as_attachment=True, download_name=download_name,
+                             conditional=False, etag=etag if etag else False, last_modified=last_modified)
+        response.content_length = size
+        response = response.make_conditional(request.environ, accept_ranges=True, complete_length=size)
+    except BaseException:
+        fileobj.close()
+        raise
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def _send_compressed_object(storage, key: str, download_name: str, etag: str | None,
+                            last_modified: datetime.datetime | None, codec: str, size: int) -> Response:
+    """
+    압축해 저장한 객체를 보냅니다. 클라이언트가 codec을 받고 Range 요청이 아니면 저장된 바이트를
+    Content-Encoding과 함께 그대로 보내고(ETag는 '<해시>-<codec>'), 아니면 원본으로 풀어 스트리밍합니다.
+    프록시 오프로드(x-accel / x-sendfile)는 Content-Encoding을 붙일 수 없으므로 쓰지 않습니다.
+    """
+    stored_size = storage.stat(key).size
+    storage.record_access(key)
+    if _sends_encoded(codec):
+        abs_path = storage.local_path(key)
+        response = _send_stream(lambda: open(abs_path, 'rb') if abs_path else storage.open(key), stored_size,
+                                download_name, representation_etag(etag, codec), last_modified)
+        response.headers['Content-Encoding'] = codec
+    else:
+        response = _send_stream(lambda: DecodedReader(lambda: storage.open(key), codec, size), size,
+                                download_name, etag, last_modified)
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def send_stored_object(key: str, download_name: str, etag: str | None = None,
+                       last_modified: datetime.datetime | None = None,
+                       codec: str | None = None, size: int | None = None) -> Response:
+    """
+    저장소 드라이버(app.core.storage)에 있는 객체를 전송합니다. 객체가 없으면 ObjectNotFound를 올립니다.
+    로컬 경로가 있는 드라이버(local, tiered)는 send_stored_file()로 sendfile / 오프로드를 그대로 쓰고,
+    원격 드라이버(s3)는 드라이버 스트림을 읽어 보냅니다. 단일 구간 Range는 해당 위치부터 읽기 시작합니다.
+    codec이 있으면 압축해 저장한 객체이며, size는 원본 크기(files.filesize)입니다.
+    """
+    storage = get_storage()
+    if codec:
+        return _send_compressed_object(storage, key, download_name, etag, last_modified, codec, size)
+    abs_path = storage.local_path(key)
+    if abs_path is not None:
+        if not os.path.isfile(abs_path):
+            raise ObjectNotFound(key)
+        storage.record_access(key)
+        return send_stored_file(abs_path, download_name, etag=etag, last_modified=last_modified)
+
+    size = storage.stat(key).size
+    storage.record_access(key)
+    return _send_stream(lambda: storage.open(key), size, download_name, etag, last_modified)
+
+
+def send_derived_object(key: str, mimetype: str, etag: str, cache_control: str) -> Response:
+    """
+    파생 자산(썸네일 등)을 inline으로 보냅니다. 객체가 없으면 ObjectNotFound를 올립니다.
+    키가 원본 내용에 묶여 있어 내용이 바뀌지 않으므로 cache_control로 오래 캐시하게 합니다.
+    """
+    storage = get_storage()
+    abs_path = storage.local_path(key)
+    if abs_path is not None:
+        if not os.path.isfile(abs_path):
+            raise ObjectNotFound(key)
+        response = send_file(abs_path, mimetype=mimetype, conditional=True, etag=etag)
+    else:
+        size = storage.stat(key).size
+        fileobj = storage.open(key)
+        try:
+            response = send_file(fileobj, mimetype=mimetype, conditional=False, etag=etag)
+            response.content_length = size
+            response = response.make_conditional(request.environ, accept_ranges=True, complete_length=size)
+        except BaseException:
+            fileobj.close()
+            raise
+    storage.record_access(key)
+    response.headers['Cache-Control'] = cache_control
+    return response
@@ -0,0 +1,103 @@
+# app/core/hashing.py
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import bcrypt
+from flask import current_app, jsonify
+from app.core.metrics import BCRYPT_LATENCY, BCRYPT_REJECTED
+
+# 비밀번호 해시(bcrypt) 전용 작업자 풀.
+# bcrypt는 의도적으로 느린 연산이므로 요청 스레드에서 바로 실행하면 비밀번호 보호 다운로드가
+# 몰릴 때 모든 작업자가 묶여 빠른 요청까지 기다리게 됩니다. 동시에 실행되는 해시 수를
+# BCRYPT_POOL_SIZE로, 대기할 수 있는 수를 BCRYPT_QUEUE_LIMIT로 제한하고 넘치면 바로 503을 반환합니다.
+
+
+class HashingBusy(Exception):
+    """해시 작업자와 대기열이 모두 찼을 때 발생합니다."""
+
+
+class HashingPool:
+    def __init__(self, pool_size: int, queue_limit: int):
+        self.pool_size = pool_size
+        self.queue_limit = queue_limit
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix='bcrypt')
+        self._slots = threading.BoundedSemaphore(pool_size + queue_limit)
+        self._stats = {"submitted": 0, "rejected": 0}
+
+    def _check_fork(self):
+        # fork된 자식 프로세스에는 부모의 작업자 스레드가 없으므로 새로 만듭니다.
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._executor = ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix='bcrypt')
+                    self._slots = threading.BoundedSemaphore(self.pool_size + self.queue_limit)
+                    self._pid = os.getpid()
+
+    def run(self, fn, *args):
+        """fn(*args)를 작업자 풀에서 실행하고 결과를 기다립니다. 자리가 없으면 HashingBusy."""
+        self._check_fork()
+        slots = self._slots
+        if not slots.acquire(blocking=False):
+            with self._lock:
+                self._stats["rejected"] += 1
+            BCRYPT_REJECTED.inc()
+            raise HashingBusy(f"bcrypt pool saturated ({self.pool_size} workers, {self.queue_limit} queued).")
+        try:
+            with self._lock:
+                self._stats["submitted"] += 1
+            return self._executor.submit(fn, *args).result()
+        finally:
+            slots.release()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"pool_size": self.pool_size, "queue_limit": self.queue_limit, **self._stats}
+
+
+_pool_lock = threading.Lock()
+
+
+def get_hashing_pool(app=None) -> HashingPool:
+    app = app or current_app._get_current_object()
+    pool = app.extensions.get('hashing_pool')
+    if pool is None:
+        with _pool_lock:
+            pool = app.extensions.get('hashing_pool')
+            if pool is None:
+                pool = HashingPool(app.config['BCRYPT_POOL_SIZE'], app.config['BCRYPT_QUEUE_LIMIT'])
+                app.extensions['hashing_pool'] = pool
+    return pool
+
+
+def _hashpw(password: bytes, rounds: int) -> bytes:
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds=rounds))
+
+
+def hash_password(password: str) -> str:
+    """비밀번호를 설정된 비용(BCRYPT_ROUNDS)으로 해시하여 문자열로 반환합니다."""
+    start = time.perf_counter()
+    hashed = get_hashing_pool().run(_hashpw, password.encode('utf-8'), current_app.config['BCRYPT_ROUNDS'])
+    BCRYPT_LATENCY.observe(time.perf_counter() - start, operation='hash')
+    return hashed.decode('utf-8')
+
+
+def check_password(password: str, password_hash: str) -> bool:
+    """비밀번호가 저장된 해시와 일치하는지 확인합니다. 비용은 해시에 기록된 값을 따릅니다."""
+    start = time.perf_counter()
+    matched = get_hashing_pool().run(bcrypt.checkpw, password.encode('utf-8'), password_hash.encode('utf-8'))
+    BCRYPT_LATENCY.observe(time.perf_counter() - start, operation='check')
+    return matched
+
+
+def _hashing_busy_handler(e):
+    current_app.logger.warning(f"Password hashing rejected: {e}")
+    response = jsonify({"message": "Server is busy. Please retry shortly."})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
+
+def init_app(app):
+    app.register_error_handler(HashingBusy, _hashing_busy_handler)
@@ -0,0 +1,170 @@
+# app/core/layout.py
+import hashlib
+import os
+import string
+import time
+import click
+from flask import current_app
+from app.core.database import get_db
+from app.core.metadata_cache import clear_metadata_cache
+from app.core.storage import ObjectNotFound, get_storage
+
+# UPLOAD_FOLDER의 디렉토리 분산(fan-out) 배치.
+# 수십만 개 파일이 한 디렉토리에 몰리면 exists/remove 같은 메타데이터 작업과 백업이 느려지므로,
+# 객체 이름의 해시 접두사로 'ab/cd/<name>'처럼 하위 디렉토리를 나눕니다.
+# 단계 수와 단계별 글자 수는 UPLOAD_SHARD_DEPTH / UPLOAD_SHARD_WIDTH로 조정합니다.
+
+_HEX_DIGITS = set(string.hexdigits.lower())
+
+
+def _shard_key(name: str, needed: int) -> str:
+    """이름이 이미 무작위 16진수(uuid hex, SHA-256)로 시작하면 그대로, 아니면 이름의 해시를 사용합니다."""
+    prefix = name[:needed].lower()
+    if len(prefix) == needed and set(prefix) <= _HEX_DIGITS:
+        return prefix
+    return hashlib.sha256(name.encode('utf-8')).hexdigest()[:needed]
+
+
+def sharded_relpath(name: str, prefix: str = '') -> str:
+    """객체 이름을 설정된 fan-out 배치의 UPLOAD_FOLDER 기준 상대 경로로 바꿉니다."""
+    depth = current_app.config['UPLOAD_SHARD_DEPTH']
+    width = current_app.config['UPLOAD_SHARD_WIDTH']
+    key = _shard_key(name, depth * width)
+    shards = [key[i * width:(i + 1) * width] for i in range(depth)]
+    return os.path.join(prefix, *shards, name) if prefix else os.path.join(*shards, name)
+
+
+def _relocate(old_relpath: str, new_relpath: str) -> bool:
+    """
+    새 위치에 사본을 만들어 둡니다 (로컬 드라이버는 하드 링크). 기존 경로는 DB가 새 경로로 바뀐 뒤에 지우므로
+    그 사이 기존 경로로 파일을 여는 요청도 계속 성공합니다. 원본이 없으면 False.
+    """
+    try:
+        get_storage().copy(old_relpath, new_relpath)
+    except ObjectNotFound:
+        return False
+    return True
+
+
+def _unlink_quietly(relpaths: list[str]) -> None:
+    storage = get_storage()
+    for relpath in relpaths:
+        try:
+            storage.delete(relpath)
+        except Exception as e:
+            current_app.logger.error(f"Layout migration could not remove old path '{relpath}': {e}")
+
+
+def migrate_layout(batch_size: int = 500, pause: float = 0.0, dry_run: bool = False) -> dict:
+    """
+    기존 객체를 현재 fan-out 배치로 옮기고 files.filepath / blobs.path를 배치 단위로 갱신합니다.
+    서비스를 멈추지 않고 실행할 수 있도록 배치의 사본을 잠금 없이 먼저 모두 만든 뒤, 경로 갱신만 짧은 트랜잭션으로
+    commit 합니다. 이전 경로는 다음 배치가 commit 된 뒤에 지웁니다(진행 중인 다운로드가 옛 경로를 쓸 시간을 둠).
+    """
+    from app.core.blobstore import BLOB_SUBDIR, is_blob_path
+
+    db = get_db()
+    cursor = db.cursor()
+    stats = {"blobs_moved": 0, "files_moved": 0, "missing": 0}
+    pending_unlink: list[str] = []
+
+    def _finish_batch(old_paths):
+        nonlocal pending_unlink
+        if dry_run:
+            return
+        db.commit()
+        if old_paths:
+            clear_metadata_cache() # 캐시된 메타데이터가 옛 경로를 가리키지 않도록
+        _unlink_quietly(pending_unlink)
+        pending_unlink = old_paths
+        if pause:
+            time.sleep(pause)
+
+    # 1) blob: 경로가 현재 배치와 다르면 이동하고, 이를 가리키는 files 레코드도 함께 갱신합니다.
+    last_hash = ''
+    while True:
+        cursor.execute("SELECT hash, path FROM blobs WHERE hash > ? ORDER BY hash LIMIT ?", (last_hash, batch_size))
+        rows = cursor.fetchall()
+        if not rows:
+            break
+        last_hash = rows[-1]['hash']
+        copied = []
+        for row in rows:
+            # blob 이름('<해시>.<토큰>')은 유지하고 디렉토리만 현재 배치로 바꿉니다.
+            target = sharded_relpath(os.path.basename(row['path']), BLOB_SUBDIR)
+            if row['path'] == target:
+                continue
+            if dry_run:
+                stats["blobs_moved"] += 1
+                continue
+            if not _relocate(row['path'], target):
+                stats["missing"] += 1
+                continue
+            copied.append((row['hash'], row['path'], target))
+        # 복사는 모두 잠금 없이 끝내고, 쓰기 잠금은 경로 갱신과 commit 동안만 잡습니다.
+        moved_old_paths = []
+        for content_hash, old_path, target in copied:
+            cursor.execute("UPDATE blobs SET path = ? WHERE hash = ? AND path = ? AND gc_claimed_at IS NULL",
+                           (target, content_hash, old_path))
+            if cursor.rowcount == 0:
+                continue # 그 사이 GC되었거나(지우는 중이거나) 경로가 바뀜. 남은 사본은 'scan-orphans'가 찾습니다.
+            cursor.execute("UPDATE files SET filepath = ? WHERE filepath = ?", (target, old_path))
+            moved_old_paths.append(old_path)
+            stats["blobs_moved"] += 1
+        _finish_batch(moved_old_paths)
+
+    # 2) blob 도입 이전의 개별 파일(평평한 UPLOAD_FOLDER 또는 이전 배치)
+    last_id = 0
+    while True:
+        cursor.execute("SELECT id, filepath FROM files WHERE id > ? ORDER BY id LIMIT ?", (last_id, batch_size))
+        rows = cursor.fetchall()
+        if not rows:
+            break
+        last_id = rows[-1]['id']
+        copied = []
+        for row in rows:
+            if is_blob_path(row['filepath']):
+                continue
+            target = sharded_relpath(os.path.basename(row['filepath']))
+            if row['filepath'] == target:
+                continue
+            if dry_run:
+                stats["files_moved"] += 1
+                continue
+            if not _relocate(row['filepath'], target):
+                stats["missing"] += 1
+                continue
+            copied.append((row['id'], row['filepath'], target))
+        moved_old_paths = []
+        stale_copies = []
+        for file_id, old_path, target in copied:
+            cursor.execute("UPDATE files SET filepath = ? WHERE id = ? AND filepath = ?", (target, file_id, old_path))
+            if cursor.rowcount == 0:
+                stale_copies.append(target) # 그 사이 삭제된 파일의 사본
+                continue
+            moved_old_paths.append(old_path)
+            stats["files_moved"] += 1
+        _finish_batch(moved_old_paths)
+        if stale_copies:
+            _unlink_quietly(stale_copies)
+
+    if not dry_run:
+        _unlink_quietly(pending_unlink)
+    return stats
+
+
+@click.command('migrate-layout')
+@click.option('--batch-size', type=int, default=500, help='Objects moved per transaction.')
+@click.option('--pause', type=float, default=0.0, help='Seconds to sleep between batches to limit I/O.')
+@click.option('--dry-run', is_flag=True, help='Only count the objects that would be moved.')
+def migrate_layout_command(batch_size, pause, dry_run):
+    """Move stored objects into the configured sharded directory layout."""
+    stats = migrate_layout(batch_size=batch_size, pause=pause, dry_run=dry_run)
+    prefix = '[dry-run] ' if dry_run else ''
+    click.echo(f"{prefix}Moved {stats['blobs_moved']} blob(s) and {stats['files_moved']} legacy file(s); "
+               f"{stats['missing']} missing on disk.")
+    current_app.logger.info(f"Layout migration finished: {stats} (dry_run={dry_run})")
+
+
+def init_app(app):
+    app.cli.add_command(migrate_layout_command)
@@ -0,0 +1,244 @@
+# app/core/metadata_cache.py
+import os
+import sqlite3
+import threading
+import time
+from flask import current_app
+from app.core.cache import TTLCache, MISSING
+
+# 파일 메타데이터 read-through 캐시 (app.models.get_file_by_id / get_file_by_download_link 앞단).
+# 공개 링크 다운로드처럼 같은 레코드를 반복해서 읽는 경로에서 DB 연결 획득과 조회를 건너뜁니다.
+# - 항목은 METADATA_CACHE_TTL초 동안 유지되고, 없는 링크는 METADATA_CACHE_NEGATIVE_TTL초 동안 '없음'으로 기억합니다.
+# - 권한 변경과 삭제는 commit 직후 invalidate_files()로 해당 키를 지웁니다.
+# - 조회 중에 무효화가 일어나면(세대 번호가 바뀌면) 방금 읽은 값은 캐시에 넣지 않아 옛 값이 되살아나지 않습니다.
+# METADATA_CACHE_BACKEND
+# - 'local' : 프로세스 단위. 다른 워커 프로세스의 변경은 TTL이 지나야 반영됩니다.
+# - 'sqlite': 무효화를 공유 SQLite 파일(METADATA_CACHE_PATH)에 기록하고, 각 워커가 최대
+#             METADATA_CACHE_SYNC_INTERVAL_MS마다 읽어 자기 캐시에서 지웁니다. 워커 간 지연이 그 간격으로 줄어듭니다.
+# - 'auto'  : (기본) 워커가 하나(ASGI_WORKERS == 1)면 'local', 여럿이면 'sqlite'.
+#             캐시된 레코드에는 권한과 링크 비밀번호 해시가 있어, 여러 워커에서 'local'을 쓰면
+#             비공개로 바꾼 파일이 다른 워커에서 TTL 동안 공개로 보일 수 있습니다.
+
+_NOT_FOUND = object() # 없는 레코드 (negative caching)
+_CLEAR_ALL = '*'
+_cache_lock = threading.Lock()
+
+
+class InvalidationJournal:
+    """워커 프로세스들이 공유하는 무효화 기록. 키 하나당 한 행이며 retention초가 지난 행은 지웁니다."""
+
+    def __init__(self, path: str, retention: float):
+        self.path = path
+        self.retention = retention
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._connect().execute("""
+            CREATE TABLE IF NOT EXISTS invalidations (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                key TEXT NOT NULL,
+                created REAL NOT NULL
+            )
+        """)
+
+    def _connect(self) -> sqlite3.Connection:
+        # 스레드마다, 그리고 fork된 프로세스마다 자기 연결을 씁니다.
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def last_seq(self) -> int:
+        return self._connect().execute("SELECT COALESCE(MAX(seq), 0) FROM invalidations").fetchone()[0]
+
+    def append(self, keys) -> None:
+        now = time.time()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany("INSERT INTO invalidations (key, created) VALUES (?, ?)", [(key, now) for key in keys])
+            conn.execute("DELETE FROM invalidations WHERE created < ?", (now - self.retention,))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def since(self, seq: int, limit: int) -> list[tuple[int, str]]:
+        return self._connect().execute(
+            "SELECT seq, key FROM invalidations WHERE seq > ? ORDER BY seq LIMIT ?", (seq, limit)).fetchall()
+
+
+class MetadataCache:
+    def __init__(self, maxsize: int, ttl: float, negative_ttl: float,
+                 journal: InvalidationJournal | None = None, sync_interval: float = 0.5):
+        self._entries = TTLCache(maxsize=maxsize, default_ttl=ttl)
+        self.maxsize = maxsize
+        self.negative_ttl = negative_ttl
+        self._journal = journal
+        self._sync_interval = sync_interval
+        self._generation = 0
+        self._generation_lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._last_seq = journal.last_seq() if journal else 0
+        self._last_sync = time.monotonic()
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, key: str):
+        self._maybe_sync()
+        return self._entries.get(key)
+
+    def set(self, key: str, value, generation: int, negative: bool = False) -> None:
+        """generation 이후로 무효화가 없었을 때만 저장합니다. value가 None이면 negative=True일 때만 '없음'으로 저장."""
+        if value is None and not negative:
+            return
+        with self._generation_lock:
+            if generation != self._generation:
+                return
+            if value is None:
+                self._entries.set(key, _NOT_FOUND, ttl=self.negative_ttl)
+            else:
+                self._entries.set(key, value)
+
+    def invalidate(self, keys) -> None:
+        keys = list(keys)
+        if not keys:
+            return
+        self._drop(keys)
+        if self._journal is not None:
+            try:
+                self._journal.append(keys)
+            except sqlite3.Error as e:
+                current_app.logger.error(f"Could not record metadata cache invalidation for other workers: {e}")
+
+    def _drop(self, keys) -> None:
+        with self._generation_lock:
+            self._generation += 1
+            if _CLEAR_ALL in keys:
+                self._entries.clear()
+                return
+            for key in keys:
+                self._entries.pop(key)
+
+    def _maybe_sync(self) -> None:
+        """다른 워커가 기록한 무효화를 최대 sync_interval마다 한 번 읽어 반영합니다."""
+        if self._journal is None:
+            return
+        now = time.monotonic()
+        if now - self._last_sync < self._sync_interval:
+            return
+        if not self._sync_lock.acquire(blocking=False):
+            return # 다른 스레드가 동기화 중
+        try:
+            if now - self._last_sync >= self._journal.retention:
+                # 오래 쉬는 동안 기록이 정리되었을 수 있으므로 전부 비웁니다.
+                self._drop([_CLEAR_ALL])
+            rows = self._journal.since(self._last_seq, self.maxsize)
+            if len(rows) >= self.maxsize:
+                self._drop([_CLEAR_ALL])
+                self._last_seq = self._journal.last_seq()
+            elif rows:
+                self._drop([key for _, key in rows])
+                self._last_seq = rows[-1][0]
+            self._last_sync = now
+        except sqlite3.Error as e:
+            current_app.logger.error(f"Metadata cache sync failed: {e}")
+        finally:
+            self._sync_lock.release()
+
+    def stats(self) -> dict:
+        return self._entries.stats()
+
+
+def get_metadata_cache(app=None) -> MetadataCache | None:
+    """설정으로 꺼져 있으면 None."""
+    app = app or current_app._get_current_object()
+    if not app.config['METADATA_CACHE_ENABLED']:
+        return None
+    cache = app.extensions.get('metadata_cache')
+    if cache is None:
+        with _cache_lock:
+            cache = app.extensions.get('metadata_cache')
+            if cache is None:
+                cache = _create_cache(app)
+                app.extensions['metadata_cache'] = cache
+    return cache
+
+
+def _create_cache(app) -> MetadataCache:
+    config = app.config
+    ttl = config['METADATA_CACHE_TTL']
+    negative_ttl = config['METADATA_CACHE_NEGATIVE_TTL']
+    backend = config['METADATA_CACHE_BACKEND'].lower()
+    if backend == 'auto':
+        backend = 'local' if config['ASGI_WORKERS'] <= 1 else 'sqlite'
+    journal = None
+    if backend == 'sqlite':
+        path = config['METADATA_CACHE_PATH'] or os.path.join(app.instance_path, 'metadata_cache.sqlite')
+        journal = InvalidationJournal(path, retention=max(ttl, negative_ttl) * 2)
+    elif backend != 'local':
+        raise ValueError(f"Unknown METADATA_CACHE_BACKEND '{backend}'. Use 'auto', 'local' or 'sqlite'.")
+    return MetadataCache(config['METADATA_CACHE_SIZE'], ttl, negative_ttl, journal=journal,
+                         sync_interval=config['METADATA_CACHE_SYNC_INTERVAL_MS'] / 1000)
+
+
+def cached_lookup(key: str, loader, negative: bool = False) -> dict | None:
+    """
+    캐시에 있으면 그 값(사본)을, 없으면 loader()로 읽어 캐시에 넣고 반환합니다.
+    negative=True이면 loader()가 None을 돌려준 결과도 짧게 기억합니다.
+    """
+    cache = get_metadata_cache()
+    if cache is None:
+        return loader()
+    value = cache.get(key)
+    if value is _NOT_FOUND:
+        return None
+    if value is not MISSING:
+        return dict(value)
+    generation = cache.generation
+    value = loader()
+    cache.set(key, value, generation, negative=negative)
+    return dict(value) if value is not None else None
+
+
+def file_id_key(file_id: int) -> str:
+    return f"id:{file_id}"
+
+
+def download_link_key(link_id: str) -> str:
+    return f"link:{link_id}"
+
+
+def invalidate_files(records) -> None:
+    """바뀌거나 지워진 files 레코드들(id, download_link_id를 가진 매핑)의 캐시 항목을 지웁니다. commit 이후에 부릅니다."""
+    cache = get_metadata_cache()
+    if cache is None:
+        return
+    keys = []
+    for record in records:
+        keys.append(file_id_key(record['id']))
+        if record['download_link_id']:
+            keys.append(download_link_key(record['download_link_id']))
+    cache.invalidate(keys)
+
+
+def clear_metadata_cache() -> None:
+    """모든 항목을 지웁니다 (경로를 한꺼번에 바꾸는 'flask migrate-layout' 등)."""
+    cache = get_metadata_cache()
+    if cache is not None:
+        cache.invalidate([_CLEAR_ALL])
+
+
+def get_metadata_cache_stats() -> dict | None:
+    cache = get_metadata_cache()
+    return cache.stats() if cache is not None else None
+
+
+def init_app(app):
+    # 공유 기록 파일의 테이블과 설정 오류가 시작할 때 드러나도록 바로 만듭니다.
+    get_metadata_cache(app)
@@ -0,0 +1,344 @@
+# app/core/metrics.py
+import hmac
+import logging
+import sqlite3
+import threading
+import time
+from flask import Response, current_app, g, request
+from werkzeug.wsgi import ClosingIterator
+
+# Prometheus 텍스트 형식(0.0.4)의 /metrics 엔드포인트.
+# 외부 라이브러리 없이 카운터/게이지/히스토그램을 프로세스 메모리에 모읍니다.
+# gunicorn처럼 워커가 여럿이면 각 워커가 자기 값만 가지므로, 워커별로 수집하거나
+# 집계 쪽에서 instance 레이블로 합쳐야 합니다.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+QUERY_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+BCRYPT_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# 전송량을 '진행 중인 전송'으로 집계할 엔드포인트 -> 방향
+TRANSFER_ENDPOINTS = {
+    'files.upload_file_route': 'upload',
+    'files.stream_upload_route': 'upload',
+    'multipart.upload_part_route': 'upload',
+    'files.download_file_with_link_route': 'download',
+    'files.download_own_file_route': 'download',
+    'files.download_signed_route': 'download',
+    'files.download_archive_route': 'download',
+    'files.own_thumbnail_route': 'download',
+    'files.link_thumbnail_route': 'download',
+}
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra: str = '') -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+def _format_value(value) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(labels.get(n, '') for n in self.labelnames)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in sorted(items):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets) + (float('inf'),)
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = [(key, (list(s[0]), s[1], s[2])) for key, s in self._values.items()]
+        for key, (counts, total, count) in sorted(items):
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def collector(self, fn):
+        """수집 시점에 계산하는 값. fn()은 (이름, 종류, 설명, [(레이블 dict, 값), ...]) 목록을 반환합니다."""
+        self._collectors.append(fn)
+        return fn
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for fn in self._collectors:
+            for name, kind, documentation, samples in fn():
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(labels.keys(), labels.values())} {_format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+HTTP_REQUESTS = REGISTRY.register(Counter(
+    'http_requests_total', 'HTTP requests by route and status.', ('blueprint', 'endpoint', 'method', 'status')))
+HTTP_LATENCY = REGISTRY.register(Histogram(
+    'http_request_duration_seconds', 'Time until the response object is ready (excludes streamed body).',
+    ('blueprint', 'endpoint', 'method')))
+HTTP_BYTES_IN = REGISTRY.register(Counter(
+    'http_request_body_bytes_total', 'Declared request body bytes.', ('endpoint',)))
+HTTP_BYTES_OUT = REGISTRY.register(Counter(
+    'http_response_body_bytes_total', 'Response body bytes (Content-Length).', ('endpoint',)))
+TRANSFERS_ACTIVE = REGISTRY.register(Gauge(
+    'transfers_in_progress', 'Uploads and downloads currently in progress, including body streaming.', ('direction',)))
+DB_QUERY_LATENCY = REGISTRY.register(Histogram(
+    'sqlite_query_duration_seconds', 'SQLite statement execution time by statement type.', ('statement',),
+    buckets=QUERY_BUCKETS))
+BCRYPT_LATENCY = REGISTRY.register(Histogram(
+    'bcrypt_duration_seconds', 'Password hashing time including queueing.', ('operation',), buckets=BCRYPT_BUCKETS))
+BCRYPT_REJECTED = REGISTRY.register(Counter(
+    'bcrypt_rejected_total', 'Hashing requests rejected because the pool was saturated.'))
+
+
+# --- SQLite 쿼리 시간 측정 ---
+
+# 'app' 로거의 하위 로거이므로 app.logger의 핸들러(instance/app.log 등)로 함께 기록됩니다.
+slow_query_logger = logging.getLogger('app.slow_query')
+
+
+def _statement_kind(sql: str) -> str:
+    head = sql.lstrip()[:10].split(None, 1)
+    return head[0].upper() if head else 'UNKNOWN'
+
+
+class TimedCursor(sqlite3.Cursor):
+    def _observe(self, sql: str, elapsed: float, many: bool = False) -> None:
+        DB_QUERY_LATENCY.observe(elapsed, statement=_statement_kind(sql))
+        threshold = self.connection.slow_query_seconds
+        if threshold and elapsed >= threshold:
+            # 파라미터 값은 비밀번호 해시 등이 있을 수 있으므로 기록하지 않습니다.
+            statement = ' '.join(sql.split())[:500]
+            slow_query_logger.warning(f"Slow query ({elapsed * 1000:.1f} ms{', executemany' if many else ''}): {statement}")
+
+    def execute(self, sql, parameters=()):
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._observe(sql, time.perf_counter() - start)
+
+    def executemany(self, sql, seq_of_parameters):
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            self._observe(sql, time.perf_counter() - start, many=True)
+
+
+class TimedConnection(sqlite3.Connection):
+    """
+    모든 execute가 TimedCursor를 거치도록 하는 연결. ConnectionPool의 connection_factory로 사용합니다.
+    slow_query_seconds를 설정하면 그보다 오래 걸린 문장을 slow_query_logger로 기록합니다.
+    """
+    slow_query_seconds = None
+
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+# --- 요청 훅 ---
+
+def _labels():
+    endpoint = request.endpoint or 'unmatched'
+    return request.blueprint or '', endpoint
+
+
+def _before_request():
+    g._metrics_start = time.perf_counter()
+    direction = TRANSFER_ENDPOINTS.get(request.endpoint)
+    if direction:
+        TRANSFERS_ACTIVE.inc(direction=direction)
+        g._metrics_transfer = direction
+
+
+def _after_request(response):
+    start = g.pop('_metrics_start', None)
+    if start is None:
+        return response
+    blueprint, endpoint = _labels()
+    HTTP_LATENCY.observe(time.perf_counter() - start, blueprint=blueprint, endpoint=endpoint, method=request.method)
+    HTTP_REQUESTS.inc(blueprint=blueprint, endpoint=endpoint, method=request.method, status=str(response.status_code))
+    if request.content_length:
+        HTTP_BYTES_IN.inc(request.content_length, endpoint=endpoint)
+    if response.content_length:
+        HTTP_BYTES_OUT.inc(response.content_length, endpoint=endpoint)
+
+    direction = g.pop('_metrics_transfer', None)
+    if direction:
+        # 파일 본문은 응답을 돌려준 뒤에 전송되므로 전송이 끝날 때(close) 줄입니다.
+        _on_body_closed(response, lambda: TRANSFERS_ACTIVE.dec(direction=direction))
+    return response
+
+
+def _on_body_closed(response, callback):
+    """
+    본문 전송이 끝났을 때 callback을 호출합니다. send_file 응답(direct_passthrough)은
+    WSGI 서버가 response.close() 대신 file_wrapper의 close()를 부르므로 그 close를 감쌉니다.
+    file_wrapper 객체를 그대로 두어야 서버가 sendfile을 계속 사용할 수 있습니다.
+    """
+    if not response.direct_passthrough:
+        response.call_on_close(callback)
+        return
+    body = response.response
+    original_close = getattr(body, 'close', None)
+    if original_close is not None:
+        def close():
+            try:
+                original_close()
+            finally:
+                callback()
+        try:
+            body.close = close
+            return
+        except AttributeError:
+            pass # 제너레이터 등 속성을 바꿀 수 없는 본문
+    response.response = ClosingIterator(body, callback)
+
+
+def _teardown_request(exc):
+    # after_request가 실행되지 않은 경우(처리되지 않은 예외)에도 진행 중 전송 수를 되돌립니다.
+    direction = g.pop('_metrics_transfer', None)
+    if direction:
+        TRANSFERS_ACTIVE.dec(direction=direction)
+
+
+# --- 수집 시점 값 ---
+
+def _runtime_samples():
+    from app.core.database import get_pool_stats
+    from app.core.decorators import get_token_cache_stats
+    from app.core.hashing import get_hashing_pool
+    from app.core.metadata_cache import get_metadata_cache_stats
+
+    pool = get_pool_stats()
+    tokens = get_token_cache_stats()
+    hashing = get_hashing_pool().stats()
+    metadata = get_metadata_cache_stats() or {'hits': 0, 'misses': 0, 'size': 0}
+    return [
+        ('sqlite_pool_connections', 'gauge', 'SQLite pool connections by state.',
+         [({"state": "open"}, pool['open']), ({"state": "in_use"}, pool['in_use']), ({"state": "idle"}, pool['idle'])]),
+        ('sqlite_pool_waits_total', 'counter', 'Connection acquisitions that had to wait.', [({}, pool['waited'])]),
+        ('sqlite_pool_timeouts_total', 'counter', 'Connection acquisitions that timed out.', [({}, pool['timeouts'])]),
+        ('token_cache_lookups_total', 'counter', 'Verified-token cache lookups by result.',
+         [({"result": "hit"}, tokens['hits']), ({"result": "miss"}, tokens['misses'])]),
+        ('token_cache_entries', 'gauge', 'Entries in the verified-token cache.', [({}, tokens['size'])]),
+        ('metadata_cache_lookups_total', 'counter', 'File metadata cache lookups by result.',
+         [({"result": "hit"}, metadata['hits']), ({"result": "miss"}, metadata['misses'])]),
+        ('metadata_cache_entries', 'gauge', 'Entries in the file metadata cache.', [({}, metadata['size'])]),
+        ('bcrypt_pool_workers', 'gauge', 'Configured bcrypt worker threads.', [({}, hashing['pool_size'])]),
+    ]
+
+
+REGISTRY.collector(_runtime_samples)
+
+
+def metrics_view():
+    token = current_app.config['METRICS_AUTH_TOKEN']
+    if token:
+        provided = request.headers.get('Authorization', '')
+        if not hmac.compare_digest(provided.encode(), f"Bearer {token}".encode()): # str 비교는 ASCII만 받습니다.
+            return Response("Unauthorized\n", status=401, mimetype='text/plain')
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+
+def init_app(app):
+    if not app.config['METRICS_ENABLED']:
+        return
+    if not app.config['METRICS_AUTH_TOKEN'] and not (app.debug or app.testing):
+        app.logger.warning("METRICS_ENABLED is set but METRICS_AUTH_TOKEN is empty; metrics stay disabled.")
+        return
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
+    app.add_url_rule('/metrics', 'metrics', metrics_view, methods=['GET'])
@@ -0,0 +1,369 @@
+# app/core/migrations.py
+import click
+from flask import current_app
+from app.core.database import get_db
+
+# 버전이 붙은 스키마 마이그레이션.
+# init-db는 테이블을 지우고 schema.sql로 새로 만들지만, 운영 DB는 데이터를 지울 수 없으므로
+# 변경 사항을 여기 순서대로 추가하고 'flask migrate-db'로 아직 적용되지 않은 것만 적용합니다.
+# 적용 이력은 schema_migrations 테이블에 남습니다.
+#
+# 새 마이그레이션을 추가할 때는 schema.sql도 같은 최종 형태로 함께 고쳐야 합니다.
+# (init-db로 만든 새 DB는 모든 마이그레이션이 적용된 것으로 기록됩니다.)
+
+MIGRATIONS = []
+
+
+def migration(version: int, name: str, disable_foreign_keys: bool = False):
+    """마이그레이션 함수를 등록하는 데코레이터. 함수는 트랜잭션 안에서 db를 받아 실행됩니다."""
+    def register(fn):
+        MIGRATIONS.append((version, name, disable_foreign_keys, fn))
+        MIGRATIONS.sort(key=lambda m: m[0])
+        return fn
+    return register
+
+
+def _table_exists(db, table: str) -> bool:
+    return db.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone() is not None
+
+
+def _columns(db, table: str) -> list[str]:
+    return [row['name'] for row in db.execute(f"PRAGMA table_info({table})")]
+
+
+def _add_column_if_missing(db, table: str, column: str, declaration: str) -> None:
+    if column not in _columns(db, table):
+        db.execute(f"ALTER TABLE {table} ADD COLUMN {column} {declaration}")
+
+
+def _rebuild_table(db, table: str, create_sql: str, index_sqls: list[str]) -> None:
+    """
+    SQLite는 외래 키 제약을 ALTER로 바꿀 수 없으므로 새 정의로 테이블을 만들어 데이터를 옮깁니다.
+    create_sql의 '{table}' 자리에 임시 테이블 이름이 들어갑니다. 두 정의에 공통인 컬럼만 복사합니다.
+    """
+    new_table = f"{table}__new"
+    db.execute(create_sql.format(table=new_table))
+    common = [c for c in _columns(db, new_table) if c in _columns(db, table)]
+    column_list = ', '.join(common)
+    db.execute(f"INSERT INTO {new_table} ({column_list}) SELECT {column_list} FROM {table}")
+    db.execute(f"DROP TABLE {table}")
+    db.execute(f"ALTER TABLE {new_table} RENAME TO {table}")
+    for sql in index_sqls:
+        db.execute(sql)
+
+
+# --- 마이그레이션 목록 ---
+
+@migration(1, 'add_content_columns_and_storage_tables')
+def _m001(db):
+    """초기 스키마로 만든 DB에 이후 추가된 컬럼과 테이블(blob, 멀티파트)을 더합니다."""
+    _add_column_if_missing(db, 'files', 'content_hash', 'TEXT')
+    _add_column_if_missing(db, 'files', 'extension', 'TEXT')
+
+    # 확장자 컬럼 채우기 (업로드 코드와 같은 규칙: 마지막 '.' 뒤, 소문자)
+    rows = db.execute("SELECT id, filename FROM files WHERE extension IS NULL").fetchall()
+    db.executemany("UPDATE files SET extension = ? WHERE id = ?", [
+        (row['filename'].rsplit('.', 1)[1].lower() if '.' in row['filename'] else '', row['id'])
+        for row in rows
+    ])
+
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS blobs (
+            hash TEXT PRIMARY KEY,
+            path TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            refcount INTEGER NOT NULL DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS multipart_uploads (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            upload_id TEXT UNIQUE NOT NULL,
+            user_id INTEGER NOT NULL,
+            filename TEXT NOT NULL,
+            status TEXT DEFAULT 'pending',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+    """)
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS upload_parts (
+            upload_id TEXT NOT NULL,
+            part_number INTEGER NOT NULL,
+            size INTEGER NOT NULL,
+            sha256 TEXT NOT NULL,
+            partpath TEXT NOT NULL,
+            uploaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (upload_id, part_number),
+            FOREIGN KEY (upload_id) REFERENCES multipart_uploads (upload_id)
+        )
+    """)
+
+
+# files 테이블의 인덱스. 마이그레이션 3에서 테이블을 다시 만든 뒤에도 그대로 다시 만듭니다.
+_FILES_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_files_content_hash ON files (content_hash)",
+    "CREATE INDEX IF NOT EXISTS idx_files_user_time ON files (user_id, upload_time, id)",
+    "CREATE INDEX IF NOT EXISTS idx_files_user_name ON files (user_id, filename, id)",
+    "CREATE INDEX IF NOT EXISTS idx_files_user_size ON files (user_id, filesize, id)",
+    "CREATE INDEX IF NOT EXISTS idx_files_user_ext_time ON files (user_id, extension, upload_time, id)",
+    "CREATE INDEX IF NOT EXISTS idx_files_user_perm_time ON files (user_id, permission, upload_time, id)",
+]
+
+
+@migration(2, 'add_files_user_indexes')
+def _m002(db):
+    """files.user_id로 시작하는 커버링 인덱스. 목록 조회, 계정 삭제 등 사용자별 쿼리의 전체 스캔을 없앱니다."""
+    for sql in _FILES_INDEXES:
+        db.execute(sql)
+    db.execute("CREATE INDEX IF NOT EXISTS idx_blobs_unreferenced ON blobs (refcount) WHERE refcount <= 0")
+    db.execute("CREATE INDEX IF NOT EXISTS idx_multipart_uploads_user ON multipart_uploads (user_id)")
+
+
+@migration(3, 'cascade_deletes_on_user_and_upload', disable_foreign_keys=True)
+def _m003(db):
+    """
+    사용자 삭제 시 files / multipart_uploads가, 업로드 삭제 시 upload_parts가 함께 지워지도록
+    외래 키에 ON DELETE CASCADE를 붙입니다 (테이블 재생성).
+    """
+    _rebuild_table(db, 'files', """
+        CREATE TABLE {table} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            filename TEXT NOT NULL,
+            extension TEXT,
+            filepath TEXT NOT NULL,
+            filesize INTEGER NOT NULL,
+            upload_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            permission TEXT DEFAULT 'private',
+            access_password_hash TEXT,
+            download_link_id TEXT UNIQUE NOT NULL,
+            content_hash TEXT,
+            FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
+        )
+    """, _FILES_INDEXES)
+    _rebuild_table(db, 'multipart_uploads', """
+        CREATE TABLE {table} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            upload_id TEXT UNIQUE NOT NULL,
+            user_id INTEGER NOT NULL,
+            filename TEXT NOT NULL,
+            status TEXT DEFAULT 'pending',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
+        )
+    """, ["CREATE INDEX IF NOT EXISTS idx_multipart_uploads_user ON multipart_uploads (user_id)"])
+    _rebuild_table(db, 'upload_parts', """
+        CREATE TABLE {table} (
+            upload_id TEXT NOT NULL,
+            part_number INTEGER NOT NULL,
+            size INTEGER NOT NULL,
+            sha256 TEXT NOT NULL,
+            partpath TEXT NOT NULL,
+            uploaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (upload_id, part_number),
+            FOREIGN KEY (upload_id) REFERENCES multipart_uploads (upload_id) ON DELETE CASCADE
+        )
+    """, [])
+
+
+@migration(4, 'add_user_quota_and_usage')
+def _m004(db):
+    """사용자별 할당량 컬럼과 사용량 테이블을 추가하고, 기존 파일로 사용량을 채웁니다."""
+    _add_column_if_missing(db, 'users', 'quota_bytes', 'INTEGER')
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS user_usage (
+            user_id INTEGER PRIMARY KEY,
+            bytes_used INTEGER NOT NULL DEFAULT 0,
+            file_count INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
+        )
+    """)
+    db.execute("""
+        INSERT OR REPLACE INTO user_usage (user_id, bytes_used, file_count)
+        SELECT user_id, SUM(filesize), COUNT(*) FROM files GROUP BY user_id
+    """)
+
+
+@migration(5, 'add_deletion_queue')
+def _m005(db):
+    """계정 삭제 등에서 파일을 요청 밖에서 지우기 위한 지연 삭제 큐."""
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS deletion_queue (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            path TEXT NOT NULL,
+            reason TEXT,
+            enqueued_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            last_error TEXT
+        )
+    """)
+
+
+@migration(6, 'add_compression_columns')
+def _m006(db):
+    """저장 시 압축 codec과 압축 후 크기. 기존 객체는 모두 원본이므로 NULL(원본)로 둡니다."""
+    for table in ('files', 'blobs'):
+        _add_column_if_missing(db, table, 'codec', 'TEXT')
+        _add_column_if_missing(db, table, 'stored_size', 'INTEGER')
+
+
+@migration(7, 'add_files_fts')
+def _m007(db):
+    """파일 검색용 FTS5 색인과 동기화 트리거. 기존 파일 이름을 채우며, 본문은 'flask reindex-search'로 채웁니다."""
+    db.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS files_fts USING fts5(
+            filename,
+            body,
+            tokenize = 'unicode61 remove_diacritics 2',
+            prefix = '2 3'
+        )
+    """)
+    db.execute("""
+        CREATE TRIGGER IF NOT EXISTS files_fts_after_insert AFTER INSERT ON files BEGIN
+            INSERT INTO files_fts (rowid, filename, body) VALUES (new.id, new.filename, '');
+        END
+    """)
+    db.execute("""
+        CREATE TRIGGER IF NOT EXISTS files_fts_after_delete AFTER DELETE ON files BEGIN
+            DELETE FROM files_fts WHERE rowid = old.id;
+        END
+    """)
+    db.execute("""
+        CREATE TRIGGER IF NOT EXISTS files_fts_after_rename AFTER UPDATE OF filename ON files BEGIN
+            UPDATE files_fts SET filename = new.filename WHERE rowid = new.id;
+        END
+    """)
+    db.execute("DELETE FROM files_fts")
+    db.execute("INSERT INTO files_fts (rowid, filename, body) SELECT id, filename, '' FROM files")
+
+
+@migration(8, 'add_revoked_tokens')
+def _m008(db):
+    """로그아웃 / 계정 삭제로 폐기한 JWT 기록. 이전에는 프로세스 메모리에만 있었으므로 옮길 데이터는 없습니다."""
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS revoked_tokens (
+            key TEXT PRIMARY KEY,
+            expires_at REAL NOT NULL
+        )
+    """)
+    db.execute("CREATE INDEX IF NOT EXISTS idx_revoked_tokens_expires ON revoked_tokens (expires_at)")
+
+
+@migration(9, 'add_blob_gc_claims')
+def _m009(db):
+    """gc_blobs()가 잠금 밖에서 객체를 지우는 동안 그 blob 행을 표시하는 컬럼. 기존 행은 표시 없음(NULL)."""
+    _add_column_if_missing(db, 'blobs', 'gc_claimed_at', 'REAL')
+
+
+@migration(10, 'add_deletion_queue_claims')
+def _m010(db):
+    """reaper가 잠금 밖에서 지우는 동안 삭제 큐 항목을 표시하는 컬럼. 기존 항목은 표시 없음(NULL)."""
+    _add_column_if_missing(db, 'deletion_queue', 'claimed_at', 'REAL')
+
+
+@migration(11, 'add_revoked_tokens_seq')
+def _m011(db):
+    """
+    워커가 폐기 목록을 메모리에 두고 새 기록만 읽을 수 있도록 revoked_tokens에 AUTOINCREMENT seq를 더합니다.
+    기존 기록은 옮기면서 seq가 매겨집니다.
+    """
+    _rebuild_table(db, 'revoked_tokens', """
+        CREATE TABLE {table} (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            key TEXT NOT NULL UNIQUE,
+            expires_at REAL NOT NULL
+        )
+    """, ["CREATE INDEX IF NOT EXISTS idx_revoked_tokens_expires ON revoked_tokens (expires_at)"])
+
+
+# --- 실행기 ---
+
+def _ensure_migrations_table(db) -> None:
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    db.commit()
+
+
+def applied_versions(db) -> set[int]:
+    _ensure_migrations_table(db)
+    return {row['version'] for row in db.execute("SELECT version FROM schema_migrations")}
+
+
+def stamp_all(db) -> None:
+    """schema.sql로 새로 만든 DB에 모든 마이그레이션이 적용된 것으로 기록합니다."""
+    _ensure_migrations_table(db)
+    db.executemany("INSERT OR IGNORE INTO schema_migrations (version, name) VALUES (?, ?)",
+                   [(version, name) for version, name, _, _ in MIGRATIONS])
+    db.commit()
+
+
+def apply_migrations(db, target: int | None = None) -> list[tuple[int, str]]:
+    """
+    아직 적용되지 않은 마이그레이션을 버전 순서대로 하나씩 각자의 트랜잭션에서 적용합니다.
+    실패하면 그 마이그레이션만 롤백되고 예외가 올라갑니다. 적용한 (버전, 이름) 목록을 반환합니다.
+    """
+    done = applied_versions(db)
+    applied = []
+    for version, name, disable_foreign_keys, fn in MIGRATIONS:
+        if version in done or (target is not None and version > target):
+            continue
+        if disable_foreign_keys:
+            # 트랜잭션 안에서는 foreign_keys를 바꿀 수 없으므로 BEGIN 전에 끕니다.
+            db.execute("PRAGMA foreign_keys=OFF")
+        try:
+            db.execute("BEGIN IMMEDIATE")
+            fn(db)
+            if disable_foreign_keys:
+                violations = db.execute("PRAGMA foreign_key_check").fetchall()
+                if violations:
+                    raise RuntimeError(f"Migration {version} would leave {len(violations)} foreign key violation(s), "
+                                       f"e.g. table '{violations[0][0]}' rowid {violations[0][1]}.")
+            db.execute("INSERT INTO schema_migrations (version, name) VALUES (?, ?)", (version, name))
+            db.commit()
+        except Exception:
+            if db.in_transaction:
+                db.rollback()
+            raise
+        finally:
+            if disable_foreign_keys:
+                db.execute("PRAGMA foreign_keys=ON")
+        current_app.logger.info(f"Applied schema migration {version:04d}_{name}.")
+        applied.append((version, name))
+    return applied
+
+
+@click.command('migrate-db')
+@click.option('--status', 'show_status', is_flag=True, help='List migrations and whether they are applied.')
+@click.option('--target', type=int, default=None, help='Apply migrations up to this version only.')
+def migrate_db_command(show_status, target):
+    """Apply pending schema migrations without dropping data."""
+    db = get_db()
+    if show_status:
+        done = applied_versions(db)
+        for version, name, _, _ in MIGRATIONS:
+            click.echo(f"[{'x' if version in done else ' '}] {version:04d}_{name}")
+        return
+    try:
+        applied = apply_migrations(db, target)
+    except Exception as e:
+        click.echo(f'Migration failed: {e}')
+        current_app.logger.error(f'Schema migration failed: {e}', exc_info=True)
+        raise SystemExit(1)
+    if not applied:
+        click.echo('Database schema is up to date.')
+    for version, name in applied:
+        click.echo(f'Applied {version:04d}_{name}')
+
+
+def init_app(app):
+    app.cli.add_command(migrate_db_command)
@@ -0,0 +1,114 @@
+# app/core/profiling.py
+import collections
+import cProfile
+import datetime
+import hmac
+import os
+import random
+import sys
+import threading
+from flask import current_app, g, request
+
+# 운영 중 요청 프로파일링 (PROFILING_ENABLED).
+# 일부 요청만 골라 프로파일링하고 결과를 instance/profiles/<엔드포인트>/ 아래에 남깁니다.
+# - 'sampling': 별도 스레드가 PROFILING_INTERVAL_MS마다 요청 스레드의 스택을 읽어 세는 방식.
+#   요청 코드에 훅을 걸지 않으므로 부하가 작고, 결과는 flamegraph.pl / speedscope가 읽는
+#   collapsed 형식('프레임;프레임;... 횟수')입니다.
+# - 'cprofile': 함수 호출마다 기록하는 결정적 프로파일러. 정확하지만 느리며 결과는 pstats 파일입니다.
+
+
+class StackSampler:
+    """한 스레드의 호출 스택을 일정 간격으로 샘플링합니다."""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts = collections.Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profiler-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.counts[';'.join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def dump(self, path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.counts.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+def _requested_by_header() -> bool:
+    token = current_app.config['PROFILING_TOKEN']
+    provided = request.headers.get(current_app.config['PROFILING_HEADER'])
+    return bool(token and provided and hmac.compare_digest(provided.encode(), token.encode())) # str 비교는 ASCII만 받습니다.
+
+
+def _output_path(extension: str) -> str:
+    endpoint = (request.endpoint or 'unmatched').replace('/', '_')
+    directory = os.path.join(current_app.instance_path, 'profiles', endpoint)
+    os.makedirs(directory, exist_ok=True)
+    stamp = datetime.datetime.now().strftime('%Y%m%dT%H%M%S.%f')
+    return os.path.join(directory, f"{stamp}-{os.getpid()}.{extension}")
+
+
+def _before_request():
+    by_header = _requested_by_header()
+    rate = current_app.config['PROFILING_SAMPLE_RATE']
+    if not by_header and not (rate > 0 and random.random() < rate):
+        return
+    if current_app.config['PROFILING_MODE'] == 'cprofile':
+        profiler = cProfile.Profile()
+        profiler.enable()
+        g._profile = ('cprofile', profiler, _output_path('pstats'))
+    else:
+        sampler = StackSampler(threading.get_ident(), current_app.config['PROFILING_INTERVAL_MS'] / 1000.0)
+        sampler.start()
+        g._profile = ('sampling', sampler, _output_path('collapsed'))
+    g._profile_by_header = by_header
+
+
+def _after_request(response):
+    # 헤더로 요청한 경우 결과 파일 이름을 알려줍니다 (파일은 요청이 끝날 때 기록됨).
+    profile = g.get('_profile')
+    if profile and g.get('_profile_by_header'):
+        response.headers['X-Profile-File'] = os.path.relpath(profile[2], current_app.instance_path)
+    return response
+
+
+def _teardown_request(exc):
+    profile = g.pop('_profile', None)
+    if profile is None:
+        return
+    mode, profiler, path = profile
+    try:
+        if mode == 'cprofile':
+            profiler.disable()
+            profiler.dump_stats(path)
+        else:
+            profiler.stop()
+            profiler.dump(path)
+        current_app.logger.info(f"Wrote {mode} profile for {request.method} {request.path} to {path}")
+    except OSError as e:
+        current_app.logger.error(f"Could not write profile to {path}: {e}")
+
+
+def init_app(app):
+    if not app.config['PROFILING_ENABLED']:
+        return
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
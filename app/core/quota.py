@@ -0,0 +1,138 @@
+# app/core/quota.py
+import click
+from flask import current_app
+from app.core.database import get_db
+
+# 사용자별 저장 용량 할당량(quota).
+# 사용량은 user_usage 테이블에 files INSERT/DELETE와 같은 트랜잭션에서 증감하므로
+# SUM(filesize) 집계 없이 바로 읽을 수 있습니다. 할당량은 논리 크기(filesize) 기준이며,
+# 내용이 중복 제거된 파일도 각 사용자의 사용량에 포함됩니다.
+# users.quota_bytes가 NULL이면 DEFAULT_USER_QUOTA_BYTES를 쓰고, 0 이하는 무제한입니다.
+
+
+class QuotaExceeded(Exception):
+    """업로드가 사용자의 남은 할당량을 넘을 때 발생합니다."""
+
+    def __init__(self, quota: int, used: int):
+        super().__init__(f"Storage quota of {quota} bytes exceeded ({used} bytes in use).")
+        self.quota = quota
+        self.used = used
+
+
+def get_usage(db, user_id: int) -> dict:
+    """{'bytes_used', 'file_count', 'quota_bytes'(무제한이면 None)}를 반환합니다."""
+    row = db.execute("""
+        SELECT u.quota_bytes, COALESCE(uu.bytes_used, 0) AS bytes_used, COALESCE(uu.file_count, 0) AS file_count
+        FROM users u LEFT JOIN user_usage uu ON uu.user_id = u.id
+        WHERE u.id = ?
+    """, (user_id,)).fetchone()
+    if row is None:
+        return {"bytes_used": 0, "file_count": 0, "quota_bytes": None}
+    quota = row['quota_bytes'] if row['quota_bytes'] is not None else current_app.config['DEFAULT_USER_QUOTA_BYTES']
+    return {
+        "bytes_used": row['bytes_used'],
+        "file_count": row['file_count'],
+        "quota_bytes": quota if quota > 0 else None,
+    }
+
+
+def remaining_quota(db, user_id: int) -> int | None:
+    """남은 바이트 수(음수면 0), 무제한이면 None. 업로드 스트리밍 전 상한을 정하는 데 씁니다."""
+    usage = get_usage(db, user_id)
+    if usage['quota_bytes'] is None:
+        return None
+    return max(usage['quota_bytes'] - usage['bytes_used'], 0)
+
+
+def add_usage(db, user_id: int, bytes_delta: int, files_delta: int) -> None:
+    """사용량을 증감합니다. 호출한 쪽의 트랜잭션 안에서 실행되며 commit은 호출한 쪽이 합니다."""
+    db.execute("""
+        INSERT INTO user_usage (user_id, bytes_used, file_count) VALUES (?, ?, ?)
+        ON CONFLICT(user_id) DO UPDATE SET
+            bytes_used = bytes_used + excluded.bytes_used,
+            file_count = file_count + excluded.file_count,
+            updated_at = CURRENT_TIMESTAMP
+    """, (user_id, bytes_delta, files_delta))
+
+
+def charge_upload(db, user_id: int, size: int) -> None:
+    """
+    새 파일 크기를 사용량에 더하고, 할당량을 넘으면 QuotaExceeded를 올립니다 (호출한 쪽이 rollback).
+    쓰기 트랜잭션 안에서 더한 뒤 확인하므로 동시 업로드끼리도 할당량을 넘지 못합니다.
+    """
+    add_usage(db, user_id, size, 1)
+    usage = get_usage(db, user_id)
+    if usage['quota_bytes'] is not None and usage['bytes_used'] > usage['quota_bytes']:
+        raise QuotaExceeded(usage['quota_bytes'], usage['bytes_used'] - size)
+
+
+def reconcile_usage(user_id: int | None = None) -> list[dict]:
+    """
+    user_usage를 files 테이블 기준으로 다시 계산해 어긋난 값을 바로잡습니다.
+    바로잡은 사용자 목록({user_id, bytes_used, expected_bytes, file_count, expected_files})을 반환합니다.
+    """
+    db = get_db()
+    where = "WHERE u.id = ?" if user_id is not None else ""
+    params = (user_id,) if user_id is not None else ()
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        drifted = [dict(row) for row in db.execute(f"""
+            SELECT u.id AS user_id,
+                   COALESCE(uu.bytes_used, 0) AS bytes_used, COALESCE(f.total, 0) AS expected_bytes,
+                   COALESCE(uu.file_count, 0) AS file_count, COALESCE(f.n, 0) AS expected_files
+            FROM users u
+            LEFT JOIN user_usage uu ON uu.user_id = u.id
+            LEFT JOIN (SELECT user_id, SUM(filesize) AS total, COUNT(*) AS n FROM files GROUP BY user_id) f
+                ON f.user_id = u.id
+            {where}
+        """, params)]
+        drifted = [d for d in drifted
+                   if d['bytes_used'] != d['expected_bytes'] or d['file_count'] != d['expected_files']]
+        db.executemany("""
+            INSERT INTO user_usage (user_id, bytes_used, file_count) VALUES (?, ?, ?)
+            ON CONFLICT(user_id) DO UPDATE SET
+                bytes_used = excluded.bytes_used, file_count = excluded.file_count, updated_at = CURRENT_TIMESTAMP
+        """, [(d['user_id'], d['expected_bytes'], d['expected_files']) for d in drifted])
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return drifted
+
+
+@click.command('reconcile-usage')
+@click.option('--user-id', type=int, default=None, help='Only reconcile this user.')
+def reconcile_usage_command(user_id):
+    """Recompute per-user storage usage from the files table."""
+    drifted = reconcile_usage(user_id)
+    for d in drifted:
+        click.echo(f"user {d['user_id']}: {d['bytes_used']} -> {d['expected_bytes']} bytes, "
+                   f"{d['file_count']} -> {d['expected_files']} files")
+    click.echo(f'Reconciled {len(drifted)} user(s).')
+    if drifted:
+        current_app.logger.warning(f'Usage reconcile corrected drift for {len(drifted)} user(s).')
+
+
+@click.command('set-quota')
+@click.argument('username')
+@click.argument('quota')
+def set_quota_command(username, quota):
+    """Set a user's quota in bytes ('default' to use DEFAULT_USER_QUOTA_BYTES, 0 for unlimited)."""
+    if quota.lower() == 'default':
+        value = None
+    elif quota.isascii() and quota.isdigit():
+        value = int(quota)
+    else:
+        raise click.BadParameter(f"'{quota}' is not a non-negative number of bytes or 'default'.", param_hint="'QUOTA'")
+    db = get_db()
+    cursor = db.execute("UPDATE users SET quota_bytes = ? WHERE username = ?", (value, username.lower()))
+    db.commit()
+    if cursor.rowcount == 0:
+        click.echo(f"User '{username}' not found.")
+        raise SystemExit(1)
+    click.echo(f"Quota for '{username}' set to {quota}.")
+
+
+def init_app(app):
+    app.cli.add_command(reconcile_usage_command)
+    app.cli.add_command(set_quota_command)
@@ -0,0 +1,225 @@
+# app/core/reaper.py
+import os
+import shutil
+import threading
+import time
+import click
+from flask import current_app
+from app.core.blobstore import gc_blobs, is_blob_path
+from app.core.database import get_db
+from app.core.storage import get_storage
+from app.core.thumbnails import derived_source_hash, is_derived_path
+from app.core.utils import resolve_upload_path
+
+# 지연 삭제 큐와 고아 파일 정리.
+# 요청 안에서 파일을 지우는 대신 지울 경로를 deletion_queue에 DB 변경과 같은 트랜잭션으로 기록하고,
+# 'flask reap-deletions' 또는 백그라운드 스레드가 배치 단위로, 초당 삭제 수를 제한하며 지웁니다.
+# 기록이 남아 있으므로 프로세스가 중간에 죽어도 다음 실행에서 이어서 지웁니다.
+
+# 가져간 항목의 표시(claimed_at)가 이보다 오래되면 중간에 멈춘 실행으로 보고 다시 가져갑니다 (초).
+DELETION_CLAIM_TIMEOUT = 3600
+
+
+def enqueue_deletions(db, relpaths, reason: str) -> None:
+    """UPLOAD_FOLDER 기준 경로(파일 또는 디렉토리)를 삭제 큐에 넣습니다 (commit은 호출한 쪽)."""
+    db.executemany("INSERT INTO deletion_queue (path, reason) VALUES (?, ?)",
+                   [(relpath, reason) for relpath in relpaths])
+
+
+def _remove_path(relpath: str) -> None:
+    # 디렉토리(멀티파트 파트 등)와 업로드 임시 파일은 UPLOAD_FOLDER 작업 공간에, 나머지는 저장소 드라이버에 있습니다.
+    abs_path = resolve_upload_path(relpath)
+    if os.path.isdir(abs_path) and not os.path.islink(abs_path):
+        shutil.rmtree(abs_path)
+        return
+    if not get_storage().delete(relpath):
+        try:
+            os.remove(abs_path)
+        except FileNotFoundError:
+            pass
+
+
+def process_deletion_queue(batch_size: int = 100, max_per_second: float = 0, max_batches: int | None = None) -> dict:
+    """
+    삭제 큐를 오래된 것부터 배치 단위로 처리합니다. max_per_second > 0이면 배치 사이에 쉬어서
+    초당 삭제 수를 제한합니다. 실패한 항목은 attempts / last_error를 남기고 다음 실행에서 다시 시도합니다.
+
+    쓰기 잠금은 배치를 가져올 때(claimed_at 표시)와 결과를 기록할 때만 짧게 잡고, 디렉토리 rmtree와
+    저장소 삭제(원격 드라이버면 네트워크 요청)는 그 사이 잠금 없이 합니다. 가져온 뒤 프로세스가 죽으면
+    표시가 DELETION_CLAIM_TIMEOUT보다 오래된 항목을 다음 실행이 다시 가져갑니다.
+    blob 경로는 가져올 때 blobs 테이블에서 아직 쓰이는지 확인하고, 쓰이면 지우지 않고 큐에서만 뺍니다.
+    새 blob 객체는 항상 새 키에 놓이므로(blob_relpath) 그 뒤에 같은 경로가 다시 쓰이는 일은 없습니다.
+    """
+    db = get_db()
+    stats = {"deleted": 0, "skipped": 0, "failed": 0}
+    last_id = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        started = time.monotonic()
+        claimed_at = time.time()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            rows = db.execute("""
+                SELECT id, path FROM deletion_queue
+                WHERE id > ? AND (claimed_at IS NULL OR claimed_at < ?)
+                ORDER BY id LIMIT ?
+            """, (last_id, claimed_at - DELETION_CLAIM_TIMEOUT, batch_size)).fetchall()
+            if not rows:
+                db.commit()
+                break
+            last_id = rows[-1]['id']
+            in_use = [row for row in rows if is_blob_path(row['path']) and db.execute(
+                "SELECT 1 FROM blobs WHERE path = ?", (row['path'],)).fetchone()]
+            claimed = [row for row in rows if row not in in_use]
+            db.executemany("DELETE FROM deletion_queue WHERE id = ?", [(row['id'],) for row in in_use])
+            db.executemany("UPDATE deletion_queue SET claimed_at = ? WHERE id = ?",
+                           [(claimed_at, row['id']) for row in claimed])
+            db.commit()
+        except Exception:
+            if db.in_transaction:
+                db.rollback()
+            raise
+        stats["skipped"] += len(in_use) # 다시 참조되는 blob
+
+        done_ids = []
+        failures = []
+        for row in claimed:
+            try:
+                _remove_path(row['path'])
+            except Exception as e: # 로컬 OSError / 잘못된 경로 ValueError / 원격 저장소 오류
+                failures.append((str(e), row['id']))
+                current_app.logger.error(f"Deferred deletion of '{row['path']}' failed: {e}")
+                continue
+            done_ids.append((row['id'],))
+        stats["deleted"] += len(done_ids)
+        stats["failed"] += len(failures)
+
+        try:
+            db.executemany("DELETE FROM deletion_queue WHERE id = ?", done_ids)
+            # 실패한 항목은 표시를 풀어 큐에 되돌립니다.
+            db.executemany("""
+                UPDATE deletion_queue SET attempts = attempts + 1, last_error = ?, claimed_at = NULL WHERE id = ?
+            """, failures)
+            db.commit()
+        except Exception:
+            if db.in_transaction:
+                db.rollback()
+            raise
+        batches += 1
+        if max_per_second > 0:
+            time.sleep(max(len(rows) / max_per_second - (time.monotonic() - started), 0))
+    return stats
+
+
+def scan_orphans(grace_seconds: int = 3600, fix: bool = False) -> dict:
+    """
+    저장소 드라이버의 객체 목록과 DB(files.filepath, blobs.path)를 양방향으로 대조합니다.
+    - orphan_files: 디스크에는 있지만 어떤 레코드도 가리키지 않는 파일 (fix=True면 삭제 큐에 넣음)
+    - missing_files / missing_blobs: 레코드는 있지만 디스크에 없는 경로 (보고만 함)
+    파생 자산(derived/, 썸네일)은 원본 내용이 남아 있으면 정상으로, 없으면 고아로 봅니다.
+    업로드 중인 임시 파일과 방금 만든 파일은 grace_seconds보다 오래된 것만 고아로 봅니다.
+    멀티파트 파트 디렉토리는 'flask reap-multipart'가 담당하므로 드라이버가 목록에서 뺍니다.
+    """
+    db = get_db()
+    file_rows = db.execute("SELECT filepath, content_hash FROM files").fetchall()
+    file_paths = {row[0] for row in file_rows}
+    blob_rows = db.execute("SELECT hash, path FROM blobs").fetchall()
+    blob_paths = {row[1] for row in blob_rows}
+    # 파생 자산의 원본이 아직 있는지: blob 해시 + blob 도입 이전 개별 파일의 내용 해시
+    source_hashes = {row[0] for row in blob_rows} | {row[1] for row in file_rows if row[1]}
+    queued = {row[0] for row in db.execute("SELECT path FROM deletion_queue")}
+    known = file_paths | blob_paths
+
+    cutoff = time.time() - grace_seconds
+    orphans = []
+    seen = set()
+    for relpath, stat in get_storage().iter_objects():
+        if relpath in seen:
+            continue # tiered: 옮기는 중이라 두 볼륨에 모두 있는 객체
+        seen.add(relpath)
+        if relpath in known or relpath in queued or stat.mtime > cutoff:
+            continue
+        if is_derived_path(relpath) and derived_source_hash(relpath) in source_hashes:
+            continue
+        orphans.append(relpath)
+
+    if fix and orphans:
+        enqueue_deletions(db, orphans, 'orphan')
+        db.commit()
+
+    return {
+        "orphan_files": orphans,
+        "missing_files": sorted(p for p in file_paths - seen if not is_blob_path(p)),
+        "missing_blobs": sorted(blob_paths - seen),
+    }
+
+
+def _reaper_loop(app):
+    interval = app.config['DELETION_REAPER_INTERVAL']
+    while True:
+        time.sleep(interval)
+        with app.app_context():
+            try:
+                stats = process_deletion_queue(
+                    batch_size=app.config['DELETION_REAPER_BATCH_SIZE'],
+                    max_per_second=app.config['DELETION_REAPER_MAX_PER_SECOND'],
+                )
+                removed_blobs = gc_blobs(app.config['DELETION_REAPER_BATCH_SIZE'])
+                if stats["deleted"] or stats["failed"] or removed_blobs:
+                    app.logger.info(f"Background reaper: {stats}, {removed_blobs} unreferenced blob(s) removed.")
+            except Exception as e:
+                app.logger.error(f"Background reaper run failed: {e}", exc_info=True)
+
+
+_thread_lock = threading.Lock()
+
+
+def _start_reaper_thread():
+    app = current_app._get_current_object()
+    if app.extensions.get('reaper_pid') == os.getpid():
+        return
+    with _thread_lock:
+        if app.extensions.get('reaper_pid') == os.getpid():
+            return
+        app.extensions['reaper_pid'] = os.getpid() # fork된 워커마다 하나씩
+        threading.Thread(target=_reaper_loop, args=(app,), name='deletion-reaper', daemon=True).start()
+
+
+@click.command('reap-deletions')
+@click.option('--batch-size', type=int, default=None, help='Paths deleted per transaction.')
+@click.option('--max-per-second', type=float, default=None, help='Deletion rate limit (0 = unlimited).')
+@click.option('--gc/--no-gc', 'run_gc', default=True, help='Also delete unreferenced blobs.')
+def reap_deletions_command(batch_size, max_per_second, run_gc):
+    """Delete files queued for deferred deletion."""
+    batch_size = batch_size or current_app.config['DELETION_REAPER_BATCH_SIZE']
+    if max_per_second is None:
+        max_per_second = current_app.config['DELETION_REAPER_MAX_PER_SECOND']
+    stats = process_deletion_queue(batch_size=batch_size, max_per_second=max_per_second)
+    click.echo(f"Deleted {stats['deleted']} path(s), skipped {stats['skipped']}, {stats['failed']} failed.")
+    if run_gc:
+        click.echo(f'Removed {gc_blobs(batch_size)} unreferenced blob(s).')
+
+
+@click.command('scan-orphans')
+@click.option('--grace-seconds', type=int, default=3600, help='Ignore files modified more recently than this.')
+@click.option('--fix', is_flag=True, help='Queue orphaned files for deletion.')
+def scan_orphans_command(grace_seconds, fix):
+    """Compare the object storage with the database and report orphans in both directions."""
+    report = scan_orphans(grace_seconds=grace_seconds, fix=fix)
+    for relpath in report['orphan_files']:
+        click.echo(f"orphan  {relpath}")
+    for relpath in report['missing_files'] + report['missing_blobs']:
+        click.echo(f"missing {relpath}")
+    action = ' (queued for deletion)' if fix else ''
+    click.echo(f"{len(report['orphan_files'])} orphaned file(s){action}, "
+               f"{len(report['missing_files'])} file record(s) and {len(report['missing_blobs'])} blob(s) missing on disk.")
+    current_app.logger.info(f"Orphan scan: {len(report['orphan_files'])} orphaned, "
+                            f"{len(report['missing_files']) + len(report['missing_blobs'])} missing (fix={fix}).")
+
+
+def init_app(app):
+    app.cli.add_command(reap_deletions_command)
+    app.cli.add_command(scan_orphans_command)
+    if app.config['DELETION_REAPER_INTERVAL'] > 0 and not app.testing:
+        # CLI 명령에서는 스레드를 띄우지 않도록 첫 요청에서 시작합니다.
+        app.before_request(_start_reaper_thread)
@@ -0,0 +1,95 @@
+# app/core/search.py
+import re
+import sqlite3
+import click
+from flask import current_app
+from app.core.compression import open_original
+from app.core.database import get_db
+from app.core.storage import get_storage
+
+# 파일 이름 / 본문 전문 검색 (GET /api/files/search).
+# files_fts는 SQLite FTS5 테이블이며 rowid가 files.id입니다.
+# - filename: files의 INSERT / DELETE / 이름 변경 트리거가 맞춥니다 (schema.sql, 마이그레이션 7).
+# - body    : SEARCH_TEXT_EXTENSIONS 형식의 앞부분 SEARCH_TEXT_MAX_BYTES를 업로드 트랜잭션에서 채웁니다.
+#             기존 파일은 'flask reindex-search'로 채웁니다.
+# 검색어의 단어마다 접두사 검색("보고"*)을 하고, 이름이 본문보다 SEARCH_FILENAME_WEIGHT배 무겁게 bm25로 순위를 매깁니다.
+MAX_QUERY_TERMS = 16
+_TERM_RE = re.compile(r'\w+')
+
+
+def text_extension(filename: str) -> bool:
+    """본문을 색인할 형식인지 확인합니다."""
+    ext = filename.rsplit('.', 1)[1].lower() if '.' in filename else ''
+    return ext in current_app.config['SEARCH_TEXT_EXTENSIONS']
+
+
+def extract_text(fileobj) -> str:
+    """스트림 앞부분 SEARCH_TEXT_MAX_BYTES를 UTF-8 텍스트로 읽습니다. 잘린 마지막 글자와 잘못된 바이트는 버립니다."""
+    data = fileobj.read(current_app.config['SEARCH_TEXT_MAX_BYTES'])
+    return data.decode('utf-8', errors='ignore')
+
+
+def set_indexed_text(db, file_id: int, text: str) -> None:
+    """files_fts의 본문을 바꿉니다. 호출한 쪽의 트랜잭션에서 실행됩니다."""
+    db.execute("UPDATE files_fts SET body = ? WHERE rowid = ?", (text, file_id))
+
+
+def build_match_query(query: str, filename_only: bool = False) -> str | None:
+    """
+    사용자 검색어를 FTS5 MATCH 식으로 바꿉니다. 단어마다 따옴표로 감싸 FTS5 문법 문자를 무력화하고 접두사(*) 검색을 붙입니다.
+    단어가 없으면 None.
+    """
+    terms = _TERM_RE.findall(query)[:MAX_QUERY_TERMS]
+    if not terms:
+        return None
+    expression = ' '.join(f'"{term}"*' for term in terms)
+    return f"filename : ({expression})" if filename_only else expression
+
+
+def reindex_search(db) -> tuple[int, int]:
+    """
+    files_fts를 files에서 다시 만들고, 본문 색인 대상 파일은 저장소에서 (압축을 풀어) 읽어 본문을 채웁니다.
+    (색인한 파일 수, 본문을 채운 파일 수)를 반환합니다.
+    """
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        db.execute("DELETE FROM files_fts")
+        db.execute("INSERT INTO files_fts (rowid, filename, body) SELECT id, filename, '' FROM files")
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    indexed = db.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+    storage = get_storage()
+    with_text = 0
+    rows = db.execute("SELECT id, filename, filepath, filesize, codec FROM files").fetchall()
+    for row in rows:
+        if not text_extension(row['filename']):
+            continue
+        try:
+            with open_original(storage, row['filepath'], row['codec'], row['filesize']) as f:
+                text = extract_text(f)
+        except Exception as e: # 없는 객체 / 원격 저장소 오류는 그 파일만 건너뜁니다.
+            current_app.logger.warning(f"Could not read '{row['filepath']}' to index file {row['id']}: {e}")
+            continue
+        set_indexed_text(db, row['id'], text)
+        db.commit()
+        with_text += 1
+    return indexed, with_text
+
+
+@click.command('reindex-search')
+def reindex_search_command():
+    """Rebuild the full-text search index from the files table and stored text content."""
+    try:
+        indexed, with_text = reindex_search(get_db())
+    except sqlite3.Error as e:
+        click.echo(f'Reindex failed: {e}')
+        current_app.logger.error(f'Search reindex failed: {e}', exc_info=True)
+        raise SystemExit(1)
+    click.echo(f'Indexed {indexed} file(s); extracted text from {with_text}.')
+
+
+def init_app(app):
+    app.cli.add_command(reindex_search_command)
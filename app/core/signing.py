@@ -0,0 +1,101 @@
+# app/core/signing.py
+import base64
+import hashlib
+import hmac
+import json
+import time
+from flask import current_app
+
+# 서명된 단기 다운로드 URL.
+# 비밀번호(또는 소유자 JWT)를 한 번 확인한 뒤, 객체 경로와 만료 시각을 담은 토큰을 HMAC-SHA256으로
+# 서명해 돌려줍니다. 토큰 검증은 상수 시간 HMAC 비교뿐이므로 이어지는 Range/재시도 요청은
+# SQLite 조회나 bcrypt 없이 처리됩니다. 토큰은 만료 전까지 유효하므로 권한 변경·삭제가
+# 즉시 반영되지 않습니다 (SIGNED_URL_MAX_TTL_SECONDS로 그 기간을 제한).
+
+
+class SignatureError(Exception):
+    """토큰 형식이 잘못되었거나 서명이 맞지 않을 때 발생합니다."""
+
+
+class SignatureExpired(SignatureError):
+    """서명은 맞지만 만료 시각이 지났을 때 발생합니다."""
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+
+def _signing_key() -> bytes:
+    # SECRET_KEY를 그대로 쓰지 않고 용도별 키를 파생해 JWT 서명과 분리합니다.
+    secret = current_app.config['SECRET_KEY'].encode('utf-8')
+    return hmac.new(secret, b'signed-download-url', hashlib.sha256).digest()
+
+
+def _mac(payload: bytes) -> str:
+    return _b64encode(hmac.new(_signing_key(), payload, hashlib.sha256).digest())
+
+
+def resolve_ttl(requested) -> int:
+    """요청한 유효 기간(초)을 설정된 기본값/최대값 범위로 맞춥니다. 잘못된 값이면 ValueError."""
+    default_ttl = current_app.config['SIGNED_URL_TTL_SECONDS']
+    max_ttl = current_app.config['SIGNED_URL_MAX_TTL_SECONDS']
+    if requested is None or requested == '':
+        return min(default_ttl, max_ttl)
+    ttl = int(requested)
+    if ttl <= 0:
+        raise ValueError("ttl must be positive")
+    return min(ttl, max_ttl)
+
+
+def sign_download(filepath: str, filename: str, content_hash: str | None, upload_time, ttl: int,
+                  codec: str | None = None, filesize: int | None = None) -> tuple[str, int]:
+    """다운로드 토큰과 만료 시각(unix time)을 반환합니다. 압축해 저장한 파일은 codec과 원본 크기를 함께 담습니다."""
+    expires_at = int(time.time()) + ttl
+    claims = {
+        "p": filepath,
+        "n": filename,
+        "h": content_hash,
+        "t": str(upload_time) if upload_time is not None else None,
+        "e": expires_at,
+    }
+    if codec:
+        claims["c"] = codec
+        claims["s"] = filesize
+    payload = _b64encode(json.dumps(claims, separators=(',', ':'), ensure_ascii=False).encode('utf-8'))
+    return f"{payload}.{_mac(payload.encode('ascii'))}", expires_at
+
+
+def verify_download(token: str) -> dict:
+    """
+    토큰을 검증하고 {filepath, filename, content_hash, upload_time, codec, filesize, expires_at}를 반환합니다.
+    서명이 맞지 않으면 SignatureError, 만료되었으면 SignatureExpired.
+    """
+    payload, sep, signature = token.partition('.')
+    if not sep or not payload or not signature:
+        raise SignatureError("Malformed token.")
+    # URL에서 온 토큰은 ASCII가 아닐 수 있으므로 bytes로 바꿔 비교합니다 (str 비교는 ASCII만 받습니다).
+    try:
+        valid = hmac.compare_digest(signature.encode('utf-8'), _mac(payload.encode('utf-8')).encode('ascii'))
+    except UnicodeEncodeError as e: # 짝 없는 서로게이트 등
+        raise SignatureError("Malformed token.") from e
+    if not valid:
+        raise SignatureError("Bad signature.")
+    try:
+        claims = json.loads(_b64decode(payload))
+    except ValueError as e:
+        raise SignatureError("Malformed payload.") from e
+    if claims["e"] < time.time():
+        raise SignatureExpired("Token has expired.")
+    return {
+        "filepath": claims["p"],
+        "filename": claims["n"],
+        "content_hash": claims["h"],
+        "upload_time": claims["t"],
+        "codec": claims.get("c"),
+        "filesize": claims.get("s"),
+        "expires_at": claims["e"],
+    }
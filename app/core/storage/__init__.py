@@ -0,0 +1,62 @@
+# app/core/storage/__init__.py
+import threading
+from flask import current_app
+from .base import ObjectNotFound, ObjectStat, StorageBackend
+from .local import LocalBackend
+
+# 저장된 객체(blob, blob 도입 이전의 개별 파일)를 읽고 쓰는 저장소 드라이버.
+# 객체 키는 DB(files.filepath, blobs.path)에 저장된 UPLOAD_FOLDER 기준 상대 경로 그대로입니다.
+# STORAGE_BACKEND로 선택합니다.
+# - 'local' : UPLOAD_FOLDER (기본값, 기존 동작과 같음)
+# - 'tiered': UPLOAD_FOLDER(hot) + STORAGE_COLD_FOLDER(cold). 오래 읽히지 않은 객체를 'flask tier-objects'가 cold로 옮김
+# - 's3'    : S3 호환 객체 저장소 (AWS S3, MinIO 등). boto3가 필요합니다.
+# 업로드 중인 임시 파일과 멀티파트 파트는 어느 드라이버든 UPLOAD_FOLDER(로컬 작업 공간)에 두고,
+# 완성된 파일만 put_file()로 저장소에 넣습니다.
+
+__all__ = ['ObjectNotFound', 'ObjectStat', 'StorageBackend', 'get_storage', 'init_app']
+
+_storage_lock = threading.Lock()
+
+
+def _create_backend(app) -> StorageBackend:
+    kind = app.config['STORAGE_BACKEND'].lower()
+    if kind == 'local':
+        return LocalBackend(app.config['UPLOAD_FOLDER'])
+    if kind == 'tiered':
+        from .tiered import TieredBackend
+        return TieredBackend(
+            LocalBackend(app.config['UPLOAD_FOLDER']),
+            LocalBackend(app.config['STORAGE_COLD_FOLDER']),
+            touch_interval=app.config['STORAGE_TIER_TOUCH_SECONDS'],
+        )
+    if kind == 's3':
+        from .s3 import S3Backend
+        return S3Backend(
+            bucket=app.config['S3_BUCKET'],
+            prefix=app.config['S3_PREFIX'],
+            endpoint_url=app.config['S3_ENDPOINT_URL'] or None,
+            region_name=app.config['S3_REGION'] or None,
+            access_key_id=app.config['S3_ACCESS_KEY_ID'] or None,
+            secret_access_key=app.config['S3_SECRET_ACCESS_KEY'] or None,
+        )
+    raise ValueError(f"Unknown STORAGE_BACKEND '{kind}'. Use 'local', 'tiered' or 's3'.")
+
+
+def get_storage(app=None) -> StorageBackend:
+    app = app or current_app._get_current_object()
+    storage = app.extensions.get('storage')
+    if storage is None:
+        with _storage_lock:
+            storage = app.extensions.get('storage')
+            if storage is None:
+                storage = _create_backend(app)
+                app.extensions['storage'] = storage
+    return storage
+
+
+def init_app(app):
+    # 설정 오류(알 수 없는 드라이버, boto3 없음 등)는 첫 요청이 아니라 시작할 때 드러나도록 바로 만듭니다.
+    storage = get_storage(app)
+    app.logger.info(f"Object storage backend: {storage.describe()}")
+    from .tiered import tier_objects_command
+    app.cli.add_command(tier_objects_command)
@@ -0,0 +1,90 @@
+# app/core/storage/base.py
+import os
+from dataclasses import dataclass
+from typing import BinaryIO, Iterator
+
+
+class ObjectNotFound(Exception):
+    """요청한 키의 객체가 저장소에 없을 때 발생합니다."""
+
+    def __init__(self, key: str):
+        super().__init__(f"Object '{key}' not found.")
+        self.key = key
+
+
+@dataclass
+class ObjectStat:
+    size: int
+    mtime: float
+
+
+class StorageBackend:
+    """
+    저장소 드라이버 인터페이스. 키는 '/'로 구분된 상대 경로입니다.
+    open()은 seek 가능한 읽기 스트림을 돌려주어야 Range 요청을 처리할 수 있습니다.
+    """
+    name = ''
+
+    def describe(self) -> str:
+        return self.name
+
+    def open(self, key: str) -> BinaryIO:
+        raise NotImplementedError
+
+    def stat(self, key: str) -> ObjectStat:
+        raise NotImplementedError
+
+    def exists(self, key: str) -> bool:
+        try:
+            self.stat(key)
+        except ObjectNotFound:
+            return False
+        return True
+
+    def put_file(self, key: str, temp_path: str) -> None:
+        """완성된 로컬 임시 파일을 key로 넣습니다. 임시 파일은 옮겨지거나 지워집니다."""
+        raise NotImplementedError
+
+    def write(self, key: str, stream, chunk_size: int = 1024 * 1024, staging_dir: str | None = None) -> int:
+        """스트림을 읽어 key로 저장하고 크기를 반환합니다. 기본 구현은 로컬 임시 파일을 거쳐 put_file()을 부릅니다."""
+        from app.core.streaming import discard_temp, stream_to_temp
+        streamed = stream_to_temp(stream, staging_dir or self.staging_dir(), chunk_size=chunk_size)
+        try:
+            self.put_file(key, streamed.temp_path)
+        except BaseException:
+            discard_temp(streamed.temp_path)
+            raise
+        return streamed.size
+
+    def staging_dir(self) -> str:
+        import tempfile
+        return tempfile.gettempdir()
+
+    def delete(self, key: str) -> bool:
+        """객체를 지웁니다. 없던 객체면 False."""
+        raise NotImplementedError
+
+    def copy(self, src_key: str, dst_key: str) -> None:
+        raise NotImplementedError
+
+    def iter_objects(self, prefix: str = '') -> Iterator[tuple[str, ObjectStat]]:
+        """(키, ObjectStat)을 순서 없이 모두 나열합니다."""
+        raise NotImplementedError
+
+    def local_path(self, key: str) -> str | None:
+        """
+        객체가 로컬 파일시스템에 있으면 그 절대 경로를 돌려줍니다 (존재 여부는 확인하지 않음).
+        경로가 있으면 다운로드에 sendfile / X-Accel-Redirect / X-Sendfile을 쓸 수 있습니다.
+        """
+        return None
+
+    def record_access(self, key: str) -> None:
+        """객체를 읽었음을 알립니다. 접근 시각을 쓰는 드라이버(tiered)만 구현합니다."""
+
+
+def _normalize_key(key: str) -> str:
+    key = key.replace(os.sep, '/')
+    parts = [p for p in key.split('/') if p not in ('', '.')]
+    if not parts or '..' in parts:
+        raise ValueError(f"Invalid object key '{key}'.")
+    return '/'.join(parts)
@@ -0,0 +1,111 @@
+# app/core/storage/local.py
+import errno
+import os
+import stat as stat_mode
+import tempfile
+from app.core.streaming import commit_temp, copy_file_into, discard_temp
+from .base import ObjectNotFound, ObjectStat, StorageBackend
+
+# 멀티파트 파트 디렉토리는 작업 공간이므로 객체 목록에서 뺍니다 (app.multipart.cleanup.MULTIPART_SUBDIR).
+_SKIP_TOP_LEVEL = {'.multipart'}
+
+
+class LocalBackend(StorageBackend):
+    """root 디렉토리 아래에 키 경로 그대로 파일을 두는 드라이버."""
+    name = 'local'
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+        os.makedirs(self.root, exist_ok=True)
+
+    def describe(self) -> str:
+        return f"local ({self.root})"
+
+    def _path(self, key: str) -> str:
+        full_path = os.path.normpath(os.path.join(self.root, key))
+        if full_path == self.root or os.path.commonpath([self.root, full_path]) != self.root:
+            raise ValueError(f"Path '{key}' escapes the storage root.")
+        return full_path
+
+    def local_path(self, key: str) -> str:
+        return self._path(key)
+
+    def staging_dir(self) -> str:
+        return self.root
+
+    def open(self, key):
+        try:
+            return open(self._path(key), 'rb')
+        except (FileNotFoundError, IsADirectoryError):
+            raise ObjectNotFound(key)
+
+    def stat(self, key) -> ObjectStat:
+        try:
+            st = os.stat(self._path(key))
+        except FileNotFoundError:
+            raise ObjectNotFound(key)
+        if not stat_mode.S_ISREG(st.st_mode):
+            raise ObjectNotFound(key)
+        return ObjectStat(size=st.st_size, mtime=st.st_mtime)
+
+    def exists(self, key) -> bool:
+        return os.path.isfile(self._path(key))
+
+    def put_file(self, key, temp_path) -> None:
+        # 임시 파일이 같은 파일시스템에 있으면 원자적 rename, 아니면 복사 후 rename으로 동작합니다.
+        final_path = self._path(key)
+        try:
+            commit_temp(temp_path, final_path)
+        except OSError as e:
+            if e.errno != errno.EXDEV: # 다른 볼륨
+                raise
+            self._copy_across(temp_path, final_path)
+            os.remove(temp_path)
+
+    @staticmethod
+    def _copy_across(src_path: str, final_path: str) -> None:
+        os.makedirs(os.path.dirname(final_path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(final_path), prefix='.upload-', suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                copy_file_into(src_path, out)
+                out.flush()
+                os.fsync(out.fileno())
+            os.replace(temp_path, final_path)
+        except BaseException:
+            discard_temp(temp_path)
+            raise
+
+    def delete(self, key) -> bool:
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def copy(self, src_key, dst_key) -> None:
+        """같은 볼륨 안에서는 하드 링크로 복사 없이 만들고, 안 되면 내용을 복사합니다."""
+        src_path, dst_path = self._path(src_key), self._path(dst_key)
+        if not os.path.isfile(src_path):
+            raise ObjectNotFound(src_key)
+        os.makedirs(os.path.dirname(dst_path), exist_ok=True)
+        if os.path.exists(dst_path):
+            return
+        try:
+            os.link(src_path, dst_path)
+        except OSError:
+            self._copy_across(src_path, dst_path)
+
+    def iter_objects(self, prefix=''):
+        start = self._path(prefix) if prefix else self.root
+        for dirpath, dirnames, filenames in os.walk(start):
+            if dirpath == self.root:
+                dirnames[:] = [d for d in dirnames if d not in _SKIP_TOP_LEVEL]
+            for name in filenames:
+                abs_path = os.path.join(dirpath, name)
+                try:
+                    st = os.lstat(abs_path)
+                except FileNotFoundError:
+                    continue
+                key = os.path.relpath(abs_path, self.root).replace(os.sep, '/')
+                yield key, ObjectStat(size=st.st_size, mtime=st.st_mtime)
@@ -0,0 +1,158 @@
+# app/core/storage/s3.py
+import io
+import os
+from .base import ObjectNotFound, ObjectStat, StorageBackend, _normalize_key
+
+_NOT_FOUND_CODES = {'404', 'NoSuchKey', 'NotFound'}
+
+
+def _load_boto3():
+    try:
+        import boto3
+        from botocore.config import Config as BotoConfig
+    except ImportError:
+        raise RuntimeError("STORAGE_BACKEND='s3' requires boto3. Install it with 'pip install boto3'.")
+    return boto3, BotoConfig
+
+
+class S3ObjectReader(io.RawIOBase):
+    """
+    S3 객체를 읽는 seek 가능한 스트림. 처음 읽을 때 현재 위치부터 끝까지 Range GET을 열고,
+    seek로 위치가 바뀌면 다음 읽기에서 새 위치로 다시 엽니다. Range 응답은 한 번의 GET으로 처리됩니다.
+    """
+
+    def __init__(self, client, bucket: str, key: str, size: int):
+        self._client = client
+        self._bucket = bucket
+        self._key = key
+        self._size = size
+        self._pos = 0
+        self._body = None
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            pos = offset
+        elif whence == io.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == io.SEEK_END:
+            pos = self._size + offset
+        else:
+            raise ValueError(f"Invalid whence {whence}.")
+        if pos < 0:
+            raise ValueError("Negative seek position.")
+        if pos != self._pos:
+            self._close_body()
+            self._pos = pos
+        return self._pos
+
+    def readinto(self, b):
+        if self._pos >= self._size:
+            return 0
+        if self._body is None:
+            response = self._client.get_object(Bucket=self._bucket, Key=self._key, Range=f"bytes={self._pos}-")
+            self._body = response['Body']
+        data = self._body.read(len(b))
+        n = len(data)
+        b[:n] = data
+        self._pos += n
+        return n
+
+    def _close_body(self):
+        if self._body is not None:
+            self._body.close()
+            self._body = None
+
+    def close(self):
+        self._close_body()
+        super().close()
+
+
+class S3Backend(StorageBackend):
+    """
+    S3 호환 객체 저장소 드라이버. endpoint_url을 주면 MinIO 등 S3 호환 서버에 붙습니다.
+    자격 증명을 비워 두면 boto3 기본 체인(환경 변수, ~/.aws, 인스턴스 역할)을 씁니다.
+    객체 키는 prefix + DB의 상대 경로입니다.
+    """
+    name = 's3'
+
+    def __init__(self, bucket: str, prefix: str = '', endpoint_url: str | None = None,
+                 region_name: str | None = None, access_key_id: str | None = None,
+                 secret_access_key: str | None = None):
+        if not bucket:
+            raise ValueError("S3_BUCKET must be set when STORAGE_BACKEND='s3'.")
+        boto3, BotoConfig = _load_boto3()
+        self.bucket = bucket
+        self.prefix = prefix.strip('/') + '/' if prefix.strip('/') else ''
+        self.endpoint_url = endpoint_url
+        self.client = boto3.client(
+            's3',
+            endpoint_url=endpoint_url,
+            region_name=region_name,
+            aws_access_key_id=access_key_id,
+            aws_secret_access_key=secret_access_key,
+            # 클라이언트는 스레드 간에 공유되므로 연결 풀을 요청 스레드 수에 맞춰 늘립니다.
+            config=BotoConfig(max_pool_connections=64, retries={'max_attempts': 3, 'mode': 'standard'}),
+        )
+
+    def describe(self) -> str:
+        where = self.endpoint_url or 'AWS'
+        return f"s3 (s3://{self.bucket}/{self.prefix} via {where})"
+
+    def _key(self, key: str) -> str:
+        return self.prefix + _normalize_key(key)
+
+    @staticmethod
+    def _is_not_found(error) -> bool:
+        return str(error.response.get('Error', {}).get('Code')) in _NOT_FOUND_CODES
+
+    def stat(self, key) -> ObjectStat:
+        from botocore.exceptions import ClientError
+        try:
+            response = self.client.head_object(Bucket=self.bucket, Key=self._key(key))
+        except ClientError as e:
+            if self._is_not_found(e):
+                raise ObjectNotFound(key)
+            raise
+        return ObjectStat(size=response['ContentLength'], mtime=response['LastModified'].timestamp())
+
+    def open(self, key):
+        size = self.stat(key).size
+        return io.BufferedReader(S3ObjectReader(self.client, self.bucket, self._key(key), size), buffer_size=256 * 1024)
+
+    def put_file(self, key, temp_path) -> None:
+        # upload_file은 큰 파일을 자동으로 멀티파트로 올립니다.
+        self.client.upload_file(temp_path, self.bucket, self._key(key))
+        os.remove(temp_path)
+
+    def delete(self, key) -> bool:
+        # S3 DeleteObject는 없는 키에도 성공하므로, 호출 측 로그를 위해 먼저 확인합니다.
+        if not self.exists(key):
+            return False
+        self.client.delete_object(Bucket=self.bucket, Key=self._key(key))
+        return True
+
+    def copy(self, src_key, dst_key) -> None:
+        from botocore.exceptions import ClientError
+        try:
+            self.client.copy({'Bucket': self.bucket, 'Key': self._key(src_key)}, self.bucket, self._key(dst_key))
+        except ClientError as e:
+            if self._is_not_found(e):
+                raise ObjectNotFound(src_key)
+            raise
+
+    def iter_objects(self, prefix=''):
+        list_prefix = self.prefix + (_normalize_key(prefix) + '/' if prefix else '')
+        paginator = self.client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=list_prefix):
+            for item in page.get('Contents', []):
+                key = item['Key'][len(self.prefix):]
+                yield key, ObjectStat(size=item['Size'], mtime=item['LastModified'].timestamp())
@@ -0,0 +1,143 @@
+# app/core/storage/tiered.py
+import os
+import time
+import click
+from flask import current_app
+from .base import ObjectNotFound, StorageBackend
+from .local import LocalBackend
+
+
+class TieredBackend(StorageBackend):
+    """
+    두 개의 로컬 볼륨을 쓰는 드라이버. 새 객체는 hot(UPLOAD_FOLDER)에 쓰고,
+    마지막 접근 후 STORAGE_TIER_AFTER_DAYS가 지난 객체는 'flask tier-objects'가 cold 볼륨으로 옮깁니다.
+    읽기는 hot을 먼저 보고 없으면 cold를 봅니다. 키(DB의 경로)는 어느 볼륨에 있든 같습니다.
+
+    마지막 접근 시각은 DB 대신 hot 파일의 atime에 기록합니다 (noatime 마운트에서도 os.utime은 반영됨).
+    다운로드마다 쓰지 않도록 touch_interval초 안에 이미 기록된 경우는 건너뜁니다.
+    """
+    name = 'tiered'
+
+    def __init__(self, hot: LocalBackend, cold: LocalBackend, touch_interval: int = 3600):
+        self.hot = hot
+        self.cold = cold
+        self.touch_interval = touch_interval
+
+    def describe(self) -> str:
+        return f"tiered (hot {self.hot.root}, cold {self.cold.root})"
+
+    def _locate(self, key: str) -> LocalBackend:
+        if self.hot.exists(key):
+            return self.hot
+        if self.cold.exists(key):
+            return self.cold
+        raise ObjectNotFound(key)
+
+    def open(self, key):
+        try:
+            return self.hot.open(key)
+        except ObjectNotFound:
+            return self.cold.open(key)
+
+    def stat(self, key):
+        try:
+            return self.hot.stat(key)
+        except ObjectNotFound:
+            return self.cold.stat(key)
+
+    def exists(self, key) -> bool:
+        return self.hot.exists(key) or self.cold.exists(key)
+
+    def staging_dir(self) -> str:
+        return self.hot.root
+
+    def put_file(self, key, temp_path) -> None:
+        self.hot.put_file(key, temp_path)
+
+    def delete(self, key) -> bool:
+        removed_hot = self.hot.delete(key)
+        removed_cold = self.cold.delete(key)
+        return removed_hot or removed_cold
+
+    def copy(self, src_key, dst_key) -> None:
+        self._locate(src_key).copy(src_key, dst_key)
+
+    def iter_objects(self, prefix=''):
+        yield from self.hot.iter_objects(prefix)
+        yield from self.cold.iter_objects(prefix)
+
+    def local_path(self, key) -> str:
+        try:
+            return self._locate(key).local_path(key)
+        except ObjectNotFound:
+            return self.hot.local_path(key)
+
+    def record_access(self, key) -> None:
+        path = self.hot.local_path(key)
+        now = time.time()
+        try:
+            st = os.stat(path)
+            if now - st.st_atime >= self.touch_interval:
+                os.utime(path, (now, st.st_mtime))
+        except OSError:
+            pass # cold에 있거나 방금 지워진 객체
+
+    def demote(self, key: str) -> bool:
+        """
+        hot 객체를 cold로 옮깁니다. cold에 다 쓴 뒤 hot을 지우므로 그 사이의 읽기는 계속 hot에서 성공하고,
+        이미 hot 파일을 연 다운로드도 끝까지 진행됩니다. hot에 없으면 False.
+        """
+        hot_path = self.hot.local_path(key)
+        if not os.path.isfile(hot_path):
+            return False
+        self.cold._copy_across(hot_path, self.cold.local_path(key))
+        self.hot.delete(key)
+        return True
+
+
+def tier_objects(older_than_days: float, limit: int | None = None, dry_run: bool = False) -> dict:
+    """마지막 접근(atime/mtime 중 늦은 쪽)이 older_than_days보다 오래된 hot 객체를 cold로 옮깁니다."""
+    from app.core.storage import get_storage
+
+    storage = get_storage()
+    if not isinstance(storage, TieredBackend):
+        raise click.UsageError("STORAGE_BACKEND is not 'tiered'.")
+    cutoff = time.time() - older_than_days * 86400
+    stats = {"moved": 0, "bytes": 0, "failed": 0}
+    for key, _ in storage.hot.iter_objects():
+        if limit is not None and stats["moved"] >= limit:
+            break
+        if os.path.basename(key).startswith('.upload-'):
+            continue # 진행 중인 업로드의 임시 파일
+        try:
+            st = os.stat(storage.hot.local_path(key))
+        except FileNotFoundError:
+            continue
+        if max(st.st_atime, st.st_mtime) >= cutoff:
+            continue
+        if not dry_run:
+            try:
+                if not storage.demote(key):
+                    continue
+            except OSError as e:
+                stats["failed"] += 1
+                current_app.logger.error(f"Could not move '{key}' to the cold tier: {e}")
+                continue
+        stats["moved"] += 1
+        stats["bytes"] += st.st_size
+    return stats
+
+
+@click.command('tier-objects')
+@click.option('--older-than-days', type=float, default=None, help='Override STORAGE_TIER_AFTER_DAYS for this run.')
+@click.option('--limit', type=int, default=None, help='Move at most this many objects.')
+@click.option('--dry-run', is_flag=True, help='Only count the objects that would be moved.')
+def tier_objects_command(older_than_days, limit, dry_run):
+    """Move objects not read recently from the hot volume to STORAGE_COLD_FOLDER."""
+    if older_than_days is None:
+        older_than_days = current_app.config['STORAGE_TIER_AFTER_DAYS']
+    stats = tier_objects(older_than_days, limit=limit, dry_run=dry_run)
+    prefix = '[dry-run] ' if dry_run else ''
+    click.echo(f"{prefix}Moved {stats['moved']} object(s) ({stats['bytes']} bytes) to the cold tier, "
+               f"{stats['failed']} failed.")
+    current_app.logger.info(f"Tiering finished: {stats} (dry_run={dry_run})")
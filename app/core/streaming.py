@@ -0,0 +1,242 @@
+# app/core/streaming.py
+import errno
+import hashlib
+import io
+import os
+import tempfile
+from dataclasses import dataclass
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024  # 1 MB
+# ASGI 어댑터가 요청 본문을 미리 받아 둔 SpooledUpload를 넣는 WSGI environ 키
+SPOOLED_UPLOAD_ENVIRON_KEY = 'upload.spooled_body'
+
+
+class UploadTooLarge(Exception):
+    """스트리밍 중 허용된 최대 크기를 넘었을 때 발생합니다."""
+
+    def __init__(self, limit: int):
+        super().__init__(f"Upload exceeds the limit of {limit} bytes.")
+        self.limit = limit
+
+
+@dataclass
+class StreamedFile:
+    """임시 파일로 받은 업로드 결과 (경로, 크기, SHA-256)."""
+    temp_path: str
+    size: int
+    sha256: str
+
+
+class SpooledUpload(io.RawIOBase):
+    """
+    요청 본문을 받으면서 크기와 SHA-256을 계산해 두는 버퍼 (ASGI 어댑터가 라우트 실행 전에 채움).
+    spool_bytes까지는 메모리에 두고, 넘으면 spool_dir 안의 임시 파일('.upload-*.part')로 옮깁니다.
+    spool_dir을 UPLOAD_FOLDER로 두면 stream_to_temp()가 이 파일을 rename으로 넘겨받으므로 본문을 두 번 쓰지 않습니다.
+    라우트에는 읽기 전용 스트림(wsgi.input)으로 보이며, 닫을 때 넘겨주지 않은 임시 파일을 지웁니다.
+    """
+
+    def __init__(self, spool_dir: str, spool_bytes: int):
+        self._spool_dir = spool_dir
+        self._spool_bytes = spool_bytes
+        self._file = io.BytesIO()
+        self._hasher = hashlib.sha256()
+        self.path = None # 디스크로 옮긴 뒤의 임시 파일 경로
+        self.size = 0
+
+    def spills(self, n: int) -> bool:
+        """n바이트를 더 쓰면 디스크에 쓰게 되는지 (어댑터가 이벤트 루프 밖에서 쓸지 정하는 데 씀)."""
+        return self.path is not None or self.size + n > self._spool_bytes
+
+    def write_chunk(self, chunk: bytes) -> None:
+        if self.path is None and self.size + len(chunk) > self._spool_bytes:
+            os.makedirs(self._spool_dir, exist_ok=True)
+            fd, self.path = tempfile.mkstemp(dir=self._spool_dir, prefix='.upload-', suffix='.part')
+            spilled = os.fdopen(fd, 'w+b')
+            spilled.write(self._file.getbuffer())
+            self._file = spilled
+        self._hasher.update(chunk)
+        self._file.write(chunk)
+        self.size += len(chunk)
+
+    def finish(self) -> None:
+        """본문을 다 받은 뒤 처음부터 읽을 수 있게 합니다."""
+        self._file.seek(0)
+
+    @property
+    def sha256(self) -> str:
+        return self._hasher.hexdigest()
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        return self._file.readinto(b)
+
+    def adopt(self, target_dir: str, fsync: bool = False) -> StreamedFile | None:
+        """
+        디스크에 받아 둔 본문을 target_dir의 임시 파일로 rename 해서 넘겨줍니다. 메모리에 있거나,
+        이미 읽기 시작했거나, 다른 파일시스템이면 None (호출한 쪽이 스트림으로 읽음).
+        """
+        if self.path is None or self.closed or self._file.tell() != 0:
+            return None
+        os.makedirs(target_dir, exist_ok=True)
+        temp_path = os.path.join(target_dir, os.path.basename(self.path))
+        if fsync:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        try:
+            os.rename(self.path, temp_path)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            return None
+        self.path = None # 이제 호출한 쪽의 임시 파일
+        return StreamedFile(temp_path=temp_path, size=self.size, sha256=self.sha256)
+
+    def close(self):
+        if not self.closed:
+            self._file.close()
+            if self.path is not None:
+                discard_temp(self.path)
+                self.path = None
+        super().close()
+
+
+def stream_to_temp(stream, target_dir: str, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                   max_bytes: int | None = None, fsync: bool = False,
+                   spooled: SpooledUpload | None = None) -> StreamedFile:
+    """
+    입력 스트림을 고정 크기 청크로 읽어 target_dir 안의 임시 파일에 바로 씁니다.
+    크기와 SHA-256 해시는 데이터가 들어오는 동안 계산하므로 파일을 다시 읽지 않습니다.
+    임시 파일을 최종 위치와 같은 디렉토리(같은 파일시스템)에 만들어 두면
+    commit_temp()의 rename이 원자적으로 동작합니다.
+    spooled: ASGI 어댑터가 같은 본문을 이미 디스크에 받아 두었으면(SPOOLED_UPLOAD_ENVIRON_KEY) 복사하지 않고 넘겨받습니다.
+    실패하면 임시 파일을 지우고 예외를 그대로 올립니다.
+    """
+    if spooled is not None:
+        if max_bytes is not None and spooled.size > max_bytes:
+            raise UploadTooLarge(max_bytes)
+        adopted = spooled.adopt(target_dir, fsync=fsync)
+        if adopted is not None:
+            return adopted
+    os.makedirs(target_dir, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=target_dir, prefix='.upload-', suffix='.part')
+    hasher = hashlib.sha256()
+    size = 0
+    buf = bytearray(chunk_size)
+    view = memoryview(buf)
+    readinto = getattr(stream, 'readinto', None)
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            while True:
+                if readinto is not None:
+                    n = readinto(buf)
+                    if not n:
+                        break
+                    chunk = view[:n]
+                else:
+                    chunk = stream.read(chunk_size)
+                    if not chunk:
+                        break
+                    n = len(chunk)
+                size += n
+                if max_bytes is not None and size > max_bytes:
+                    raise UploadTooLarge(max_bytes)
+                hasher.update(chunk)
+                out.write(chunk)
+            if fsync:
+                out.flush()
+                os.fsync(out.fileno())
+    except BaseException:
+        discard_temp(temp_path)
+        raise
+    return StreamedFile(temp_path=temp_path, size=size, sha256=hasher.hexdigest())
+
+
+def commit_temp(temp_path: str, final_path: str) -> None:
+    """임시 파일을 최종 경로로 원자적으로 이동합니다 (같은 파일시스템 안의 os.replace)."""
+    os.makedirs(os.path.dirname(final_path), exist_ok=True)
+    os.replace(temp_path, final_path)
+
+
+def discard_temp(temp_path: str) -> None:
+    """임시 파일을 조용히 정리합니다."""
+    try:
+        os.remove(temp_path)
+    except FileNotFoundError:
+        pass
+
+
+def copy_file_into(src_path: str, dst_file) -> int:
+    """
+    src_path의 내용을 열린 dst_file 끝에 이어 붙입니다.
+    가능하면 os.copy_file_range / os.sendfile로 커널 안에서 복사하여
+    데이터가 파이썬 버퍼를 거치지 않게 하고, 지원되지 않으면 일반 복사로 대체합니다.
+    복사한 바이트 수를 반환합니다.
+    """
+    dst_file.flush()
+    dst_fd = dst_file.fileno()
+    with open(src_path, 'rb') as src:
+        src_fd = src.fileno()
+        total = os.fstat(src_fd).st_size
+        copied = 0
+        for copy_fn in (getattr(os, 'copy_file_range', None), getattr(os, 'sendfile', None)):
+            if copy_fn is None:
+                continue
+            try:
+                while copied < total:
+                    if copy_fn is os.sendfile:
+                        n = os.sendfile(dst_fd, src_fd, copied, total - copied)
+                    else:
+                        n = os.copy_file_range(src_fd, dst_fd, total - copied, copied)
+                    if n == 0:
+                        break
+                    copied += n
+                if copied == total:
+                    return copied
+            except OSError:
+                # EXDEV / ENOSYS / EINVAL 등: 다음 방식으로 넘어갑니다.
+                pass
+        # 커널 복사가 불가능한 환경: 남은 부분을 일반 복사로 처리합니다.
+        src.seek(copied)
+        os.lseek(dst_fd, 0, os.SEEK_END)
+        while True:
+            chunk = src.read(DEFAULT_CHUNK_SIZE)
+            if not chunk:
+                break
+            os.write(dst_fd, chunk)
+            copied += len(chunk)
+    return copied
+
+
+def concat_to_temp(paths: list[str], target_dir: str, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                   fsync: bool = False) -> StreamedFile:
+    """
+    여러 파일을 순서대로 이어 붙여 target_dir 안의 임시 파일 하나로 만듭니다.
+    stream_to_temp()와 같이 쓰는 동안 크기와 SHA-256을 계산하므로 결과를 다시 읽지 않으며,
+    크기는 기록된 값이 아니라 실제로 쓴 바이트 수입니다. 실패하면 임시 파일을 지우고 예외를 그대로 올립니다.
+    """
+    os.makedirs(target_dir, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=target_dir, prefix='.upload-', suffix='.part')
+    hasher = hashlib.sha256()
+    size = 0
+    buf = bytearray(chunk_size)
+    view = memoryview(buf)
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            for path in paths:
+                with open(path, 'rb') as src:
+                    while True:
+                        n = src.readinto(buf)
+                        if not n:
+                            break
+                        hasher.update(view[:n])
+                        out.write(view[:n])
+                        size += n
+            if fsync:
+                out.flush()
+                os.fsync(out.fileno())
+    except BaseException:
+        discard_temp(temp_path)
+        raise
+    return StreamedFile(temp_path=temp_path, size=size, sha256=hasher.hexdigest())
@@ -0,0 +1,165 @@
+# app/core/thumbnails.py
+import os
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from flask import current_app
+from app.core.cache import TTLCache, MISSING
+from app.core.compression import open_original
+from app.core.layout import sharded_relpath
+from app.core.storage import get_storage
+from app.core.streaming import discard_temp
+
+try:
+    from PIL import Image, ImageOps
+except ImportError: # 선택 의존성: 없으면 썸네일 엔드포인트가 501을 돌려줍니다.
+    Image = None
+
+# 이미지 썸네일 (파생 자산, derived asset).
+# 썸네일은 원본 내용 해시와 크기로 키를 정해 저장소의 'derived/thumbs/' 아래에 둡니다 ('<sha256>-<크기>.webp').
+# 같은 내용의 파일은 썸네일을 공유하고, 내용이 바뀌지 않으므로 응답을 오래 캐시할 수 있습니다.
+# - 생성은 프로세스당 THUMBNAIL_WORKERS개 스레드 풀에서만 합니다. 업로드는 작업을 큐에 넣기만 하므로 업로드 지연이 늘지 않습니다.
+# - 요청한 썸네일이 없으면 큐에 넣고 THUMBNAIL_WAIT_SECONDS까지 기다린 뒤, 그래도 없으면 202(Retry-After)를 돌려줍니다.
+# - 만들지 못한 원본(깨진 이미지 등)은 THUMBNAIL_FAILURE_TTL초 동안 다시 시도하지 않습니다.
+# - blob이 GC로 지워질 때 썸네일도 지우며, 'flask scan-orphans'는 원본 blob이 없는 썸네일을 고아로 봅니다.
+DERIVED_SUBDIR = 'derived'
+THUMBNAIL_SUBDIR = 'derived/thumbs'
+THUMBNAIL_FORMAT = 'WEBP'
+THUMBNAIL_MIMETYPE = 'image/webp'
+_service_lock = threading.Lock()
+
+
+class ThumbnailError(Exception):
+    """원본을 이미지로 읽지 못해 썸네일을 만들 수 없음."""
+
+
+@dataclass(frozen=True)
+class ThumbnailSource:
+    content_hash: str # 원본 내용의 SHA-256
+    key: str # 원본 저장소 키 (files.filepath)
+    codec: str | None
+    size: int # 원본 크기 (files.filesize)
+
+
+def thumbnails_available() -> bool:
+    return Image is not None and current_app.config['THUMBNAIL_ENABLED']
+
+
+def supports_thumbnail(filename: str) -> bool:
+    ext = filename.rsplit('.', 1)[1].lower() if '.' in filename else ''
+    return ext in current_app.config['THUMBNAIL_EXTENSIONS']
+
+
+def pick_size(requested) -> int:
+    """요청 크기 이상인 가장 작은 THUMBNAIL_SIZES 값 (없으면 가장 큰 값). 지정하지 않으면 THUMBNAIL_DEFAULT_SIZE."""
+    sizes = sorted(current_app.config['THUMBNAIL_SIZES'])
+    if requested is None:
+        return current_app.config['THUMBNAIL_DEFAULT_SIZE']
+    return next((size for size in sizes if size >= int(requested)), sizes[-1])
+
+
+def thumbnail_key(content_hash: str, size: int) -> str:
+    return sharded_relpath(f"{content_hash}-{size}.webp", THUMBNAIL_SUBDIR)
+
+
+def is_derived_path(relpath: str) -> bool:
+    return relpath.split('/', 1)[0] == DERIVED_SUBDIR
+
+
+def derived_source_hash(relpath: str) -> str:
+    """파생 자산 경로에서 원본 내용 해시를 꺼냅니다."""
+    return os.path.basename(relpath).split('-', 1)[0]
+
+
+def delete_thumbnails(storage, content_hash: str) -> None:
+    """설정된 모든 크기의 썸네일을 지웁니다 (blob GC). 크기 설정이 바뀌어 남은 것은 'scan-orphans'가 찾습니다."""
+    for size in current_app.config['THUMBNAIL_SIZES']:
+        storage.delete(thumbnail_key(content_hash, size))
+
+
+def render_thumbnail(fileobj, size: int, out_path: str, quality: int) -> None:
+    """이미지 스트림을 size x size 안에 들어가도록 줄여 out_path에 WebP로 저장합니다."""
+    try:
+        with Image.open(fileobj) as img:
+            img.draft('RGB', (size, size)) # JPEG는 줄인 해상도로 바로 디코딩합니다.
+            img = ImageOps.exif_transpose(img)
+            img.thumbnail((size, size))
+            if img.mode not in ('RGB', 'RGBA'):
+                has_alpha = 'A' in img.getbands() or 'transparency' in img.info
+                img = img.convert('RGBA' if has_alpha else 'RGB')
+            img.save(out_path, format=THUMBNAIL_FORMAT, quality=quality)
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        raise ThumbnailError(str(e)) from e
+
+
+class ThumbnailService:
+    """썸네일 생성 작업 풀. 같은 썸네일에 대한 동시 요청은 하나의 작업(Future)을 공유합니다."""
+
+    def __init__(self, app, workers: int, failure_ttl: float):
+        self.app = app
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='thumbnail')
+        self._pending: dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._failures = TTLCache(maxsize=10000, default_ttl=failure_ttl)
+
+    def failed(self, source: ThumbnailSource) -> bool:
+        return self._failures.get(source.content_hash) is not MISSING
+
+    def submit(self, source: ThumbnailSource, size: int) -> Future:
+        key = thumbnail_key(source.content_hash, size)
+        with self._lock:
+            future = self._pending.get(key)
+            if future is None:
+                future = self._executor.submit(self._generate, source, size, key)
+                self._pending[key] = future
+                future.add_done_callback(lambda _, key=key: self._forget(key))
+        return future
+
+    def _forget(self, key: str) -> None:
+        with self._lock:
+            self._pending.pop(key, None)
+
+    def _generate(self, source: ThumbnailSource, size: int, key: str) -> str:
+        with self.app.app_context():
+            storage = get_storage()
+            if storage.exists(key):
+                return key
+            config = current_app.config
+            fd, temp_path = tempfile.mkstemp(dir=storage.staging_dir(), prefix='.thumb-', suffix='.part')
+            os.close(fd)
+            try:
+                with open_original(storage, source.key, source.codec, source.size) as f:
+                    render_thumbnail(f, size, temp_path, config['THUMBNAIL_QUALITY'])
+                storage.put_file(key, temp_path)
+            except ThumbnailError as e:
+                self._failures.set(source.content_hash, True)
+                current_app.logger.warning(f"Could not create a thumbnail for '{source.key}': {e}")
+                raise
+            except Exception as e:
+                current_app.logger.error(f"Thumbnail generation for '{source.key}' failed: {e}", exc_info=True)
+                raise
+            finally:
+                discard_temp(temp_path)
+            return key
+
+
+def get_thumbnail_service(app=None) -> ThumbnailService:
+    app = app or current_app._get_current_object()
+    service = app.extensions.get('thumbnails')
+    if service is None:
+        with _service_lock:
+            service = app.extensions.get('thumbnails')
+            if service is None:
+                service = ThumbnailService(app, app.config['THUMBNAIL_WORKERS'], app.config['THUMBNAIL_FAILURE_TTL'])
+                app.extensions['thumbnails'] = service
+    return service
+
+
+def queue_thumbnails(filename: str, source: ThumbnailSource) -> None:
+    """업로드 직후 THUMBNAIL_PREGENERATE_SIZES 썸네일을 백그라운드에서 만들도록 큐에 넣습니다. 기다리지 않습니다."""
+    if not thumbnails_available() or not supports_thumbnail(filename):
+        return
+    service = get_thumbnail_service()
+    for size in current_app.config['THUMBNAIL_PREGENERATE_SIZES']:
+        service.submit(source, size)
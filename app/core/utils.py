@@ -1,4 +1,5 @@
 # app/core/utils.py
+import os
 from flask import current_app # Required to access app.config
 
 def allowed_file(filename: str) -> bool:
@@ -11,9 +12,20 @@ def allowed_file(filename: str) -> bool:
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in current_app.config['ALLOWED_EXTENSIONS']
 
+def resolve_upload_path(relative_path: str) -> str:
+    """
+    Turns a path stored in the database (relative to UPLOAD_FOLDER) into an absolute path.
+    Raises ValueError if the result would point outside of UPLOAD_FOLDER.
+    """
+    upload_folder = os.path.abspath(current_app.config['UPLOAD_FOLDER'])
+    full_path = os.path.normpath(os.path.join(upload_folder, relative_path))
+    if full_path == upload_folder or os.path.commonpath([upload_folder, full_path]) != upload_folder:
+        raise ValueError(f"Path '{relative_path}' escapes UPLOAD_FOLDER.")
+    return full_path
+
 # You can add other utility functions here as your application grows.
 # For example:
 # - Functions for generating unique identifiers (though uuid is often used directly)
 # - Data sanitization helpers (beyond what secure_filename offers)
 # - Complex string manipulation functions
-# - etc.
\ No newline at end of file
+# - etc.
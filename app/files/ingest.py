@@ -0,0 +1,91 @@
+# app/files/ingest.py
+import uuid
+from flask import current_app
+from app.core.blobstore import BlobChanged, discard_staged, finish_blob, register_blob, stage_blob
+from app.core.compression import choose_codec
+from app.core.database import get_db
+from app.core.quota import charge_upload
+from app.core.search import extract_text, set_indexed_text, text_extension
+from app.core.streaming import StreamedFile, discard_temp
+from app.core.thumbnails import ThumbnailSource, queue_thumbnails
+
+# stage_blob() 뒤 재사용하려던 blob이 GC되어 다시 시도하는 횟수. 두 번째 시도는 새 객체를 놓으므로 실패하지 않습니다.
+BLOB_REGISTER_ATTEMPTS = 3
+
+
+def finalize_upload(streamed: StreamedFile, original_filename: str, user_id: int) -> dict:
+    """
+    임시 파일로 받아 둔 업로드(streamed)를 내용 주소 기반 blob 저장소에 넣고 files 레코드를 만듭니다.
+    같은 내용이 이미 저장되어 있으면 디스크에 새로 쓰지 않고 참조 수만 늘립니다.
+    압축할 형식이면 새 blob인 경우에만 압축본을 만들어 저장합니다.
+    저장소에 객체를 놓는 일(stage_blob)은 쓰기 잠금을 잡기 전에 끝내고, 잠금 안에서는 행만 씁니다.
+    검색 색인(files_fts)의 이름은 트리거가, 텍스트 형식의 본문은 같은 트랜잭션에서 여기서 채웁니다.
+    사용자 사용량도 같은 트랜잭션에서 늘리며, 할당량을 넘으면 QuotaExceeded를 올립니다.
+    단일 업로드(/api/upload, /api/upload/stream)와 멀티파트 업로드 완료가 함께 사용합니다.
+    """
+    file_extension = original_filename.rsplit('.', 1)[1].lower() if '.' in original_filename else ''
+    download_link_id = str(uuid.uuid4())
+    db = get_db()
+    cursor = db.cursor()
+    staged = None
+    try:
+        # 임시 파일은 stage_blob이 저장소로 옮길 수 있으므로 그 전에 읽습니다.
+        indexed_text = None
+        if text_extension(original_filename):
+            with open(streamed.temp_path, 'rb') as f:
+                indexed_text = extract_text(f)
+        codec = choose_codec(original_filename)
+        for _ in range(BLOB_REGISTER_ATTEMPTS):
+            staged = stage_blob(db, streamed, codec)
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                blob = register_blob(db, staged)
+                break
+            except BlobChanged:
+                # 재사용하려던 blob이 그 사이 GC됨: 임시 파일이 남아 있으므로 처음부터 다시 놓습니다.
+                db.rollback()
+                staged = None
+        else:
+            raise RuntimeError(f"Blob {streamed.sha256} kept changing while it was being registered.")
+        blob_path, deduplicated = blob.path, blob.deduplicated
+        # DB에는 UPLOAD_FOLDER 기준 blob 상대 경로를 저장합니다.
+        cursor.execute("""
+            INSERT INTO files (user_id, filename, extension, filepath, filesize, download_link_id, permission,
+                               content_hash, codec, stored_size)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (user_id, original_filename, file_extension, blob_path, streamed.size, download_link_id, 'private',
+              streamed.sha256, blob.codec, blob.stored_size))
+        file_id = cursor.lastrowid
+        if indexed_text:
+            set_indexed_text(db, file_id, indexed_text)
+        charge_upload(db, user_id, streamed.size)
+        db.commit()
+    except Exception:
+        if db.in_transaction:
+            db.rollback()
+        # 새로 놓은 객체는 고유한 키이므로 rollback 뒤에 잠금 없이 지워도 다른 요청과 엇갈리지 않습니다.
+        discard_staged(staged)
+        discard_temp(streamed.temp_path)
+        raise
+    finish_blob(streamed, blob)
+
+    if deduplicated:
+        current_app.logger.info(f"Upload '{original_filename}' deduplicated against existing blob {streamed.sha256}.")
+
+    # 썸네일은 백그라운드에서 만들며, 큐에 넣지 못해도 업로드는 성공으로 둡니다 (요청 시 다시 만듭니다).
+    try:
+        queue_thumbnails(original_filename, ThumbnailSource(streamed.sha256, blob_path, blob.codec, streamed.size))
+    except Exception as e:
+        current_app.logger.warning(f"Could not queue thumbnails for '{original_filename}': {e}")
+
+    return {
+        "id": file_id,
+        "filename": original_filename,
+        "filepath": blob_path,
+        "filesize": streamed.size,
+        "content_hash": streamed.sha256,
+        "download_link_id": download_link_id,
+        "deduplicated": deduplicated,
+        "codec": blob.codec,
+        "stored_size": blob.stored_size,
+    }
@@ -1,15 +1,34 @@
 # app/files/routes.py
 from flask import (
-    Blueprint, request, jsonify, current_app, g, send_from_directory
+    Blueprint, request, jsonify, current_app, g, url_for
 )
 import os
-import uuid
 import base64
+import json
 import sqlite3
-import bcrypt
+from concurrent.futures import TimeoutError as FutureTimeout
+from urllib.parse import unquote
+from werkzeug.exceptions import HTTPException, RequestEntityTooLarge
 from werkzeug.utils import secure_filename
+from app.core.archive import FORMATS as ARCHIVE_FORMATS, ArchiveEntry, archive_response, unique_names
+from app.core.blobstore import is_blob_path, release_blob
 from app.core.database import get_db
 from app.core.decorators import token_required
+from app.core.delivery import send_derived_object, send_stored_object, not_modified_response, parse_db_timestamp
+from app.core.hashing import hash_password, check_password
+from app.core.metadata_cache import invalidate_files
+from app.core.reaper import enqueue_deletions
+from app.core.quota import QuotaExceeded, add_usage, get_usage, remaining_quota
+from app.core.search import build_match_query
+from app.core.signing import sign_download, verify_download, resolve_ttl, SignatureError, SignatureExpired
+from app.core.storage import ObjectNotFound, get_storage
+from app.core.streaming import SPOOLED_UPLOAD_ENVIRON_KEY, UploadTooLarge, stream_to_temp, discard_temp
+from app.core.thumbnails import (
+    THUMBNAIL_MIMETYPE, ThumbnailError, ThumbnailSource, get_thumbnail_service, pick_size, supports_thumbnail,
+    thumbnail_key, thumbnails_available,
+)
+from app.files.ingest import finalize_upload
+from app.models import get_file_by_download_link, get_file_by_id
 
 files_bp = Blueprint('files', __name__)
 
@@ -18,35 +37,102 @@ def allowed_file(filename):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in current_app.config['ALLOWED_EXTENSIONS']
 
-def _send_file_helper(db_stored_filepath: str, original_filename: str):
+def _send_file_helper(db_stored_filepath: str, original_filename: str,
+                      content_hash: str | None = None, upload_time=None,
+                      codec: str | None = None, filesize: int | None = None):
     """
     파일을 전송하는 헬퍼 함수입니다.
     db_stored_filepath: 데이터베이스에 저장된 경로 (예: 'unique_filename.ext').
     original_filename: 다운로드 시 사용할 파일 이름.
+    content_hash: 저장된 SHA-256. 있으면 강한 ETag로 사용합니다.
+    upload_time: 저장된 업로드 시간. Last-Modified로 사용합니다.
+    codec / filesize: 압축해 저장한 파일의 codec과 원본 크기 (files.codec, files.filesize).
+    Range(다중 구간 포함) / If-Range / If-None-Match / If-Modified-Since를 지원하며,
+    클라이언트 사본이 최신이면 파일을 건드리지 않고 304를 돌려줍니다.
     """
-    upload_folder_abs = current_app.config.get('UPLOAD_FOLDER')
-    if not upload_folder_abs or not os.path.isabs(upload_folder_abs):
-        current_app.logger.error(f"CRITICAL: UPLOAD_FOLDER ('{upload_folder_abs}') is not configured correctly or is not an absolute path.")
-        return jsonify({"message": "Server configuration error."}), 500
+    last_modified = parse_db_timestamp(upload_time)
+    not_modified = not_modified_response(content_hash, last_modified, codec)
+    if not_modified is not None:
+        return not_modified
 
-    filename_on_server = os.path.basename(db_stored_filepath)
-    actual_file_full_path = os.path.join(upload_folder_abs, filename_on_server)
-
-    if not os.path.exists(actual_file_full_path) or not os.path.isfile(actual_file_full_path):
-        current_app.logger.warning(f"File not found or not a file at: '{actual_file_full_path}' (requested for '{original_filename}')")
+    try:
+        return send_stored_object(db_stored_filepath, original_filename,
+                                  etag=content_hash, last_modified=last_modified, codec=codec, size=filesize)
+    except ValueError:
+        current_app.logger.error(f"Stored path '{db_stored_filepath}' for '{original_filename}' escapes the storage root.")
         return jsonify({"message": "File not found on server."}), 404
+    except ObjectNotFound:
+        current_app.logger.warning(f"Object '{db_stored_filepath}' not found in storage (requested for '{original_filename}')")
+        return jsonify({"message": "File not found on server."}), 404
+    except HTTPException:
+        raise # 416 Range Not Satisfiable 등은 Werkzeug가 처리하도록 그대로 올립니다.
+    except Exception as e:
+        # 예상치 못한 오류 발생 시 상세 로그를 남깁니다.
+        current_app.logger.error(f"Error sending file '{original_filename}' from '{db_stored_filepath}': {e}", exc_info=True)
+        return jsonify({"message": "Error sending file."}), 500
+
+def _quota_exceeded_response(quota_bytes, bytes_used):
+    return jsonify({
+        "message": "Storage quota exceeded.",
+        "quota_bytes": quota_bytes,
+        "bytes_used": bytes_used
+    }), 413
+
+def _store_upload(source_stream, original_filename: str, declared_size: int | None = None, spooled=None):
+    """
+    업로드 스트림을 청크 단위로 UPLOAD_FOLDER 안의 임시 파일에 쓰고,
+    크기와 SHA-256을 함께 계산한 뒤 최종 이름으로 원자적으로 rename 합니다.
+    multipart 폼 업로드와 스트리밍 업로드가 함께 사용합니다.
+    남은 할당량을 스트리밍 상한으로 사용하므로 할당량을 넘는 본문은 끝까지 쓰지 않고 중단합니다.
+    declared_size: 본문 크기를 미리 알면(raw body의 Content-Length) 읽기 전에 할당량을 확인합니다.
+    spooled: ASGI 어댑터가 본문을 이미 UPLOAD_FOLDER에 받아 두었으면 그 파일을 넘겨받습니다 (stream_to_temp 참고).
+    """
+    upload_folder_abs_path = current_app.config['UPLOAD_FOLDER']
+    if not os.path.isabs(upload_folder_abs_path):
+        current_app.logger.error(f"CRITICAL: UPLOAD_FOLDER '{upload_folder_abs_path}' in config is not an absolute path!")
+        return jsonify({"message": "Server configuration error."}), 500
+
+    remaining = remaining_quota(get_db(), g.current_user_id)
+    if remaining is not None and (remaining == 0 or (declared_size or 0) > remaining):
+        usage = get_usage(get_db(), g.current_user_id)
+        return _quota_exceeded_response(usage['quota_bytes'], usage['bytes_used'])
 
+    streamed = None
     try:
-        return send_from_directory(
-            directory=upload_folder_abs,
-            path=filename_on_server,
-            as_attachment=True,
-            download_name=original_filename
+        # 임시 파일을 대상 디렉토리에 직접 만들어 한 번만 기록합니다.
+        streamed = stream_to_temp(
+            source_stream, upload_folder_abs_path,
+            chunk_size=current_app.config['UPLOAD_CHUNK_SIZE'],
+            max_bytes=remaining,
+            fsync=current_app.config['UPLOAD_FSYNC'],
+            spooled=spooled
         )
+        record = finalize_upload(streamed, original_filename, g.current_user_id)
+
+        current_app.logger.info(f"File '{original_filename}' (ID: {record['id']}) uploaded by user '{g.current_username}'. Stored as '{record['filepath']}'.")
+        return jsonify({
+            "message": "File uploaded successfully.",
+            "file_id": record['id'],
+            "filename": original_filename,
+            "filesize_bytes": record['filesize'],
+            "sha256": record['content_hash'],
+            "deduplicated": record['deduplicated'],
+            "download_link_id": record['download_link_id']
+        }), 201
+
+    except (UploadTooLarge, QuotaExceeded):
+        # 스트리밍 중 상한을 넘었거나, 동시에 올린 다른 업로드 때문에 commit 직전에 넘은 경우
+        usage = get_usage(get_db(), g.current_user_id)
+        current_app.logger.warning(f"Upload of '{original_filename}' by user '{g.current_username}' rejected: storage quota exceeded.")
+        return _quota_exceeded_response(usage['quota_bytes'], usage['bytes_used'])
+    except RequestEntityTooLarge:
+        current_app.logger.warning(f"Upload of '{original_filename}' by user '{g.current_username}' exceeded MAX_CONTENT_LENGTH.")
+        return jsonify({"message": "File is too large."}), 413
     except Exception as e:
-        # 예상치 못한 오류 발생 시 상세 로그를 남깁니다.
-        current_app.logger.error(f"Error sending file '{original_filename}' from '{actual_file_full_path}': {e}", exc_info=True)
-        return jsonify({"message": "Error sending file."}), 500
+        current_app.logger.error(f"Failed to upload file '{original_filename}' by user '{g.current_username}': {e}", exc_info=True)
+        if streamed is not None: # 부분적으로 저장된 파일 정리 시도
+            discard_temp(streamed.temp_path)
+        return jsonify({"message": "Failed to upload file."}), 500
 
 @files_bp.route('/upload', methods=['POST'])
 @token_required
@@ -59,102 +145,229 @@ def upload_file_route():
 
     if file and allowed_file(file.filename):
         original_filename = secure_filename(file.filename)
-        file_extension = original_filename.rsplit('.', 1)[1].lower() if '.' in original_filename else ''
-        # 서버에 저장될 고유한 파일명 (UPLOAD_FOLDER 기준 상대 경로)
-        unique_internal_filename = f"{uuid.uuid4().hex}.{file_extension}" if file_extension else uuid.uuid4().hex
-        
-        upload_folder_abs_path = current_app.config['UPLOAD_FOLDER']
-        if not os.path.isabs(upload_folder_abs_path):
-            current_app.logger.error(f"CRITICAL: UPLOAD_FOLDER '{upload_folder_abs_path}' in config is not an absolute path!")
-            return jsonify({"message": "Server configuration error."}), 500
-
-        # 실제 파일이 저장될 전체 절대 경로
-        filepath_on_server_abs = os.path.join(upload_folder_abs_path, unique_internal_filename)
-
-        try:
-            if not os.path.exists(upload_folder_abs_path):
-                os.makedirs(upload_folder_abs_path)
-            
-            file.save(filepath_on_server_abs)
-            filesize = os.path.getsize(filepath_on_server_abs)
-            download_link_id = str(uuid.uuid4())
-            
-            db = get_db()
-            cursor = db.cursor()
-            # DB에는 UPLOAD_FOLDER 기준 상대 경로(unique_internal_filename)를 저장합니다.
-            db_filepath_to_store = unique_internal_filename
-            
-            cursor.execute("""
-                INSERT INTO files (user_id, filename, filepath, filesize, download_link_id, permission)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (g.current_user_id, original_filename, db_filepath_to_store, filesize, download_link_id, 'private'))
-            db.commit()
-            file_id = cursor.lastrowid
-            
-            current_app.logger.info(f"File '{original_filename}' (ID: {file_id}) uploaded by user '{g.current_username}'. Stored as '{db_filepath_to_store}'.")
-            return jsonify({
-                "message": "File uploaded successfully.",
-                "file_id": file_id,
-                "filename": original_filename,
-                "filesize_bytes": filesize,
-                "download_link_id": download_link_id
-            }), 201
-
-        except Exception as e:
-            current_app.logger.error(f"Failed to upload file '{original_filename}' by user '{g.current_username}': {e}", exc_info=True)
-            if os.path.exists(filepath_on_server_abs): # 부분적으로 저장된 파일 정리 시도
-                try:
-                    os.remove(filepath_on_server_abs)
-                except OSError as oe:
-                    current_app.logger.error(f"Error deleting partially uploaded file '{filepath_on_server_abs}': {oe}")
-            db = get_db()
-            if hasattr(db, 'in_transaction') and db.in_transaction:
-                 db.rollback()
-            return jsonify({"message": "Failed to upload file."}), 500
+        return _store_upload(file.stream, original_filename)
     else:
         return jsonify({"message": "File type not allowed."}), 400
 
+@files_bp.route('/upload/stream', methods=['POST', 'PUT'])
+@token_required
+def stream_upload_route():
+    """
+    요청 본문(raw body) 자체를 파일 내용으로 받는 스트리밍 업로드입니다.
+    폼 파싱을 거치지 않으므로 Werkzeug가 본문 전체를 임시 파일로 스풀링하지 않습니다.
+    파일 이름은 ?filename= 쿼리 또는 X-File-Name 헤더(URL 인코딩)로 전달합니다.
+    """
+    raw_filename = request.args.get('filename') or unquote(request.headers.get('X-File-Name', ''))
+    if not raw_filename:
+        return jsonify({"message": "Filename is required (?filename= or X-File-Name header)."}), 400
+    if not allowed_file(raw_filename):
+        return jsonify({"message": "File type not allowed."}), 400
+
+    original_filename = secure_filename(raw_filename)
+    return _store_upload(request.stream, original_filename, declared_size=request.content_length,
+                         spooled=request.environ.get(SPOOLED_UPLOAD_ENVIRON_KEY))
+
+# GET /files/<id>와 POST /files/batch/metadata가 돌려주는 메타데이터 필드. owner_username 외에는 모두 files 컬럼입니다.
+_METADATA_FIELDS = ('id', 'filename', 'filepath', 'filesize', 'upload_time', 'permission', 'download_link_id', 'user_id',
+                    'owner_username', 'codec', 'stored_size')
+_METADATA_SELECT = ', '.join('u.username AS owner_username' if field == 'owner_username' else f'f.{field}'
+                             for field in _METADATA_FIELDS)
+
+# 목록 정렬 기준: 쿼리 파라미터 값 -> 컬럼. 각 기준마다 (user_id, 컬럼, id) 복합 인덱스가 있습니다.
+_LIST_SORT_COLUMNS = {'upload_time': 'upload_time', 'filename': 'filename', 'filesize': 'filesize'}
+
+def _encode_list_cursor(sort: str, order: str, value, file_id: int) -> str:
+    """마지막 행의 (정렬 값, id)를 클라이언트가 그대로 돌려줄 불투명 커서 문자열로 만듭니다."""
+    raw = json.dumps([sort, order, value, file_id], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def _decode_list_cursor(cursor_str: str, sort: str, order: str):
+    """커서를 (정렬 값, id)로 되돌립니다. 형식이 틀리거나 정렬 조건이 다르면 ValueError."""
+    try:
+        padded = cursor_str + '=' * (-len(cursor_str) % 4)
+        c_sort, c_order, value, file_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except Exception:
+        raise ValueError("Malformed cursor.")
+    if c_sort != sort or c_order != order or not isinstance(file_id, int):
+        raise ValueError("Cursor does not match the requested sort order.")
+    return value, file_id
+
+def _file_filter_conditions(args, table: str = ''):
+    """
+    내 파일 필터(permission, ext, prefix)를 WHERE 조건과 파라미터로 만듭니다. 잘못된 값이면 ValueError.
+    ext는 쉼표로 구분한 문자열 또는 (JSON 본문의) 목록입니다. table은 조인할 때 컬럼 앞에 붙일 별칭입니다.
+    """
+    t = f"{table}." if table else ''
+    conditions = [f"{t}user_id = ?"]
+    params = [g.current_user_id]
+
+    permission = args.get('permission')
+    if permission:
+        if permission not in ('public', 'private', 'password'):
+            raise ValueError("Invalid permission filter.")
+        conditions.append(f"{t}permission = ?")
+        params.append(permission)
+
+    ext = args.get('ext') or ''
+    if isinstance(ext, list):
+        ext = ','.join(str(e) for e in ext)
+    extensions = [e.strip().lstrip('.').lower() for e in ext.split(',') if e.strip()]
+    if extensions:
+        conditions.append(f"{t}extension IN ({', '.join('?' for _ in extensions)})")
+        params.extend(extensions)
+
+    prefix = args.get('prefix')
+    if prefix:
+        # LIKE 대신 범위 비교를 써야 (user_id, filename, id) 인덱스를 탈 수 있습니다.
+        conditions.append(f"{t}filename >= ? AND {t}filename < ?")
+        params.extend([prefix, prefix + '\U0010ffff'])
+    return conditions, params
+
 @files_bp.route('/files', methods=['GET'])
 @token_required
 def list_my_files_route():
+    """
+    내 파일 목록을 키셋(keyset) 페이지네이션으로 돌려줍니다.
+    쿼리 파라미터:
+      limit       한 페이지 크기 (기본 FILE_LIST_DEFAULT_LIMIT, 최대 FILE_LIST_MAX_LIMIT)
+      cursor      이전 응답의 next_cursor (정렬 값, id 기반의 불투명 문자열)
+      sort        upload_time(기본) | filename | filesize
+      order       desc(기본) | asc
+      prefix      파일 이름 접두사
+      ext         확장자 (쉼표로 여러 개)
+      permission  public | private | password
+    OFFSET 대신 (정렬 값, id) 비교로 다음 페이지를 찾으므로 파일 수와 관계없이 응답 시간이 일정합니다.
+    """
+    sort = request.args.get('sort', 'upload_time')
+    order = request.args.get('order', 'desc').lower()
+    if sort not in _LIST_SORT_COLUMNS:
+        return jsonify({"message": f"Invalid sort. Must be one of: {', '.join(_LIST_SORT_COLUMNS)}."}), 400
+    if order not in ('asc', 'desc'):
+        return jsonify({"message": "Invalid order. Must be 'asc' or 'desc'."}), 400
+
+    try:
+        limit = int(request.args.get('limit', current_app.config['FILE_LIST_DEFAULT_LIMIT']))
+    except ValueError:
+        return jsonify({"message": "limit must be an integer."}), 400
+    limit = max(1, min(limit, current_app.config['FILE_LIST_MAX_LIMIT']))
+
+    column = _LIST_SORT_COLUMNS[sort]
+    try:
+        conditions, params = _file_filter_conditions(request.args)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    cursor_param = request.args.get('cursor')
+    if cursor_param:
+        try:
+            last_value, last_id = _decode_list_cursor(cursor_param, sort, order)
+        except ValueError as e:
+            return jsonify({"message": str(e)}), 400
+        comparison = '<' if order == 'desc' else '>'
+        conditions.append(f"({column}, id) {comparison} (?, ?)")
+        params.extend([last_value, last_id])
+
+    direction = 'DESC' if order == 'desc' else 'ASC'
     db = get_db()
     cursor = db.cursor()
     try:
-        cursor.execute("""
+        cursor.execute(f"""
             SELECT id, filename, filepath, filesize, upload_time, permission, download_link_id
             FROM files
-            WHERE user_id = ?
-            ORDER BY upload_time DESC
-        """, (g.current_user_id,))
+            WHERE {' AND '.join(conditions)}
+            ORDER BY {column} {direction}, id {direction}
+            LIMIT ?
+        """, (*params, limit + 1))
         files_data = cursor.fetchall()
     except sqlite3.Error as e:
         current_app.logger.error(f"DB error listing files for user {g.current_user_id}: {e}", exc_info=True)
         return jsonify({"message": "Database error fetching files."}), 500
-    
-    my_files = [dict(row) for row in files_data]
-    return jsonify({"files": my_files, "count": len(my_files)}), 200
+
+    has_more = len(files_data) > limit
+    my_files = [dict(row) for row in files_data[:limit]]
+    next_cursor = None
+    if has_more:
+        last = my_files[-1]
+        next_cursor = _encode_list_cursor(sort, order, last[column], last['id'])
+    return jsonify({"files": my_files, "count": len(my_files), "has_more": has_more, "next_cursor": next_cursor}), 200
+
+@files_bp.route('/files/search', methods=['GET'])
+@token_required
+def search_my_files_route():
+    """
+    내 파일을 이름과 (텍스트 형식이면) 내용으로 검색합니다 (app.core.search).
+    쿼리 파라미터:
+      q           검색어. 단어마다 접두사 검색이며 모든 단어가 맞아야 합니다.
+      in          all(기본) | filename  (filename이면 이름만 검색)
+      limit       한 페이지 크기 (기본 FILE_LIST_DEFAULT_LIMIT, 최대 FILE_LIST_MAX_LIMIT)
+      offset      이전 응답의 next_offset
+      ext / permission / prefix   GET /files와 같은 필터
+    결과는 관련도 순(이름 일치 우선)이며, 본문이 맞으면 일치 부분을 snippet으로 돌려줍니다.
+    """
+    scope = request.args.get('in', 'all')
+    if scope not in ('all', 'filename'):
+        return jsonify({"message": "Invalid 'in'. Must be 'all' or 'filename'."}), 400
+    match = build_match_query(request.args.get('q', ''), filename_only=(scope == 'filename'))
+    if match is None:
+        return jsonify({"message": "Search query 'q' must contain at least one word."}), 400
+
+    try:
+        limit = int(request.args.get('limit', current_app.config['FILE_LIST_DEFAULT_LIMIT']))
+        offset = int(request.args.get('offset', 0))
+    except ValueError:
+        return jsonify({"message": "limit and offset must be integers."}), 400
+    limit = max(1, min(limit, current_app.config['FILE_LIST_MAX_LIMIT']))
+    offset = max(0, offset)
+
+    try:
+        conditions, params = _file_filter_conditions(request.args, table='f')
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    try:
+        rows = get_db().execute(f"""
+            SELECT f.id, f.filename, f.filesize, f.upload_time, f.permission, f.download_link_id,
+                   bm25(files_fts, ?, 1.0) AS rank,
+                   snippet(files_fts, 1, char(2), char(3), '...', 12) AS snippet
+            FROM files_fts
+            JOIN files f ON f.id = files_fts.rowid
+            WHERE files_fts MATCH ? AND {' AND '.join(conditions)}
+            ORDER BY rank, f.id
+            LIMIT ? OFFSET ?
+        """, (current_app.config['SEARCH_FILENAME_WEIGHT'], match, *params, limit + 1, offset)).fetchall()
+    except sqlite3.Error as e:
+        current_app.logger.error(f"DB error searching files for user {g.current_user_id}: {e}", exc_info=True)
+        return jsonify({"message": "Database error searching files."}), 500
+
+    has_more = len(rows) > limit
+    results = []
+    for row in rows[:limit]:
+        item = dict(row)
+        item['score'] = -item.pop('rank') # bm25는 낮을수록 관련도가 높습니다.
+        # 본문이 맞지 않았으면(이름만 맞음) 강조 표시가 없으므로 snippet을 돌려주지 않습니다.
+        snippet = item['snippet'] or ''
+        item['snippet'] = snippet.replace('\x02', '[').replace('\x03', ']') if '\x02' in snippet else None
+        results.append(item)
+    return jsonify({
+        "files": results,
+        "count": len(results),
+        "has_more": has_more,
+        "next_offset": offset + limit if has_more else None,
+    }), 200
 
 @files_bp.route('/files/<int:file_id>', methods=['GET'])
 @token_required
 def get_file_metadata_route(file_id):
-    db = get_db()
-    cursor = db.cursor()
     try:
-        cursor.execute("""
-            SELECT f.id, f.filename, f.filepath, f.filesize, f.upload_time, f.permission, f.download_link_id, f.user_id, u.username as owner_username
-            FROM files f
-            JOIN users u ON f.user_id = u.id
-            WHERE f.id = ?
-        """, (file_id,))
-        file_data_row = cursor.fetchone()
+        file_record = get_file_by_id(file_id)
     except sqlite3.Error as e:
         current_app.logger.error(f"DB error fetching metadata for file {file_id}: {e}", exc_info=True)
         return jsonify({"message": "Database error fetching file metadata."}), 500
 
-    if not file_data_row:
+    if not file_record:
         return jsonify({"message": "File not found."}), 404
 
-    file_info = dict(file_data_row)
+    file_info = {key: file_record[key] for key in _METADATA_FIELDS}
     if file_info['user_id'] != g.current_user_id and file_info['permission'] == 'private':
          return jsonify({"message": "Access denied to view this file's metadata."}), 403
     
@@ -175,7 +388,7 @@ def set_file_permission_route(file_id):
     db = get_db()
     cursor = db.cursor()
     try:
-        cursor.execute("SELECT user_id, permission, access_password_hash FROM files WHERE id = ?", (file_id,))
+        cursor.execute("SELECT id, user_id, permission, access_password_hash, download_link_id FROM files WHERE id = ?", (file_id,))
         file_record = cursor.fetchone()
     except sqlite3.Error as e:
         current_app.logger.error(f"DB error fetching file {file_id} for permission change: {e}", exc_info=True)
@@ -188,8 +401,7 @@ def set_file_permission_route(file_id):
 
     new_access_password_hash = file_record['access_password_hash'] 
     if new_permission == 'password':
-        hashed_pw_bytes = bcrypt.hashpw(file_password.encode('utf-8'), bcrypt.gensalt())
-        new_access_password_hash = hashed_pw_bytes.decode('utf-8')
+        new_access_password_hash = hash_password(file_password)
     elif file_record['permission'] == 'password' and new_permission != 'password': 
         new_access_password_hash = None 
 
@@ -198,6 +410,7 @@ def set_file_permission_route(file_id):
             UPDATE files SET permission = ?, access_password_hash = ? WHERE id = ? AND user_id = ? 
         """, (new_permission, new_access_password_hash, file_id, g.current_user_id))
         db.commit()
+        invalidate_files([file_record])
         if cursor.rowcount == 0: 
              return jsonify({"message": "File not found or permission update failed."}), 404 # Should not happen
     except sqlite3.Error as e:
@@ -208,16 +421,48 @@ def set_file_permission_route(file_id):
     current_app.logger.info(f"Permission for file {file_id} updated to '{new_permission}' by user '{g.current_username}'.")
     return jsonify({"message": f"File permission updated to '{new_permission}' successfully."}), 200
 
+def _provided_link_password() -> str | None:
+    """공유 링크 요청에서 비밀번호를 찾습니다 (?password=, JSON 본문, Basic 인증 헤더 순)."""
+    provided_password = request.args.get('password')
+    if not provided_password and request.is_json:
+        body = request.get_json(silent=True)
+        if isinstance(body, dict):
+            provided_password = body.get('password')
+    auth_header = request.headers.get('Authorization')
+
+    if not provided_password and auth_header and auth_header.lower().startswith('basic '):
+        try:
+            decoded_str = base64.b64decode(auth_header.split(" ")[1]).decode('utf-8')
+            provided_password = decoded_str.split(':', 1)[1] if ':' in decoded_str else decoded_str
+        except Exception: # Malformed header, treat as no password provided
+            pass
+    return provided_password
+
+def _signed_url_response(file_record):
+    """파일 레코드로 서명된 다운로드 URL을 만들어 반환합니다. 유효 기간은 ?ttl= 또는 JSON 'ttl'(초)."""
+    requested_ttl = request.args.get('ttl')
+    if requested_ttl is None and request.is_json:
+        body = request.get_json(silent=True)
+        if isinstance(body, dict):
+            requested_ttl = body.get('ttl')
+    try:
+        ttl = resolve_ttl(requested_ttl)
+    except (TypeError, ValueError):
+        return jsonify({"message": "Invalid 'ttl' parameter."}), 400
+
+    token, expires_at = sign_download(file_record['filepath'], file_record['filename'],
+                                      file_record['content_hash'], file_record['upload_time'], ttl,
+                                      codec=file_record['codec'], filesize=file_record['filesize'])
+    return jsonify({
+        "url": url_for('files.download_signed_route', token=token, _external=True),
+        "expires_at": expires_at,
+        "expires_in": ttl,
+    }), 200
+
 @files_bp.route('/download/<string:link_id>', methods=['GET'])
 def download_file_with_link_route(link_id):
-    db = get_db()
-    cursor = db.cursor()
     try:
-        cursor.execute("""
-            SELECT filename, filepath, permission, access_password_hash
-            FROM files WHERE download_link_id = ?
-        """, (link_id,))
-        file_record = cursor.fetchone()
+        file_record = get_file_by_download_link(link_id)
     except sqlite3.Error as e:
         current_app.logger.error(f"DB error fetching file by link_id '{link_id}': {e}", exc_info=True)
         return jsonify({"message": "Database error."}), 500
@@ -231,27 +476,23 @@ def download_file_with_link_route(link_id):
     stored_password_hash_str = file_record['access_password_hash']
     
     if file_permission == 'public':
-        return _send_file_helper(db_stored_filepath, original_filename)
+        return _send_file_helper(db_stored_filepath, original_filename,
+                                 file_record['content_hash'], file_record['upload_time'],
+                                 file_record['codec'], file_record['filesize'])
     
     elif file_permission == 'password':
-        provided_password = request.args.get('password')
-        auth_header = request.headers.get('Authorization')
+        provided_password = _provided_link_password()
 
-        if not provided_password and auth_header and auth_header.lower().startswith('basic '):
-            try:
-                decoded_str = base64.b64decode(auth_header.split(" ")[1]).decode('utf-8')
-                provided_password = decoded_str.split(':', 1)[1] if ':' in decoded_str else decoded_str
-            except Exception: # Malformed header, treat as no password provided
-                pass 
-        
         if not provided_password:
              response = jsonify({"message": "Password required."})
              response.status_code = 401
              # response.headers['WWW-Authenticate'] = 'Basic realm="Password protected file"' # Optional
              return response
 
-        if stored_password_hash_str and bcrypt.checkpw(provided_password.encode('utf-8'), stored_password_hash_str.encode('utf-8')):
-            return _send_file_helper(db_stored_filepath, original_filename)
+        if stored_password_hash_str and check_password(provided_password, stored_password_hash_str):
+            return _send_file_helper(db_stored_filepath, original_filename,
+                                     file_record['content_hash'], file_record['upload_time'],
+                                     file_record['codec'], file_record['filesize'])
         else:
             return jsonify({"message": "Incorrect password."}), 401
             
@@ -262,13 +503,166 @@ def download_file_with_link_route(link_id):
         current_app.logger.error(f"File '{original_filename}' (link_id: {link_id}) has unknown permission: '{file_permission}'")
         return jsonify({"message": "File access error."}), 500
 
+@files_bp.route('/files/<int:file_id>/download', methods=['GET'])
+@token_required
+def download_own_file_route(file_id):
+    """소유자 전용 다운로드. 권한 설정과 관계없이 JWT로 인증된 소유자에게 파일을 전송합니다."""
+    try:
+        file_record = get_file_by_id(file_id)
+    except sqlite3.Error as e:
+        current_app.logger.error(f"DB error fetching file {file_id} for owner download: {e}", exc_info=True)
+        return jsonify({"message": "Database error."}), 500
+
+    if not file_record or file_record['user_id'] != g.current_user_id:
+        return jsonify({"message": "File not found or access denied."}), 404
+
+    return _send_file_helper(file_record['filepath'], file_record['filename'],
+                             file_record['content_hash'], file_record['upload_time'],
+                             file_record['codec'], file_record['filesize'])
+
+@files_bp.route('/download/<string:link_id>/sign', methods=['POST'])
+def sign_download_link_route(link_id):
+    """
+    공유 링크의 권한(공개 또는 비밀번호)을 한 번 확인하고 서명된 단기 다운로드 URL을 발급합니다.
+    이후 그 URL로 오는 Range/재시도 요청은 DB 조회와 bcrypt 검증을 하지 않습니다.
+    """
+    try:
+        file_record = get_file_by_download_link(link_id)
+    except sqlite3.Error as e:
+        current_app.logger.error(f"DB error fetching file by link_id '{link_id}' for signing: {e}", exc_info=True)
+        return jsonify({"message": "Database error."}), 500
+
+    if not file_record:
+        return jsonify({"message": "Invalid download link or file not found."}), 404
+
+    file_permission = file_record['permission']
+    if file_permission == 'private':
+        return jsonify({"message": "This file is private."}), 403
+    if file_permission == 'password':
+        provided_password = _provided_link_password()
+        if not provided_password:
+            return jsonify({"message": "Password required."}), 401
+        stored_password_hash_str = file_record['access_password_hash']
+        if not stored_password_hash_str or not check_password(provided_password, stored_password_hash_str):
+            return jsonify({"message": "Incorrect password."}), 401
+    elif file_permission != 'public':
+        current_app.logger.error(f"File '{file_record['filename']}' (link_id: {link_id}) has unknown permission: '{file_permission}'")
+        return jsonify({"message": "File access error."}), 500
+
+    return _signed_url_response(file_record)
+
+@files_bp.route('/files/<int:file_id>/signed-url', methods=['POST'])
+@token_required
+def sign_own_file_route(file_id):
+    """소유자에게 권한 설정과 관계없이 서명된 단기 다운로드 URL을 발급합니다."""
+    try:
+        file_record = get_file_by_id(file_id)
+    except sqlite3.Error as e:
+        current_app.logger.error(f"DB error fetching file {file_id} for signing: {e}", exc_info=True)
+        return jsonify({"message": "Database error."}), 500
+
+    if not file_record or file_record['user_id'] != g.current_user_id:
+        return jsonify({"message": "File not found or access denied."}), 404
+
+    return _signed_url_response(file_record)
+
+@files_bp.route('/signed/<string:token>', methods=['GET'])
+def download_signed_route(token):
+    """서명된 URL로 다운로드합니다. HMAC 검증만 하며 DB와 bcrypt는 사용하지 않습니다."""
+    try:
+        claims = verify_download(token)
+    except SignatureExpired:
+        return jsonify({"message": "Download URL has expired."}), 410
+    except SignatureError:
+        return jsonify({"message": "Invalid download URL."}), 403
+
+    return _send_file_helper(claims['filepath'], claims['filename'],
+                             claims['content_hash'], claims['upload_time'],
+                             claims['codec'], claims['filesize'])
+
+def _thumbnail_response(file_record, cache_control: str):
+    """
+    파일의 썸네일을 보냅니다 (app.core.thumbnails). 크기는 ?size= 이상인 가장 작은 THUMBNAIL_SIZES 값입니다.
+    아직 없으면 만들도록 큐에 넣고 THUMBNAIL_WAIT_SECONDS까지 기다리며, 그래도 없으면 202를 돌려줍니다.
+    """
+    if not thumbnails_available():
+        return jsonify({"message": "Thumbnails are not available on this server."}), 501
+    if not supports_thumbnail(file_record['filename']) or not file_record['content_hash']:
+        return jsonify({"message": "Thumbnails are not available for this file type."}), 415
+    try:
+        size = pick_size(request.args.get('size'))
+    except ValueError:
+        return jsonify({"message": "size must be an integer."}), 400
+
+    etag = f"{file_record['content_hash']}-{size}"
+    not_modified = not_modified_response(etag, None)
+    if not_modified is not None:
+        not_modified.headers['Cache-Control'] = cache_control
+        return not_modified
+
+    source = ThumbnailSource(file_record['content_hash'], file_record['filepath'],
+                             file_record['codec'], file_record['filesize'])
+    key = thumbnail_key(source.content_hash, size)
+    try:
+        return send_derived_object(key, THUMBNAIL_MIMETYPE, etag, cache_control)
+    except ObjectNotFound:
+        pass
+
+    service = get_thumbnail_service()
+    if service.failed(source):
+        return jsonify({"message": "A thumbnail could not be created from this file."}), 422
+    future = service.submit(source, size)
+    try:
+        future.result(timeout=current_app.config['THUMBNAIL_WAIT_SECONDS'])
+    except FutureTimeout:
+        response = jsonify({"message": "Thumbnail is being generated. Retry shortly."})
+        response.status_code = 202
+        response.headers['Retry-After'] = '1'
+        return response
+    except ThumbnailError:
+        return jsonify({"message": "A thumbnail could not be created from this file."}), 422
+    except ObjectNotFound:
+        current_app.logger.warning(f"Object '{source.key}' not found in storage (thumbnail for '{file_record['filename']}')")
+        return jsonify({"message": "File not found on server."}), 404
+    except Exception:
+        return jsonify({"message": "Thumbnail generation failed."}), 500
+    return send_derived_object(key, THUMBNAIL_MIMETYPE, etag, cache_control)
+
+@files_bp.route('/files/<int:file_id>/thumbnail', methods=['GET'])
+@token_required
+def own_thumbnail_route(file_id):
+    """소유자 전용 썸네일. 썸네일 내용은 바뀌지 않으므로 브라우저가 THUMBNAIL_CACHE_MAX_AGE 동안 캐시합니다."""
+    try:
+        file_record = get_file_by_id(file_id)
+    except sqlite3.Error as e:
+        current_app.logger.error(f"DB error fetching file {file_id} for thumbnail: {e}", exc_info=True)
+        return jsonify({"message": "Database error fetching file."}), 500
+    if not file_record or file_record['user_id'] != g.current_user_id:
+        return jsonify({"message": "File not found or access denied."}), 404
+    max_age = current_app.config['THUMBNAIL_CACHE_MAX_AGE']
+    return _thumbnail_response(file_record, f"private, max-age={max_age}, immutable")
+
+@files_bp.route('/download/<string:link_id>/thumbnail', methods=['GET'])
+def link_thumbnail_route(link_id):
+    """공개(public) 링크 파일의 썸네일. 권한이 바뀔 수 있으므로 THUMBNAIL_PUBLIC_MAX_AGE 동안만 공유 캐시를 허용합니다."""
+    try:
+        file_record = get_file_by_download_link(link_id)
+    except sqlite3.Error as e:
+        current_app.logger.error(f"DB error fetching file by link_id '{link_id}' for thumbnail: {e}", exc_info=True)
+        return jsonify({"message": "Database error."}), 500
+    if not file_record:
+        return jsonify({"message": "Invalid download link or file not found."}), 404
+    if file_record['permission'] != 'public':
+        return jsonify({"message": "Thumbnails are only available for public files."}), 403
+    return _thumbnail_response(file_record, f"public, max-age={current_app.config['THUMBNAIL_PUBLIC_MAX_AGE']}")
+
 @files_bp.route('/files/<int:file_id>', methods=['DELETE'])
 @token_required
 def delete_file_route(file_id):
     db = get_db()
     cursor = db.cursor()
     try:
-        cursor.execute("SELECT user_id, filepath FROM files WHERE id = ? AND user_id = ?", (file_id, g.current_user_id))
+        cursor.execute("SELECT id, user_id, filepath, content_hash, filesize, download_link_id FROM files WHERE id = ? AND user_id = ?", (file_id, g.current_user_id))
         file_record = cursor.fetchone()
     except sqlite3.Error as e:
         current_app.logger.error(f"DB error fetching file {file_id} for deletion: {e}", exc_info=True)
@@ -278,21 +672,26 @@ def delete_file_route(file_id):
         return jsonify({"message": "File not found or access denied."}), 404 
 
     db_stored_filepath = file_record['filepath']
-    upload_folder_abs = current_app.config.get('UPLOAD_FOLDER')
-    server_filepath_to_delete_abs = os.path.join(upload_folder_abs, os.path.basename(db_stored_filepath))
 
     try:
         cursor.execute("DELETE FROM files WHERE id = ? AND user_id = ?", (file_id, g.current_user_id))
-        
-        if os.path.exists(server_filepath_to_delete_abs):
-            if os.path.isfile(server_filepath_to_delete_abs):
-                os.remove(server_filepath_to_delete_abs)
-            else: # Should not happen if uploads are always files
-                current_app.logger.warning(f"Attempted to delete non-file path: {server_filepath_to_delete_abs}")
-        else:
-            current_app.logger.warning(f"File not found on server for deletion: {server_filepath_to_delete_abs}, but DB record removed.")
+        add_usage(db, g.current_user_id, -file_record['filesize'], -1)
+
+        if is_blob_path(db_stored_filepath):
+            # 공유될 수 있는 blob은 참조 수만 줄이고, 실제 삭제는 'flask gc-blobs'가 합니다.
+            release_blob(db, file_record['content_hash'])
         
         db.commit()
+        invalidate_files([file_record])
+        if not is_blob_path(db_stored_filepath):
+            # blob 도입 이전의 개별 파일은 commit 후 쓰기 잠금 없이 지우고, 실패하면 삭제 큐에 넣습니다.
+            try:
+                if not get_storage().delete(db_stored_filepath):
+                    current_app.logger.warning(f"File not found on server for deletion: {db_stored_filepath}, but DB record removed.")
+            except Exception as e: # 로컬 OSError / 잘못된 경로 ValueError / 원격 저장소 오류
+                current_app.logger.error(f"Error deleting file {db_stored_filepath} (ID: {file_id}): {e}")
+                enqueue_deletions(db, [db_stored_filepath], 'delete')
+                db.commit()
         current_app.logger.info(f"File (ID: {file_id}, Path: {db_stored_filepath}) deleted by user '{g.current_username}'.")
         return jsonify({"message": "File deleted successfully."}), 200
     
@@ -302,9 +701,249 @@ def delete_file_route(file_id):
         return jsonify({"message": "Database error during file deletion."}), 500
     except OSError as e_os:
         db.rollback() 
-        current_app.logger.error(f"OS error deleting file {server_filepath_to_delete_abs} (ID: {file_id}): {e_os}", exc_info=True)
+        current_app.logger.error(f"OS error deleting file {db_stored_filepath} (ID: {file_id}): {e_os}", exc_info=True)
         return jsonify({"message": "Error deleting file from server."}), 500
     except Exception as e: 
         db.rollback()
         current_app.logger.error(f"Unexpected error during deletion of file {file_id}: {e}", exc_info=True)
         return jsonify({"message": "An unexpected error occurred."}), 500
+
+@files_bp.route('/usage', methods=['GET'])
+@token_required
+def get_usage_route():
+    """현재 사용자의 저장 용량 사용량과 할당량을 반환합니다 (user_usage 카운터, 집계 쿼리 없음)."""
+    try:
+        usage = get_usage(get_db(), g.current_user_id)
+    except sqlite3.Error as e:
+        current_app.logger.error(f"DB error fetching usage for user {g.current_user_id}: {e}", exc_info=True)
+        return jsonify({"message": "Database error."}), 500
+    remaining = None if usage['quota_bytes'] is None else max(usage['quota_bytes'] - usage['bytes_used'], 0)
+    return jsonify({**usage, "remaining_bytes": remaining}), 200
+
+# --- 일괄(batch) 작업 ---
+# 파일 ID 목록을 받아 한 번의 트랜잭션(executemany)으로 처리하고 항목별 결과를 돌려줍니다.
+# ID 목록은 json_each()로 쿼리에 넘기므로 SQLite 변수 개수 제한에 걸리지 않습니다.
+
+def _parse_batch_ids():
+    """요청 본문의 'ids'를 검증해 (중복 제거된 ID 목록, 오류 응답)을 반환합니다."""
+    data = request.get_json(silent=True) or {}
+    ids = data.get('ids')
+    if not isinstance(ids, list) or not ids:
+        return None, (jsonify({"message": "'ids' must be a non-empty list of file IDs."}), 400)
+    max_items = current_app.config['FILE_BATCH_MAX_ITEMS']
+    if len(ids) > max_items:
+        return None, (jsonify({"message": f"At most {max_items} IDs can be processed per request."}), 400)
+    if not all(isinstance(i, int) and not isinstance(i, bool) for i in ids):
+        return None, (jsonify({"message": "File IDs must be integers."}), 400)
+    return list(dict.fromkeys(ids)), None
+
+@files_bp.route('/files/batch/metadata', methods=['POST'])
+@token_required
+def batch_metadata_route():
+    """여러 파일의 메타데이터를 한 번의 쿼리로 조회합니다. 접근 규칙은 GET /files/<id>와 같습니다."""
+    ids, error = _parse_batch_ids()
+    if error:
+        return error
+    try:
+        rows = get_db().execute(f"""
+            SELECT {_METADATA_SELECT}
+            FROM files f
+            JOIN users u ON f.user_id = u.id
+            WHERE f.id IN (SELECT value FROM json_each(?))
+        """, (json.dumps(ids),)).fetchall()
+    except sqlite3.Error as e:
+        current_app.logger.error(f"DB error fetching batch metadata: {e}", exc_info=True)
+        return jsonify({"message": "Database error fetching file metadata."}), 500
+
+    found = {row['id']: dict(row) for row in rows}
+    results = []
+    for file_id in ids:
+        file_info = found.get(file_id)
+        if file_info is None:
+            results.append({"id": file_id, "status": "not_found"})
+        elif file_info['user_id'] != g.current_user_id and file_info['permission'] == 'private':
+            results.append({"id": file_id, "status": "forbidden"})
+        else:
+            results.append({"id": file_id, "status": "ok", "file": file_info})
+    return jsonify({"results": results, "count": len(results)}), 200
+
+@files_bp.route('/files/batch/permission', methods=['PUT'])
+@token_required
+def batch_permission_route():
+    """
+    여러 파일의 권한을 한 번에 바꿉니다. 본문: {"ids": [...], "permission": "...", "password": "..."}.
+    'password' 권한의 해시는 한 번만 계산해 모든 파일에 사용합니다.
+    """
+    ids, error = _parse_batch_ids()
+    if error:
+        return error
+    data = request.get_json(silent=True) or {}
+    new_permission = data.get('permission')
+    file_password = data.get('password')
+    if not new_permission or new_permission not in ['public', 'private', 'password']:
+        return jsonify({"message": "Invalid permission value. Must be 'public', 'private', or 'password'."}), 400
+    if new_permission == 'password' and not file_password:
+        return jsonify({"message": "Password is required for 'password' permission."}), 400
+
+    new_access_password_hash = hash_password(file_password) if new_permission == 'password' else None
+
+    db = get_db()
+    try:
+        owned_rows = db.execute("""
+            SELECT id, download_link_id FROM files WHERE user_id = ? AND id IN (SELECT value FROM json_each(?))
+        """, (g.current_user_id, json.dumps(ids))).fetchall()
+        owned = {row['id'] for row in owned_rows}
+        db.executemany("""
+            UPDATE files SET permission = ?, access_password_hash = ? WHERE id = ? AND user_id = ?
+        """, [(new_permission, new_access_password_hash, file_id, g.current_user_id) for file_id in ids if file_id in owned])
+        db.commit()
+    except sqlite3.Error as e:
+        db.rollback()
+        current_app.logger.error(f"DB error in batch permission update: {e}", exc_info=True)
+        return jsonify({"message": "Database error updating permission."}), 500
+    invalidate_files(owned_rows)
+
+    results = [{"id": file_id, "status": "updated" if file_id in owned else "not_found"} for file_id in ids]
+    current_app.logger.info(f"Permission of {len(owned)} file(s) set to '{new_permission}' by user '{g.current_username}'.")
+    return jsonify({"results": results, "updated": len(owned)}), 200
+
+@files_bp.route('/files/batch/delete', methods=['POST'])
+@token_required
+def batch_delete_route():
+    """
+    여러 파일을 한 번의 트랜잭션으로 삭제합니다. blob 참조 수와 사용량은 해시/사용자 단위로 모아서 줄이고,
+    blob 도입 이전의 개별 파일은 commit 이후에 디스크에서 지웁니다.
+    """
+    ids, error = _parse_batch_ids()
+    if error:
+        return error
+
+    db = get_db()
+    try:
+        db.execute("BEGIN IMMEDIATE")
+        rows = db.execute("""
+            SELECT id, filepath, content_hash, filesize, download_link_id FROM files
+            WHERE user_id = ? AND id IN (SELECT value FROM json_each(?))
+        """, (g.current_user_id, json.dumps(ids))).fetchall()
+        db.executemany("DELETE FROM files WHERE id = ? AND user_id = ?",
+                       [(row['id'], g.current_user_id) for row in rows])
+
+        blob_releases = {}
+        legacy_paths = []
+        for row in rows:
+            if is_blob_path(row['filepath']):
+                blob_releases[row['content_hash']] = blob_releases.get(row['content_hash'], 0) + 1
+            else:
+                legacy_paths.append(row['filepath'])
+        db.executemany("UPDATE blobs SET refcount = refcount - ? WHERE hash = ?",
+                       [(count, content_hash) for content_hash, count in blob_releases.items()])
+        if rows:
+            add_usage(db, g.current_user_id, -sum(row['filesize'] for row in rows), -len(rows))
+        db.commit()
+    except sqlite3.Error as e:
+        db.rollback()
+        current_app.logger.error(f"DB error in batch deletion: {e}", exc_info=True)
+        return jsonify({"message": "Database error during file deletion."}), 500
+    invalidate_files(rows)
+
+    # DB에서 이미 지워졌으므로 지우지 못한 파일은 삭제 큐에 넣어 reaper가 다시 시도하게 합니다.
+    failed_paths = []
+    storage = get_storage()
+    for db_stored_filepath in legacy_paths:
+        try:
+            if not storage.delete(db_stored_filepath):
+                current_app.logger.warning(f"File not found on server for deletion: {db_stored_filepath}, but DB record removed.")
+        except Exception as e: # 로컬 OSError / 잘못된 경로 ValueError / 원격 저장소 오류
+            current_app.logger.error(f"Error deleting file {db_stored_filepath} after batch deletion: {e}")
+            failed_paths.append(db_stored_filepath)
+    if failed_paths:
+        enqueue_deletions(db, failed_paths, 'batch-delete')
+        db.commit()
+
+    deleted_ids = {row['id'] for row in rows}
+    results = [{"id": file_id, "status": "deleted" if file_id in deleted_ids else "not_found"} for file_id in ids]
+    current_app.logger.info(f"{len(deleted_ids)} file(s) deleted in batch by user '{g.current_username}'.")
+    return jsonify({"results": results, "deleted": len(deleted_ids)}), 200
+
+def _parse_archive_ids(raw):
+    """아카이브 요청의 'ids'(목록 또는 쉼표로 구분한 문자열)를 중복 없는 정수 목록으로 만듭니다. 잘못된 값이면 ValueError."""
+    if isinstance(raw, str):
+        try:
+            raw = [int(part) for part in raw.split(',') if part.strip()]
+        except ValueError:
+            raise ValueError("File IDs must be integers.")
+    if not isinstance(raw, list) or not all(isinstance(i, int) and not isinstance(i, bool) for i in raw):
+        raise ValueError("'ids' must be a list of file IDs.")
+    return list(dict.fromkeys(raw))
+
+@files_bp.route('/files/archive', methods=['GET', 'POST'])
+@token_required
+def download_archive_route():
+    """
+    내 파일 여러 개를 zip / tar 아카이브 하나로 묶어 스트리밍합니다 (app.core.archive).
+    POST JSON 본문 또는 GET 쿼리 파라미터:
+      ids                      파일 ID 목록 (GET은 쉼표로 구분). 주어지면 이 순서대로 담습니다.
+      permission / ext / prefix  ids 대신 쓰는 필터 (GET /files와 같음). 파일 이름 순으로 담으며, 없으면 내 파일 전체.
+      format                   zip(기본) | tar
+      name                     아카이브 파일 이름 (확장자 제외, 기본 'files')
+    한 번에 최대 ARCHIVE_MAX_FILES개까지 묶습니다.
+    """
+    if request.method == 'POST':
+        args = request.get_json(silent=True)
+        if not isinstance(args, dict):
+            return jsonify({"message": "Request body must be a JSON object."}), 400
+    else:
+        args = request.args
+
+    fmt = str(args.get('format', 'zip')).lower()
+    if fmt not in ARCHIVE_FORMATS:
+        return jsonify({"message": f"Invalid format. Must be one of: {', '.join(ARCHIVE_FORMATS)}."}), 400
+    name = str(args.get('name') or 'files').replace('/', '_').replace('\\', '_')
+    max_files = current_app.config['ARCHIVE_MAX_FILES']
+
+    db = get_db()
+    try:
+        if args.get('ids') is not None:
+            try:
+                ids = _parse_archive_ids(args.get('ids'))
+            except ValueError as e:
+                return jsonify({"message": str(e)}), 400
+            if not ids:
+                return jsonify({"message": "'ids' must not be empty."}), 400
+            if len(ids) > max_files:
+                return jsonify({"message": f"At most {max_files} files can be archived per request."}), 400
+            rows = db.execute("""
+                SELECT id, filename, filepath, filesize, codec, upload_time FROM files
+                WHERE user_id = ? AND id IN (SELECT value FROM json_each(?))
+            """, (g.current_user_id, json.dumps(ids))).fetchall()
+            by_id = {row['id']: row for row in rows}
+            missing = [file_id for file_id in ids if file_id not in by_id]
+            if missing:
+                return jsonify({"message": "Some files were not found.", "missing_ids": missing}), 404
+            rows = [by_id[file_id] for file_id in ids]
+        else:
+            try:
+                conditions, params = _file_filter_conditions(args)
+            except ValueError as e:
+                return jsonify({"message": str(e)}), 400
+            rows = db.execute(f"""
+                SELECT id, filename, filepath, filesize, codec, upload_time FROM files
+                WHERE {' AND '.join(conditions)}
+                ORDER BY filename, id
+                LIMIT ?
+            """, (*params, max_files + 1)).fetchall()
+            if len(rows) > max_files:
+                return jsonify({"message": f"More than {max_files} files match. Narrow the filter or pass 'ids'."}), 400
+    except sqlite3.Error as e:
+        current_app.logger.error(f"DB error selecting files to archive for user {g.current_user_id}: {e}", exc_info=True)
+        return jsonify({"message": "Database error fetching files."}), 500
+
+    if not rows:
+        return jsonify({"message": "No files matched."}), 404
+
+    names = unique_names(row['filename'] for row in rows)
+    entries = [ArchiveEntry(name=entry_name, key=row['filepath'], size=row['filesize'], codec=row['codec'],
+                            mtime=parse_db_timestamp(row['upload_time']))
+               for entry_name, row in zip(names, rows)]
+    current_app.logger.info(f"User '{g.current_username}' is downloading {len(entries)} file(s) as {fmt}.")
+    return archive_response(entries, fmt, f"{name}.{fmt}")
@@ -1,10 +1,12 @@
 # app/models.py
 import sqlite3
-import bcrypt
 import uuid
 import datetime
 from flask import current_app, g
 from .core.database import get_db # Assuming get_db is in core.database
+from .core.hashing import hash_password
+from .core.metadata_cache import cached_lookup, download_link_key, file_id_key, invalidate_files
+from .core.quota import add_usage
 
 # --- User Model Functions ---
 def get_user_by_username(username: str) -> sqlite3.Row | None:
@@ -18,8 +20,7 @@ def create_user(username: str, password: str) -> int:
     """Creates a new user and returns their ID."""
     db = get_db()
     cursor = db.cursor()
-    hashed_password_bytes = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
-    hashed_password_str = hashed_password_bytes.decode('utf-8')
+    hashed_password_str = hash_password(password)
     try:
         cursor.execute("INSERT INTO users (username, password_hash) VALUES (?, ?)",
                        (username, hashed_password_str))
@@ -44,8 +45,9 @@ def create_file_record(user_id: int, filename: str, filepath: str, filesize: int
             INSERT INTO files (user_id, filename, filepath, filesize, download_link_id, permission)
             VALUES (?, ?, ?, ?, ?, ?)
         """, (user_id, filename, filepath, filesize, download_link_id, permission))
-        db.commit()
         file_id = cursor.lastrowid
+        add_usage(db, user_id, filesize, 1)
+        db.commit()
         return {
             "id": file_id,
             "filename": filename,
@@ -60,29 +62,36 @@ def create_file_record(user_id: int, filename: str, filepath: str, filesize: int
         current_app.logger.error(f"Database error creating file record for user {user_id}, filename {filename}: {e}")
         raise
 
-def get_file_by_id(file_id: int) -> sqlite3.Row | None:
-    """Fetches a file by its ID."""
-    db = get_db()
-    cursor = db.cursor()
-    cursor.execute("""
-        SELECT f.id, f.filename, f.filepath, f.filesize, f.upload_time, 
-               f.permission, f.download_link_id, f.access_password_hash, 
-               f.user_id, u.username as owner_username
-        FROM files f
-        JOIN users u ON f.user_id = u.id
-        WHERE f.id = ?
-    """, (file_id,))
-    return cursor.fetchone()
+def get_file_by_id(file_id: int) -> dict | None:
+    """Fetches a file by its ID. Served from the metadata cache when possible."""
+    def _load():
+        db = get_db()
+        cursor = db.cursor()
+        cursor.execute("""
+            SELECT f.id, f.filename, f.filepath, f.filesize, f.upload_time,
+                   f.permission, f.download_link_id, f.access_password_hash,
+                   f.content_hash, f.codec, f.stored_size, f.user_id, u.username as owner_username
+            FROM files f
+            JOIN users u ON f.user_id = u.id
+            WHERE f.id = ?
+        """, (file_id,))
+        row = cursor.fetchone()
+        return dict(row) if row else None
+    return cached_lookup(file_id_key(file_id), _load)
 
-def get_file_by_download_link(link_id: str) -> sqlite3.Row | None:
-    """Fetches a file by its download link ID."""
-    db = get_db()
-    cursor = db.cursor()
-    cursor.execute("""
-        SELECT id, filename, filepath, permission, access_password_hash, user_id
-        FROM files WHERE download_link_id = ?
-    """, (link_id,))
-    return cursor.fetchone()
+def get_file_by_download_link(link_id: str) -> dict | None:
+    """Fetches a file by its download link ID. Unknown links are cached briefly as well."""
+    def _load():
+        db = get_db()
+        cursor = db.cursor()
+        cursor.execute("""
+            SELECT id, filename, filepath, filesize, permission, access_password_hash, content_hash,
+                   codec, upload_time, user_id, download_link_id
+            FROM files WHERE download_link_id = ?
+        """, (link_id,))
+        row = cursor.fetchone()
+        return dict(row) if row else None
+    return cached_lookup(download_link_key(link_id), _load, negative=True)
 
 def get_files_by_user_id(user_id: int) -> list[sqlite3.Row]:
     """Fetches all files for a given user ID."""
@@ -102,11 +111,14 @@ def update_file_permission(file_id: int, user_id: int, new_permission: str, new_
     cursor = db.cursor()
     try:
         cursor.execute("""
-            UPDATE files SET permission = ?, access_password_hash = ? 
+            UPDATE files SET permission = ?, access_password_hash = ?
             WHERE id = ? AND user_id = ?
+            RETURNING id, download_link_id
         """, (new_permission, new_access_password_hash, file_id, user_id))
+        updated = cursor.fetchall()
         db.commit()
-        return cursor.rowcount > 0 # Returns True if a row was updated
+        invalidate_files(updated)
+        return len(updated) > 0 # Returns True if a row was updated
     except sqlite3.Error as e:
         db.rollback()
         current_app.logger.error(f"Database error updating permission for file {file_id}: {e}")
@@ -118,9 +130,14 @@ def delete_file_record(file_id: int, user_id: int) -> bool:
     cursor = db.cursor()
     try:
         # Ensure to also delete the physical file in the route handler or a service layer
-        cursor.execute("DELETE FROM files WHERE id = ? AND user_id = ?", (file_id, user_id))
+        cursor.execute("DELETE FROM files WHERE id = ? AND user_id = ? RETURNING id, download_link_id, filesize", (file_id, user_id))
+        deleted = cursor.fetchone()
+        if deleted is not None:
+            add_usage(db, user_id, -deleted['filesize'], -1)
         db.commit()
-        return cursor.rowcount > 0
+        if deleted is not None:
+            invalidate_files([deleted])
+        return deleted is not None
     except sqlite3.Error as e:
         db.rollback()
         current_app.logger.error(f"Database error deleting file record {file_id}: {e}")
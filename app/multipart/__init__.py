@@ -0,0 +1,6 @@
+# app/multipart/__init__.py
+from flask import Blueprint
+
+multipart_bp = Blueprint('multipart', __name__) # S3 스타일 멀티파트(재개 가능) 업로드 API
+
+from . import routes # 라우트들을 임포트
@@ -0,0 +1,77 @@
+# app/multipart/cleanup.py
+import os
+import shutil
+import time
+import click
+from flask import current_app
+from app.core.database import get_db
+
+# 파트 파일은 최종 파일과 같은 파일시스템에 있어야 완료 시 rename/copy_file_range가 효율적이므로
+# UPLOAD_FOLDER 아래 숨김 디렉토리에 둡니다.
+MULTIPART_SUBDIR = '.multipart'
+
+
+def multipart_root_abs() -> str:
+    return os.path.join(current_app.config['UPLOAD_FOLDER'], MULTIPART_SUBDIR)
+
+
+def upload_dir_abs(upload_id: str) -> str:
+    """멀티파트 업로드 하나의 파트 파일들이 저장되는 디렉토리 (절대 경로)."""
+    return os.path.join(multipart_root_abs(), upload_id)
+
+
+def discard_upload_files(upload_id: str) -> None:
+    """업로드의 파트 디렉토리를 통째로 지웁니다. 없으면 조용히 넘어갑니다."""
+    shutil.rmtree(upload_dir_abs(upload_id), ignore_errors=True)
+
+
+def reap_expired_uploads(expiry_hours: int) -> int:
+    """
+    expiry_hours 동안 갱신되지 않은(완료/중단되지 않고 버려진) 멀티파트 업로드와
+    그 파트 파일들을 정리합니다. DB 레코드 없이 디스크에만 남은 디렉토리도 함께 지웁니다.
+    정리한 업로드 수를 반환합니다.
+    """
+    db = get_db()
+    cursor = db.cursor()
+    cursor.execute("""
+        SELECT upload_id FROM multipart_uploads
+        WHERE updated_at < datetime('now', ?)
+    """, (f'-{int(expiry_hours)} hours',))
+    expired = [row['upload_id'] for row in cursor.fetchall()]
+
+    for upload_id in expired:
+        cursor.execute("DELETE FROM upload_parts WHERE upload_id = ?", (upload_id,))
+        cursor.execute("DELETE FROM multipart_uploads WHERE upload_id = ?", (upload_id,))
+        db.commit()
+        discard_upload_files(upload_id)
+        current_app.logger.info(f"Reaped expired multipart upload '{upload_id}'.")
+
+    # 비정상 종료 등으로 DB 레코드 없이 남은 디렉토리 정리
+    root = multipart_root_abs()
+    if os.path.isdir(root):
+        cutoff = time.time() - expiry_hours * 3600
+        for entry in os.scandir(root):
+            if not entry.is_dir() or entry.stat().st_mtime > cutoff:
+                continue
+            cursor.execute("SELECT 1 FROM multipart_uploads WHERE upload_id = ?", (entry.name,))
+            if cursor.fetchone() is None:
+                shutil.rmtree(entry.path, ignore_errors=True)
+                current_app.logger.info(f"Removed orphaned multipart directory '{entry.path}'.")
+                expired.append(entry.name)
+
+    return len(expired)
+
+
+@click.command('reap-multipart')
+@click.option('--expiry-hours', type=int, default=None,
+              help='Override MULTIPART_EXPIRY_HOURS for this run.')
+def reap_multipart_command(expiry_hours):
+    """Remove abandoned multipart uploads and their part files."""
+    if expiry_hours is None:
+        expiry_hours = current_app.config['MULTIPART_EXPIRY_HOURS']
+    reaped = reap_expired_uploads(expiry_hours)
+    click.echo(f'Reaped {reaped} multipart upload(s).')
+
+
+def init_app(app):
+    app.cli.add_command(reap_multipart_command)
@@ -0,0 +1,284 @@
+# app/multipart/routes.py
+from flask import request, jsonify, current_app, g
+import os
+import sqlite3
+import uuid
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.utils import secure_filename
+from app.core.database import get_db
+from app.core.decorators import token_required
+from app.core.quota import QuotaExceeded, remaining_quota
+from app.core.streaming import (
+    SPOOLED_UPLOAD_ENVIRON_KEY, UploadTooLarge, stream_to_temp, commit_temp, discard_temp, concat_to_temp
+)
+from app.core.utils import allowed_file
+from app.files.ingest import finalize_upload
+from .cleanup import upload_dir_abs, discard_upload_files, MULTIPART_SUBDIR
+from . import multipart_bp
+
+
+def _get_own_upload(upload_id: str):
+    """현재 사용자 소유의 멀티파트 업로드 레코드를 조회합니다."""
+    cursor = get_db().cursor()
+    cursor.execute("""
+        SELECT upload_id, user_id, filename, status, created_at, updated_at
+        FROM multipart_uploads WHERE upload_id = ? AND user_id = ?
+    """, (upload_id, g.current_user_id))
+    return cursor.fetchone()
+
+
+@multipart_bp.route('/uploads', methods=['POST'])
+@token_required
+def initiate_upload_route():
+    data = request.get_json(silent=True) or {}
+    raw_filename = data.get('filename', '')
+    if not raw_filename:
+        return jsonify({"message": "Filename is required."}), 400
+    if not allowed_file(raw_filename):
+        return jsonify({"message": "File type not allowed."}), 400
+
+    original_filename = secure_filename(raw_filename)
+    upload_id = uuid.uuid4().hex
+
+    db = get_db()
+    try:
+        db.execute("""
+            INSERT INTO multipart_uploads (upload_id, user_id, filename, status)
+            VALUES (?, ?, ?, 'pending')
+        """, (upload_id, g.current_user_id, original_filename))
+        db.commit()
+    except sqlite3.Error as e:
+        db.rollback()
+        current_app.logger.error(f"DB error initiating multipart upload for user {g.current_user_id}: {e}", exc_info=True)
+        return jsonify({"message": "Database error initiating upload."}), 500
+
+    current_app.logger.info(f"Multipart upload '{upload_id}' for '{original_filename}' initiated by user '{g.current_username}'.")
+    return jsonify({
+        "message": "Multipart upload initiated.",
+        "upload_id": upload_id,
+        "filename": original_filename,
+        "min_part_size": current_app.config['MULTIPART_MIN_PART_SIZE'],
+        "max_parts": current_app.config['MULTIPART_MAX_PARTS']
+    }), 201
+
+
+@multipart_bp.route('/uploads/<string:upload_id>', methods=['GET'])
+@token_required
+def get_upload_route(upload_id):
+    """업로드 상태와 지금까지 받은 파트 목록을 돌려줍니다 (재개 시 누락된 파트 확인용)."""
+    upload = _get_own_upload(upload_id)
+    if not upload:
+        return jsonify({"message": "Upload not found."}), 404
+
+    cursor = get_db().cursor()
+    cursor.execute("""
+        SELECT part_number, size, sha256, uploaded_at FROM upload_parts
+        WHERE upload_id = ? ORDER BY part_number
+    """, (upload_id,))
+    parts = [dict(row) for row in cursor.fetchall()]
+    return jsonify({**dict(upload), "parts": parts, "count": len(parts)}), 200
+
+
+@multipart_bp.route('/uploads/<string:upload_id>/parts/<int:part_number>', methods=['PUT'])
+@token_required
+def upload_part_route(upload_id, part_number):
+    """
+    파트 하나를 요청 본문(raw body)으로 받아 별도의 파트 파일로 저장합니다.
+    파트들은 서로 독립적이므로 클라이언트가 병렬로 보내거나 실패한 파트만 다시 보낼 수 있습니다.
+    같은 번호로 다시 보내면 이전 파트를 덮어씁니다.
+    받는 동안 완료/중단될 수 있으므로 파트 파일 이동과 행 기록은 쓰기 잠금 안에서 상태를 다시 확인한 뒤에 합니다.
+    """
+    if part_number < 1 or part_number > current_app.config['MULTIPART_MAX_PARTS']:
+        return jsonify({"message": f"Part number must be between 1 and {current_app.config['MULTIPART_MAX_PARTS']}."}), 400
+
+    upload = _get_own_upload(upload_id)
+    if not upload:
+        return jsonify({"message": "Upload not found."}), 404
+    if upload['status'] != 'pending':
+        return jsonify({"message": f"Upload is {upload['status']}."}), 409
+
+    # 남은 할당량에서 이 업로드의 다른 파트들이 이미 차지한 크기를 뺀 만큼만 받습니다.
+    db = get_db()
+    remaining = remaining_quota(db, g.current_user_id)
+    if remaining is not None:
+        other_parts = db.execute("""
+            SELECT COALESCE(SUM(size), 0) FROM upload_parts WHERE upload_id = ? AND part_number != ?
+        """, (upload_id, part_number)).fetchone()[0]
+        remaining = max(remaining - other_parts, 0)
+        if remaining == 0 or (request.content_length or 0) > remaining:
+            return jsonify({"message": "Storage quota exceeded."}), 413
+
+    part_dir = upload_dir_abs(upload_id)
+    part_filename = f"{part_number:05d}.part"
+    streamed = None
+    try:
+        streamed = stream_to_temp(
+            request.stream, part_dir,
+            chunk_size=current_app.config['UPLOAD_CHUNK_SIZE'],
+            max_bytes=remaining,
+            fsync=current_app.config['UPLOAD_FSYNC'],
+            spooled=request.environ.get(SPOOLED_UPLOAD_ENVIRON_KEY)
+        )
+        expected_sha256 = request.headers.get('X-Content-SHA256')
+        if expected_sha256 and expected_sha256.lower() != streamed.sha256:
+            discard_temp(streamed.temp_path)
+            return jsonify({"message": "Part checksum mismatch.", "sha256": streamed.sha256}), 400
+
+        # 완료 요청은 상태를 'completing'으로 바꾼 뒤 파트를 읽으므로, 그 뒤에는 파트를 바꾸지 않습니다.
+        db.execute("BEGIN IMMEDIATE")
+        row = db.execute("SELECT status FROM multipart_uploads WHERE upload_id = ?", (upload_id,)).fetchone()
+        if row is None or row['status'] != 'pending':
+            db.rollback()
+            discard_temp(streamed.temp_path)
+            if row is None:
+                return jsonify({"message": "Upload not found."}), 404
+            return jsonify({"message": f"Upload is {row['status']}."}), 409
+
+        commit_temp(streamed.temp_path, os.path.join(part_dir, part_filename))
+        db.execute("""
+            INSERT OR REPLACE INTO upload_parts (upload_id, part_number, size, sha256, partpath)
+            VALUES (?, ?, ?, ?, ?)
+        """, (upload_id, part_number, streamed.size, streamed.sha256,
+              os.path.join(MULTIPART_SUBDIR, upload_id, part_filename)))
+        db.execute("UPDATE multipart_uploads SET updated_at = CURRENT_TIMESTAMP WHERE upload_id = ?", (upload_id,))
+        db.commit()
+    except UploadTooLarge:
+        return jsonify({"message": "Storage quota exceeded."}), 413
+    except RequestEntityTooLarge:
+        return jsonify({"message": "Part is too large."}), 413
+    except Exception as e:
+        current_app.logger.error(f"Failed to store part {part_number} of upload '{upload_id}': {e}", exc_info=True)
+        if streamed is not None:
+            discard_temp(streamed.temp_path)
+        if db.in_transaction:
+            db.rollback()
+        return jsonify({"message": "Failed to store part."}), 500
+
+    return jsonify({"part_number": part_number, "size": streamed.size, "sha256": streamed.sha256}), 200
+
+
+@multipart_bp.route('/uploads/<string:upload_id>/complete', methods=['POST'])
+@token_required
+def complete_upload_route(upload_id):
+    """
+    파트들을 번호 순서대로 하나의 파일로 합치고 files 레코드를 만듭니다.
+    요청 본문에 {"parts": [{"part_number": 1, "sha256": "..."}, ...]}를 주면 그 파트만 그 순서로 사용하고
+    해시를 검증합니다. 생략하면 업로드된 모든 파트를 사용합니다.
+    """
+    data = request.get_json(silent=True) or {}
+    db = get_db()
+    cursor = db.cursor()
+
+    # 동시에 두 번 완료되지 않도록 먼저 상태를 'completing'으로 바꿉니다.
+    cursor.execute("""
+        UPDATE multipart_uploads SET status = 'completing', updated_at = CURRENT_TIMESTAMP
+        WHERE upload_id = ? AND user_id = ? AND status = 'pending'
+    """, (upload_id, g.current_user_id))
+    db.commit()
+    if cursor.rowcount == 0:
+        if not _get_own_upload(upload_id):
+            return jsonify({"message": "Upload not found."}), 404
+        return jsonify({"message": "Upload is already being completed or was aborted."}), 409
+    upload = _get_own_upload(upload_id)
+
+    def _reopen(message, status_code):
+        cursor.execute("UPDATE multipart_uploads SET status = 'pending' WHERE upload_id = ?", (upload_id,))
+        db.commit()
+        return jsonify({"message": message}), status_code
+
+    cursor.execute("""
+        SELECT part_number, size, sha256, partpath FROM upload_parts
+        WHERE upload_id = ? ORDER BY part_number
+    """, (upload_id,))
+    stored_parts = {row['part_number']: row for row in cursor.fetchall()}
+    if not stored_parts:
+        return _reopen("No parts have been uploaded.", 400)
+
+    requested = data.get('parts')
+    if requested:
+        try:
+            numbers = [int(p['part_number']) for p in requested]
+        except (KeyError, TypeError, ValueError):
+            return _reopen("Invalid parts list.", 400)
+        if numbers != sorted(set(numbers)):
+            return _reopen("Parts must be listed once each in ascending order.", 400)
+        for p in requested:
+            part = stored_parts.get(int(p['part_number']))
+            if part is None:
+                return _reopen(f"Part {p['part_number']} has not been uploaded.", 400)
+            if p.get('sha256') and p['sha256'].lower() != part['sha256']:
+                return _reopen(f"Checksum mismatch for part {p['part_number']}.", 400)
+        parts = [stored_parts[n] for n in numbers]
+    else:
+        parts = [stored_parts[n] for n in sorted(stored_parts)]
+
+    min_part_size = current_app.config['MULTIPART_MIN_PART_SIZE']
+    for part in parts[:-1]:
+        if part['size'] < min_part_size:
+            return _reopen(f"Part {part['part_number']} is smaller than the minimum part size ({min_part_size} bytes).", 400)
+    total_size = sum(part['size'] for part in parts)
+    if total_size > current_app.config['MULTIPART_MAX_OBJECT_SIZE']:
+        return _reopen("Object exceeds the maximum allowed size.", 413)
+
+    upload_folder_abs = current_app.config['UPLOAD_FOLDER']
+    part_paths = [os.path.join(upload_folder_abs, part['partpath']) for part in parts]
+    streamed = None
+    try:
+        # 파트를 이어 붙이면서 해시와 크기를 함께 계산합니다 (파트를 한 번만 읽음).
+        streamed = concat_to_temp(part_paths, upload_folder_abs,
+                                  chunk_size=current_app.config['UPLOAD_CHUNK_SIZE'],
+                                  fsync=current_app.config['UPLOAD_FSYNC'])
+        if streamed.size != total_size:
+            discard_temp(streamed.temp_path)
+            current_app.logger.error(f"Multipart upload '{upload_id}' parts total {streamed.size} bytes on disk, "
+                                     f"{total_size} bytes recorded.")
+            return _reopen("Uploaded parts do not match their records; re-upload the parts.", 409)
+        record = finalize_upload(streamed, upload['filename'], g.current_user_id)
+    except QuotaExceeded:
+        # 파트는 남겨 두므로 다른 파일을 지운 뒤 다시 완료할 수 있습니다 (임시 파일은 finalize_upload가 정리).
+        return _reopen("Storage quota exceeded.", 413)
+    except Exception as e:
+        current_app.logger.error(f"Failed to complete multipart upload '{upload_id}': {e}", exc_info=True)
+        if streamed is not None:
+            discard_temp(streamed.temp_path)
+        return _reopen("Failed to complete upload.", 500)
+
+    cursor.execute("DELETE FROM upload_parts WHERE upload_id = ?", (upload_id,))
+    cursor.execute("DELETE FROM multipart_uploads WHERE upload_id = ?", (upload_id,))
+    db.commit()
+    discard_upload_files(upload_id)
+
+    current_app.logger.info(f"Multipart upload '{upload_id}' completed as file {record['id']} ({len(parts)} parts, {total_size} bytes) by user '{g.current_username}'.")
+    return jsonify({
+        "message": "File uploaded successfully.",
+        "file_id": record['id'],
+        "filename": record['filename'],
+        "filesize_bytes": record['filesize'],
+        "sha256": record['content_hash'],
+        "download_link_id": record['download_link_id'],
+        "parts": len(parts)
+    }), 201
+
+
+@multipart_bp.route('/uploads/<string:upload_id>', methods=['DELETE'])
+@token_required
+def abort_upload_route(upload_id):
+    db = get_db()
+    cursor = db.cursor()
+    cursor.execute("""
+        UPDATE multipart_uploads SET status = 'aborted', updated_at = CURRENT_TIMESTAMP
+        WHERE upload_id = ? AND user_id = ? AND status = 'pending'
+    """, (upload_id, g.current_user_id))
+    db.commit()
+    if cursor.rowcount == 0:
+        if not _get_own_upload(upload_id):
+            return jsonify({"message": "Upload not found."}), 404
+        return jsonify({"message": "Upload is being completed and cannot be aborted."}), 409
+
+    cursor.execute("DELETE FROM upload_parts WHERE upload_id = ?", (upload_id,))
+    cursor.execute("DELETE FROM multipart_uploads WHERE upload_id = ?", (upload_id,))
+    db.commit()
+    discard_upload_files(upload_id)
+
+    current_app.logger.info(f"Multipart upload '{upload_id}' aborted by user '{g.current_username}'.")
+    return jsonify({"message": "Upload aborted."}), 200
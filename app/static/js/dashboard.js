@@ -41,12 +41,34 @@ document.addEventListener('DOMContentLoaded', function () {
         return;
     }
 
-    async function fetchAndDisplayFiles() {
+    // 파일 목록 페이지네이션 (서버가 돌려준 next_cursor로 다음 페이지 요청)
+    // 검색어가 있으면 /api/files/search 결과를 보여주고 next_offset으로 다음 페이지를 요청합니다.
+    const loadMoreBtn = document.getElementById('loadMoreBtn');
+    const fileSearchInput = document.getElementById('fileSearchInput');
+    const FILE_PAGE_SIZE = 100;
+    let nextFileCursor = null;
+    let nextSearchOffset = null;
+    let searchQuery = '';
+
+    async function fetchAndDisplayFiles(append = false) {
         if (!fileListBody) return;
-        fileListBody.innerHTML = '<tr><td colspan="5" style="text-align:center;">파일을 불러오는 중...</td></tr>';
+        if (!append) {
+            nextFileCursor = null;
+            nextSearchOffset = null;
+            fileListBody.innerHTML = '<tr><td colspan="5" style="text-align:center;">파일을 불러오는 중...</td></tr>';
+        }
+        if (loadMoreBtn) loadMoreBtn.disabled = true;
 
         try {
-            const response = await fetch('/api/files', {
+            let url;
+            if (searchQuery) {
+                url = `/api/files/search?q=${encodeURIComponent(searchQuery)}&limit=${FILE_PAGE_SIZE}`;
+                if (append && nextSearchOffset) url += `&offset=${nextSearchOffset}`;
+            } else {
+                url = `/api/files?limit=${FILE_PAGE_SIZE}`;
+                if (append && nextFileCursor) url += `&cursor=${encodeURIComponent(nextFileCursor)}`;
+            }
+            const response = await fetch(url, {
                 method: 'GET',
                 headers: { 'Authorization': `Bearer ${token}`, 'Content-Type': 'application/json' }
             });
@@ -62,12 +84,22 @@ document.addEventListener('DOMContentLoaded', function () {
                 throw new Error(errorData.message || `HTTP 오류! 상태: ${response.status}`);
             }
             const data = await response.json();
+            nextFileCursor = data.next_cursor || null;
+            nextSearchOffset = data.next_offset || null;
+            if (loadMoreBtn) {
+                loadMoreBtn.style.display = data.has_more ? 'inline-block' : 'none';
+                loadMoreBtn.disabled = false;
+            }
 
             if (data.files && data.files.length > 0) {
-                fileListBody.innerHTML = '';
+                if (!append) fileListBody.innerHTML = '';
                 data.files.forEach(file => {
                     const row = fileListBody.insertRow();
-                    row.insertCell().textContent = file.filename;
+                    const nameCell = row.insertCell();
+                    if (THUMBNAIL_EXTENSIONS.has(file.filename.split('.').pop().toLowerCase())) {
+                        loadThumbnail(nameCell, file.id);
+                    }
+                    nameCell.appendChild(document.createTextNode(file.filename));
                     row.insertCell().textContent = formatFileSize(file.filesize);
                     row.insertCell().textContent = new Date(file.upload_time).toLocaleString('ko-KR');
                     row.insertCell().textContent = getPermissionText(file.permission);
@@ -106,8 +138,9 @@ document.addEventListener('DOMContentLoaded', function () {
                     actionsCell.appendChild(deleteButton);
                 });
                 if (fileListMessage) fileListMessage.textContent = '';
-            } else {
-                fileListBody.innerHTML = '<tr><td colspan="5" style="text-align:center;">업로드된 파일이 없습니다.</td></tr>';
+            } else if (!append) {
+                const emptyText = searchQuery ? '검색 결과가 없습니다.' : '업로드된 파일이 없습니다.';
+                fileListBody.innerHTML = `<tr><td colspan="5" style="text-align:center;">${emptyText}</td></tr>`;
             }
         } catch (error) {
             console.error('파일 가져오기 오류:', error);
@@ -116,6 +149,31 @@ document.addEventListener('DOMContentLoaded', function () {
         }
     }
 
+    // 이미지 파일은 작은 썸네일을 함께 보여줍니다. 썸네일 API는 JWT가 필요하므로 fetch로 받아 blob URL로 표시하며,
+    // 아직 만드는 중(202)이면 잠시 뒤 한 번 더 요청합니다. 응답은 브라우저가 오래 캐시합니다.
+    const THUMBNAIL_EXTENSIONS = new Set(['png', 'jpg', 'jpeg', 'gif', 'bmp']);
+
+    async function loadThumbnail(cell, fileId, retries = 3) {
+        try {
+            const response = await fetch(`/api/files/${fileId}/thumbnail?size=128`, {
+                headers: { 'Authorization': `Bearer ${token}` }
+            });
+            if (response.status === 202 && retries > 0) {
+                setTimeout(() => loadThumbnail(cell, fileId, retries - 1), 1000);
+                return;
+            }
+            if (!response.ok) return;
+            const img = document.createElement('img');
+            img.src = URL.createObjectURL(await response.blob());
+            img.alt = '';
+            img.className = 'file-thumbnail';
+            img.onload = () => URL.revokeObjectURL(img.src);
+            cell.insertBefore(img, cell.firstChild);
+        } catch (error) {
+            console.error('썸네일 로드 오류:', error);
+        }
+    }
+
     function formatFileSize(bytes) { /* ... (이전과 동일) ... */ 
         if (bytes === 0) return '0 Bytes';
         const k = 1024;
@@ -331,6 +389,22 @@ document.addEventListener('DOMContentLoaded', function () {
         }
     });
 
+    if (loadMoreBtn) {
+        loadMoreBtn.addEventListener('click', () => fetchAndDisplayFiles(true));
+    }
+
+    // 입력이 멈춘 뒤 300ms가 지나면 서버에서 검색합니다.
+    let searchTimer = null;
+    if (fileSearchInput) {
+        fileSearchInput.addEventListener('input', () => {
+            clearTimeout(searchTimer);
+            searchTimer = setTimeout(() => {
+                searchQuery = fileSearchInput.value.trim();
+                fetchAndDisplayFiles(false);
+            }, 300);
+        });
+    }
+
     fetchAndDisplayFiles();
-    window.refreshFileList = fetchAndDisplayFiles;
+    window.refreshFileList = () => fetchAndDisplayFiles(false);
 });
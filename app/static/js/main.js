@@ -35,6 +35,11 @@
         if (logoutButton) {
             logoutButton.addEventListener('click', function (event) {
                 event.preventDefault(); 
+                const token = localStorage.getItem('jwtToken');
+                if (token) {
+                    // 서버에서도 토큰을 폐기합니다 (응답은 기다리지 않음).
+                    fetch('/api/auth/logout', { method: 'POST', headers: { 'Authorization': `Bearer ${token}` }, keepalive: true }).catch(() => {});
+                }
                 localStorage.removeItem('jwtToken');
                 localStorage.removeItem('username');
                 updateNavUI();
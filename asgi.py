@@ -0,0 +1,28 @@
+# asgi.py
+# ASGI 서버용 진입점. 개발 서버(run.py)와 달리 연결마다 스레드를 쓰지 않으므로
+# 동시에 열려 있는 다운로드/업로드 연결을 훨씬 많이 유지할 수 있습니다.
+#   python asgi.py                                  # ASGI_WORKERS개 프로세스로 uvicorn 실행
+#   uvicorn asgi:application --workers 4 --port 5050 # 직접 실행
+from app import create_app
+from app.core.asgi import ASGIAdapter
+from config import DevelopmentConfig, ProductionConfig
+import os
+
+if os.environ.get('FLASK_ENV') == 'production':
+    app_config = ProductionConfig()
+else:
+    app_config = DevelopmentConfig()
+
+app = create_app(app_config)
+application = ASGIAdapter(app)
+
+if __name__ == '__main__':
+    import uvicorn
+    uvicorn.run(
+        'asgi:application',
+        host=app.config['ASGI_HOST'],
+        port=app.config['ASGI_PORT'],
+        workers=app.config['ASGI_WORKERS'],
+        lifespan='on',
+        proxy_headers=True,
+    )
@@ -0,0 +1,11 @@
+# bench/__init__.py
+# 스토리지 API 부하/벤치마크 도구.
+# create_app()으로 임시 UPLOAD_FOLDER와 DB를 쓰는 앱을 만들어 로컬 스레드 서버로 띄우고,
+# 실제 HTTP 요청으로 시나리오(업로드, 목록, 다운로드, Range, 일괄 삭제, 혼합)를 실행합니다.
+# 결과(처리량, p50/p95/p99 지연)는 bench/baselines/<이름>.json에 저장해 두고 이후 실행과 비교합니다.
+# 수동으로만 실행하는 도구입니다 (pytest는 tests/만 수집). 정확성 검증은 tests/의 테스트가 담당합니다.
+#
+# 사용 예:
+#   python -m bench --scenario all --save-baseline main
+#   python -m bench --scenario all --compare main          # 회귀가 있으면 종료 코드 1
+#   python -m bench --scenario download_public --set FILE_DELIVERY_MODE=x-accel
@@ -0,0 +1,86 @@
+# bench/__main__.py
+import json
+import sys
+import click
+
+from bench.harness import BenchServer
+from bench import report
+from bench.scenarios import SCENARIOS, run_scenario
+
+# 'all'은 개별 시나리오를 하나씩 (각각 새 앱/DB에서) 실행합니다. 'mixed'는 all에 포함하지 않습니다.
+ALL_SCENARIOS = ['upload', 'list', 'download_public', 'download_password', 'range', 'bulk_delete']
+
+
+def _parse_overrides(pairs) -> dict:
+    """--set KEY=VALUE 목록을 설정 값 dict로 바꿉니다. 값은 JSON으로 읽고, 안 되면 문자열로 둡니다."""
+    overrides = {}
+    for pair in pairs:
+        key, sep, raw = pair.partition('=')
+        if not sep:
+            raise click.BadParameter(f"'{pair}' is not KEY=VALUE.", param_hint='--set')
+        try:
+            overrides[key] = json.loads(raw)
+        except ValueError:
+            overrides[key] = raw
+    return overrides
+
+
+@click.command()
+@click.option('--scenario', '-s', 'scenarios', multiple=True, default=['all'], show_default=True,
+              type=click.Choice(['all', *SCENARIOS]), help='Scenario to run (repeatable).')
+@click.option('--requests', '-n', type=int, default=None, help='Measured requests per scenario (default: per scenario).')
+@click.option('--concurrency', '-c', type=int, default=8, show_default=True, help='Concurrent client threads.')
+@click.option('--warmup', type=int, default=20, show_default=True, help='Unmeasured requests before measuring.')
+@click.option('--seed', type=int, default=1, show_default=True, help='Seed for payloads and request mix.')
+@click.option('--server', type=click.Choice(['werkzeug', 'asgi']), default='werkzeug', show_default=True,
+              help='Serve with the threaded Werkzeug server or uvicorn + the ASGI adapter.')
+@click.option('--set', 'settings', multiple=True, metavar='KEY=VALUE', help='Override an app config value.')
+@click.option('--save-baseline', metavar='NAME', help='Save results to bench/baselines/NAME.json.')
+@click.option('--compare', 'compare_to', metavar='NAME', help='Compare results with a saved baseline.')
+@click.option('--tolerance', type=float, default=0.15, show_default=True,
+              help='Allowed relative p95 increase / throughput drop before flagging a regression.')
+@click.option('--min-delta-ms', type=float, default=2.0, show_default=True,
+              help='Ignore p95 increases smaller than this many milliseconds.')
+@click.option('--json', 'as_json', is_flag=True, help='Print results as JSON.')
+def main(scenarios, requests, concurrency, warmup, seed, server, settings, save_baseline, compare_to, tolerance,
+         min_delta_ms, as_json):
+    """Run storage API benchmarks against a throwaway app instance."""
+    names = []
+    for name in scenarios:
+        names.extend(ALL_SCENARIOS if name == 'all' else [name])
+    names = list(dict.fromkeys(names))
+    overrides = _parse_overrides(settings)
+
+    results = {}
+    for name in names:
+        cls = SCENARIOS[name]
+        ops = requests or cls.default_ops
+        click.echo(f"[{name}] {ops} requests, concurrency {concurrency}...", err=True)
+        # 시나리오마다 새 앱과 빈 DB를 써서 앞 시나리오가 남긴 데이터의 영향을 받지 않게 합니다.
+        with BenchServer(overrides, server=server) as bench_server:
+            results[name] = run_scenario(cls(bench_server, seed), ops, concurrency, warmup, seed)
+
+    click.echo(json.dumps(results, indent=2) if as_json else report.format_results(results))
+
+    if save_baseline:
+        options = {"requests": requests, "concurrency": concurrency, "warmup": warmup, "seed": seed,
+                   "server": server, "settings": overrides}
+        path = report.save_baseline(save_baseline, results, options)
+        click.echo(f"Baseline saved to {path}", err=True)
+
+    if compare_to:
+        baseline = report.load_baseline(compare_to)
+        base_opts = baseline.get('options', {})
+        if (base_opts.get('concurrency'), base_opts.get('requests')) != (concurrency, requests):
+            click.echo(f"Warning: baseline was recorded with concurrency={base_opts.get('concurrency')}, "
+                       f"requests={base_opts.get('requests')}.", err=True)
+        regressions = report.compare(results, baseline, tolerance, min_delta_ms)
+        for line in regressions:
+            click.echo(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+        click.echo(f"No regressions against baseline '{compare_to}'.")
+
+
+if __name__ == '__main__':
+    main()
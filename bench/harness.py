@@ -0,0 +1,162 @@
+# bench/harness.py
+import http.client
+import json
+import logging
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+from urllib.parse import urlencode
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+from app import create_app
+from config import ProductionConfig
+
+
+def build_app(workdir: str, overrides: dict | None = None):
+    """workdir 아래 임시 UPLOAD_FOLDER / DB를 쓰는 앱을 만들고 스키마를 초기화합니다."""
+    class BenchConfig(ProductionConfig):
+        UPLOAD_FOLDER = os.path.join(workdir, 'uploads')
+        DATABASE = os.path.join(workdir, 'db', 'bench.sqlite')
+        # 측정 중 백그라운드 정리 작업이 끼어들지 않도록 끕니다.
+        DELETION_REAPER_INTERVAL = 0
+
+    for key, value in (overrides or {}).items():
+        setattr(BenchConfig, key, value)
+
+    app = create_app(BenchConfig)
+    # 요청마다 남는 INFO 로그가 지연 시간에 섞이지 않도록 경고 이상만 기록합니다.
+    app.logger.setLevel(logging.WARNING)
+    with app.app_context():
+        from app.core.database import init_db
+        init_db()
+    return app
+
+
+class _QuietRequestHandler(WSGIRequestHandler):
+    def log_request(self, *args, **kwargs):
+        pass # 요청마다 찍히는 접근 로그는 측정에 방해만 됩니다.
+
+
+class BenchServer:
+    """
+    앱을 127.0.0.1의 임의 포트에서 실행합니다.
+    server='werkzeug'는 스레드 방식 Werkzeug 서버(run.py와 같은 방식), 'asgi'는 uvicorn + ASGIAdapter(asgi.py와 같은 방식)입니다.
+    """
+
+    def __init__(self, overrides: dict | None = None, keep_workdir: bool = False, server: str = 'werkzeug'):
+        self.workdir = tempfile.mkdtemp(prefix='objstore-bench-')
+        self.keep_workdir = keep_workdir
+        self.app = build_app(self.workdir, overrides)
+        self.host = '127.0.0.1'
+        if server == 'asgi':
+            import uvicorn # ASGI 모드를 잴 때만 필요합니다.
+            from app.core.asgi import ASGIAdapter
+            sock = socket.socket()
+            sock.bind((self.host, 0))
+            self.port = sock.getsockname()[1]
+            sock.close()
+            self._uvicorn = uvicorn.Server(uvicorn.Config(ASGIAdapter(self.app), host=self.host, port=self.port,
+                                                          log_level='warning', access_log=False, lifespan='on'))
+            self._thread = threading.Thread(target=self._uvicorn.run, name='bench-server', daemon=True)
+        else:
+            self._uvicorn = None
+            self._server = make_server(self.host, 0, self.app, threaded=True, request_handler=_QuietRequestHandler)
+            self.port = self._server.server_port
+            self._thread = threading.Thread(target=self._server.serve_forever, name='bench-server', daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        if self._uvicorn is not None:
+            while not self._uvicorn.started:
+                time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc):
+        if self._uvicorn is not None:
+            self._uvicorn.should_exit = True # lifespan shutdown에서 DB 풀도 닫습니다.
+            self._thread.join()
+        else:
+            self._server.shutdown()
+            self._thread.join()
+            from app.core.database import get_pool
+            get_pool(self.app).close_all()
+        if not self.keep_workdir:
+            shutil.rmtree(self.workdir, ignore_errors=True)
+
+
+class Response:
+    __slots__ = ('status', 'headers', 'body')
+
+    def __init__(self, status: int, headers: dict, body: bytes):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    def json(self):
+        return json.loads(self.body)
+
+
+class Client:
+    """
+    keep-alive 연결 하나를 쓰는 HTTP 클라이언트. 스레드마다 하나씩 만듭니다.
+    recorder가 있으면 요청마다 (라벨, 지연, 응답 바이트, 성공 여부)를 기록합니다.
+    """
+
+    def __init__(self, host: str, port: int, token: str | None = None, recorder=None):
+        self.host = host
+        self.port = port
+        self.token = token
+        self.recorder = recorder
+        self._conn = http.client.HTTPConnection(host, port, timeout=120)
+
+    def close(self):
+        self._conn.close()
+
+    def _send(self, method, path, body, headers):
+        try:
+            self._conn.request(method, path, body=body, headers=headers)
+            resp = self._conn.getresponse()
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+            # 서버가 keep-alive 연결을 닫은 경우 한 번만 다시 연결합니다.
+            self._conn.close()
+            self._conn.request(method, path, body=body, headers=headers)
+            resp = self._conn.getresponse()
+        return Response(resp.status, dict(resp.getheaders()), resp.read())
+
+    def request(self, method: str, path: str, *, label: str | None = None, params: dict | None = None,
+                json_body=None, data: bytes | None = None, headers: dict | None = None,
+                expect=(200,)) -> Response:
+        headers = dict(headers or {})
+        if self.token:
+            headers.setdefault('Authorization', f'Bearer {self.token}')
+        if json_body is not None:
+            data = json.dumps(json_body).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+        if params:
+            path = f"{path}?{urlencode(params)}"
+
+        start = time.perf_counter()
+        resp = self._send(method, path, data, headers)
+        elapsed = time.perf_counter() - start
+        ok = resp.status in expect
+        if self.recorder is not None and label:
+            self.recorder.record(label, elapsed, len(resp.body) + len(data or b''), ok)
+        if not ok and self.recorder is None:
+            raise RuntimeError(f"{method} {path} -> {resp.status}: {resp.body[:200]!r}")
+        return resp
+
+
+def create_user(server: BenchServer, username: str, password: str = 'bench-password') -> str:
+    """사용자를 등록하고 로그인해 JWT를 돌려줍니다."""
+    client = Client(server.host, server.port)
+    try:
+        client.request('POST', '/api/auth/register', json_body={'username': username, 'password': password},
+                       expect=(201,))
+        token = client.request('POST', '/api/auth/login',
+                               json_body={'username': username, 'password': password}).json()['token']
+    finally:
+        client.close()
+    return token
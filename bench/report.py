@@ -0,0 +1,147 @@
+# bench/report.py
+import json
+import math
+import os
+import platform
+import subprocess
+import threading
+import time
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines')
+
+
+class Recorder:
+    """라벨(요청 종류)별 지연 시간, 전송 바이트, 실패 수를 모읍니다. 여러 스레드에서 동시에 호출됩니다."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latencies = {}
+        self._bytes = {}
+        self._errors = {}
+        self.started = None
+        self.finished = None
+
+    def start(self):
+        self.started = time.perf_counter()
+
+    def stop(self):
+        self.finished = time.perf_counter()
+
+    def record(self, label: str, elapsed: float, nbytes: int, ok: bool) -> None:
+        with self._lock:
+            self._latencies.setdefault(label, []).append(elapsed)
+            self._bytes[label] = self._bytes.get(label, 0) + nbytes
+            if not ok:
+                self._errors[label] = self._errors.get(label, 0) + 1
+
+    def summary(self) -> dict:
+        duration = (self.finished or time.perf_counter()) - self.started
+        labels = {}
+        with self._lock:
+            for label, samples in sorted(self._latencies.items()):
+                labels[label] = summarize(samples, self._bytes[label], self._errors.get(label, 0), duration)
+            total = [s for samples in self._latencies.values() for s in samples]
+            total_summary = summarize(total, sum(self._bytes.values()), sum(self._errors.values()), duration)
+        return {"duration_s": round(duration, 3), "total": total_summary, "labels": labels}
+
+
+def percentile(sorted_samples: list, pct: float) -> float:
+    """nearest-rank 방식 백분위수."""
+    if not sorted_samples:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(sorted_samples)), 1)
+    return sorted_samples[rank - 1]
+
+
+def summarize(samples: list, nbytes: int, errors: int, duration: float) -> dict:
+    ordered = sorted(samples)
+    count = len(ordered)
+    ms = lambda seconds: round(seconds * 1000, 3)
+    return {
+        "requests": count,
+        "errors": errors,
+        "throughput_rps": round(count / duration, 2) if duration > 0 else 0.0,
+        "throughput_mb_s": round(nbytes / duration / (1024 * 1024), 2) if duration > 0 else 0.0,
+        "mean_ms": ms(sum(ordered) / count) if count else 0.0,
+        "p50_ms": ms(percentile(ordered, 50)),
+        "p95_ms": ms(percentile(ordered, 95)),
+        "p99_ms": ms(percentile(ordered, 99)),
+        "max_ms": ms(ordered[-1]) if count else 0.0,
+    }
+
+
+def format_results(results: dict) -> str:
+    header = f"{'scenario / request':<36} {'reqs':>6} {'err':>4} {'req/s':>9} {'MB/s':>8} " \
+             f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+    lines = [header, '-' * len(header)]
+    for scenario, result in results.items():
+        rows = [(scenario, result['total'])]
+        if len(result['labels']) > 1:
+            rows += [(f"  {label}", stats) for label, stats in result['labels'].items()]
+        for name, s in rows:
+            lines.append(f"{name:<36} {s['requests']:>6} {s['errors']:>4} {s['throughput_rps']:>9.1f} "
+                         f"{s['throughput_mb_s']:>8.2f} {s['p50_ms']:>9.2f} {s['p95_ms']:>9.2f} {s['p99_ms']:>9.2f}")
+    return '\n'.join(lines)
+
+
+def environment() -> dict:
+    """기준값을 비교할 때 같은 조건인지 확인할 수 있도록 실행 환경을 함께 저장합니다."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(BASELINE_DIR), timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "commit": commit,
+        "recorded_at": time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+    }
+
+
+def baseline_path(name: str) -> str:
+    return name if name.endswith('.json') else os.path.join(BASELINE_DIR, f"{name}.json")
+
+
+def save_baseline(name: str, results: dict, options: dict) -> str:
+    path = baseline_path(name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({"environment": environment(), "options": options, "results": results}, f, indent=2)
+        f.write('\n')
+    return path
+
+
+def load_baseline(name: str) -> dict:
+    with open(baseline_path(name), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare(results: dict, baseline: dict, tolerance: float, min_delta_ms: float) -> list[str]:
+    """
+    기준값 대비 회귀 목록을 반환합니다.
+    - 요청 종류별 p95가 tolerance 비율 이상, 그리고 min_delta_ms 이상 늘어난 경우
+    - 시나리오 처리량(req/s)이 tolerance 비율 이상 줄어든 경우
+    - 기준값에는 없던 실패가 생긴 경우
+    아주 짧은 요청의 작은 흔들림을 회귀로 보지 않도록 절대값 기준(min_delta_ms)을 함께 씁니다.
+    """
+    regressions = []
+    for scenario, result in results.items():
+        base = baseline['results'].get(scenario)
+        if base is None:
+            continue
+        base_rps = base['total']['throughput_rps']
+        rps = result['total']['throughput_rps']
+        if base_rps and rps < base_rps * (1 - tolerance):
+            regressions.append(f"{scenario}: throughput {rps:.1f} req/s vs baseline {base_rps:.1f} req/s")
+        for label, stats in result['labels'].items():
+            base_stats = base['labels'].get(label)
+            if base_stats is None:
+                continue
+            p95, base_p95 = stats['p95_ms'], base_stats['p95_ms']
+            if p95 > base_p95 * (1 + tolerance) and p95 - base_p95 >= min_delta_ms:
+                regressions.append(f"{scenario}/{label}: p95 {p95:.2f} ms vs baseline {base_p95:.2f} ms")
+            if stats['errors'] and not base_stats['errors']:
+                regressions.append(f"{scenario}/{label}: {stats['errors']} failed request(s), baseline had none")
+    return regressions
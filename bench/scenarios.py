@@ -0,0 +1,299 @@
+# bench/scenarios.py
+import collections
+import datetime
+import itertools
+import random
+import threading
+import uuid
+
+from bench.harness import Client, create_user
+from bench.report import Recorder
+
+# 각 시나리오는 setup()에서 필요한 사용자와 파일을 만들고, run_once()에서 요청 하나(또는 한 묶음)를 보냅니다.
+# setup은 실행할 횟수(ops)를 미리 받으므로 일괄 삭제처럼 요청마다 자원을 소비하는 시나리오도
+# 필요한 만큼만 준비합니다. 요청 종류와 크기, 순서는 seed로 고정되어 실행마다 같습니다.
+
+KB = 1024
+MB = 1024 * 1024
+
+
+def _auth(token: str) -> dict:
+    return {'Authorization': f'Bearer {token}'}
+
+
+def _upload(client: Client, token: str, name: str, data: bytes, label: str | None = None) -> dict:
+    return client.request('POST', '/api/upload/stream', label=label, params={'filename': name}, data=data,
+                          headers=_auth(token), expect=(201,)).json()
+
+
+def _unique_payload(base: bytes, size: int, tag: str) -> bytes:
+    # 앞부분을 요청마다 다르게 만들어 blob 중복 제거로 쓰기가 생략되지 않게 합니다.
+    prefix = f"{tag}:{uuid.uuid4().hex}\n".encode('ascii')
+    return (prefix + base)[:size]
+
+
+class Scenario:
+    name = ''
+    default_ops = 100
+
+    def __init__(self, server, seed: int):
+        self.server = server
+        self.rng = random.Random(seed)
+
+    def client(self, recorder=None) -> Client:
+        return Client(self.server.host, self.server.port, recorder=recorder)
+
+    def setup(self, ops: int) -> None:
+        pass
+
+    def run_once(self, client: Client, rng: random.Random) -> None:
+        raise NotImplementedError
+
+
+class UploadScenario(Scenario):
+    """여러 크기의 파일을 동시에 스트리밍 업로드합니다 (/api/upload/stream)."""
+    name = 'upload'
+    default_ops = 300
+    # (라벨, 크기, 가중치): 작은 파일이 대부분이고 큰 파일이 가끔 섞이는 분포
+    SIZES = [('upload_1k', 1 * KB, 50), ('upload_64k', 64 * KB, 30), ('upload_1m', 1 * MB, 15),
+             ('upload_8m', 8 * MB, 5)]
+
+    def setup(self, ops):
+        self.token = create_user(self.server, f"bench-upload-{uuid.uuid4().hex[:8]}")
+        self.base = self.rng.randbytes(max(size for _, size, _ in self.SIZES))
+        self.counter = itertools.count()
+
+    def run_once(self, client, rng):
+        label, size, _ = rng.choices(self.SIZES, weights=[w for _, _, w in self.SIZES])[0]
+        n = next(self.counter)
+        _upload(client, self.token, f"bench-{n}.txt", _unique_payload(self.base, size, str(n)), label=label)
+
+
+class ListScenario(Scenario):
+    """파일이 많은 사용자의 목록을 정렬 기준을 바꿔 가며 커서로 넘겨 봅니다."""
+    name = 'list'
+    default_ops = 500
+    file_count = 10000
+    SORTS = [('upload_time', 'desc'), ('filename', 'asc'), ('filesize', 'desc')]
+
+    def setup(self, ops):
+        self.username = f"bench-list-{uuid.uuid4().hex[:8]}"
+        self.token = create_user(self.server, self.username)
+        # 수만 건을 HTTP로 올리면 준비가 측정보다 오래 걸리므로 파일 행만 직접 넣습니다 (목록은 본문을 읽지 않음).
+        app = self.server.app
+        with app.app_context():
+            from app.core.database import get_db
+            from app.core.quota import add_usage
+            db = get_db()
+            user_id = db.execute("SELECT id FROM users WHERE username = ?", (self.username,)).fetchone()[0]
+            start = datetime.datetime(2024, 1, 1)
+            exts = ['txt', 'pdf', 'png', 'mp4', 'zip']
+            rows = []
+            total = 0
+            for i in range(self.file_count):
+                ext = exts[i % len(exts)]
+                size = self.rng.randint(1, 50 * MB)
+                total += size
+                rows.append((user_id, f"file-{self.rng.randrange(10 ** 8):08d}.{ext}", ext, f"bench/list/{i}", size,
+                             (start + datetime.timedelta(seconds=i)).strftime('%Y-%m-%d %H:%M:%S'),
+                             str(uuid.uuid4())))
+            db.executemany("""
+                INSERT INTO files (user_id, filename, extension, filepath, filesize, upload_time, download_link_id)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+            add_usage(db, user_id, total, len(rows))
+            db.commit()
+        self.cursors = threading.local()
+
+    def run_once(self, client, rng):
+        state = getattr(self.cursors, 'state', None)
+        if state is None:
+            sort, order = rng.choice(self.SORTS)
+            state = self.cursors.state = {'sort': sort, 'order': order, 'cursor': None}
+        params = {'sort': state['sort'], 'order': state['order'], 'limit': 100}
+        if state['cursor']:
+            params['cursor'] = state['cursor']
+        resp = client.request('GET', '/api/files', label='list_page', params=params, headers=_auth(self.token))
+        next_cursor = resp.json().get('next_cursor') if resp.status == 200 else None
+        # 끝까지 넘겼거나 몇 페이지 본 뒤에는 다른 정렬로 처음부터 다시 봅니다.
+        if not next_cursor or rng.random() < 0.1:
+            self.cursors.state = None
+        else:
+            state['cursor'] = next_cursor
+
+
+class PublicDownloadScenario(Scenario):
+    """공개 링크로 여러 크기의 파일을 끝까지 내려받습니다."""
+    name = 'download_public'
+    default_ops = 500
+    SIZES = [('download_4k', 4 * KB, 60), ('download_256k', 256 * KB, 30), ('download_4m', 4 * MB, 10)]
+
+    def setup(self, ops):
+        self.token = create_user(self.server, f"bench-public-{uuid.uuid4().hex[:8]}")
+        client = self.client()
+        self.links = []
+        for label, size, weight in self.SIZES:
+            info = _upload(client, self.token, f"{label}.txt", self.rng.randbytes(size))
+            client.request('PUT', f"/api/files/{info['file_id']}/permission", json_body={'permission': 'public'},
+                           headers=_auth(self.token))
+            self.links.append((label, info['download_link_id'], weight))
+        client.close()
+
+    def run_once(self, client, rng):
+        label, link_id, _ = rng.choices(self.links, weights=[w for _, _, w in self.links])[0]
+        client.request('GET', f"/api/download/{link_id}", label=label)
+
+
+class PasswordDownloadScenario(Scenario):
+    """비밀번호로 보호된 링크 다운로드. 요청마다 bcrypt 확인이 들어가므로 해시 풀의 영향을 봅니다."""
+    name = 'download_password'
+    default_ops = 40
+    password = 'bench-link-password'
+
+    def setup(self, ops):
+        self.token = create_user(self.server, f"bench-password-{uuid.uuid4().hex[:8]}")
+        client = self.client()
+        info = _upload(client, self.token, 'protected.txt', self.rng.randbytes(64 * KB))
+        client.request('PUT', f"/api/files/{info['file_id']}/permission",
+                       json_body={'permission': 'password', 'password': self.password}, headers=_auth(self.token))
+        client.close()
+        self.link_id = info['download_link_id']
+
+    def run_once(self, client, rng):
+        client.request('GET', f"/api/download/{self.link_id}", label='download_password',
+                       params={'password': self.password})
+
+
+class RangeScenario(Scenario):
+    """큰 공개 파일의 임의 구간을 Range 요청으로 읽습니다 (단일 구간 80%, 다중 구간 20%)."""
+    name = 'range'
+    default_ops = 500
+    file_size = 16 * MB
+    chunk = 64 * KB
+
+    def setup(self, ops):
+        self.token = create_user(self.server, f"bench-range-{uuid.uuid4().hex[:8]}")
+        client = self.client()
+        info = _upload(client, self.token, 'ranged.txt', self.rng.randbytes(self.file_size))
+        client.request('PUT', f"/api/files/{info['file_id']}/permission", json_body={'permission': 'public'},
+                       headers=_auth(self.token))
+        client.close()
+        self.link_id = info['download_link_id']
+
+    def _span(self, rng, lo, hi):
+        start = rng.randrange(lo, hi - self.chunk)
+        return f"{start}-{start + self.chunk - 1}"
+
+    def run_once(self, client, rng):
+        if rng.random() < 0.8:
+            label, spec = 'range_single', self._span(rng, 0, self.file_size)
+        else:
+            # 구간은 오름차순이고 겹치지 않아야 하므로 파일을 셋으로 나눠 각 부분에서 하나씩 고릅니다.
+            third = self.file_size // 3
+            label, spec = 'range_multi', ','.join(self._span(rng, i * third, (i + 1) * third) for i in range(3))
+        client.request('GET', f"/api/download/{self.link_id}", label=label, headers={'Range': f"bytes={spec}"},
+                       expect=(206,))
+
+
+class BulkDeleteScenario(Scenario):
+    """미리 올려 둔 작은 파일을 batch_size개씩 /api/files/batch/delete로 지웁니다."""
+    name = 'bulk_delete'
+    default_ops = 20
+    batch_size = 100
+
+    def setup(self, ops):
+        self.token = create_user(self.server, f"bench-delete-{uuid.uuid4().hex[:8]}")
+        names = [f"victim-{i}.txt" for i in range(ops * self.batch_size)]
+        ids = []
+        lock = threading.Lock()
+
+        def worker(chunk):
+            client = self.client()
+            for name in chunk:
+                file_id = _upload(client, self.token, name, _unique_payload(b'', 512, name))['file_id']
+                with lock:
+                    ids.append(file_id)
+            client.close()
+
+        threads = [threading.Thread(target=worker, args=(names[i::8],)) for i in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        ids.sort()
+        self.batches = collections.deque(ids[i:i + self.batch_size] for i in range(0, len(ids), self.batch_size))
+
+    def run_once(self, client, rng):
+        batch = self.batches.popleft()
+        client.request('POST', '/api/files/batch/delete', label='bulk_delete', json_body={'ids': batch},
+                       headers=_auth(self.token))
+
+
+class MixedScenario(Scenario):
+    """위 시나리오들을 가중치대로 섞어 동시에 실행합니다 (읽기 위주의 일반적인 부하)."""
+    name = 'mixed'
+    default_ops = 600
+    WEIGHTS = [(PublicDownloadScenario, 40), (ListScenario, 20), (RangeScenario, 15), (UploadScenario, 15),
+               (PasswordDownloadScenario, 5), (BulkDeleteScenario, 5)]
+
+    def setup(self, ops):
+        seed = self.rng.randrange(2 ** 32)
+        self.parts = [(cls(self.server, seed + i), weight) for i, (cls, weight) in enumerate(self.WEIGHTS)]
+        # 순서를 미리 정해 두면 일괄 삭제처럼 자원을 소비하는 시나리오의 준비량을 정확히 맞출 수 있습니다.
+        self.sequence = collections.deque(self.rng.choices([p for p, _ in self.parts],
+                                                           weights=[w for _, w in self.parts], k=ops))
+        for part, _ in self.parts:
+            if part.__class__ is ListScenario:
+                part.file_count = 2000
+            part.setup(sum(1 for s in self.sequence if s is part))
+
+    def run_once(self, client, rng):
+        self.sequence.popleft().run_once(client, rng)
+
+
+SCENARIOS = {cls.name: cls for cls in (UploadScenario, ListScenario, PublicDownloadScenario,
+                                       PasswordDownloadScenario, RangeScenario, BulkDeleteScenario, MixedScenario)}
+
+
+def run_scenario(scenario: Scenario, ops: int, concurrency: int, warmup: int, seed: int) -> dict:
+    """warmup + ops번의 run_once를 concurrency개 스레드로 나눠 실행하고 측정 요약을 반환합니다."""
+    scenario.setup(ops + warmup)
+    recorder = Recorder()
+    lock = threading.Lock()
+    warmup_done = threading.Barrier(concurrency, action=recorder.start)
+    errors = []
+    # 워밍업과 측정 구간의 번호표를 따로 둡니다 (워밍업을 끝낸 스레드가 꺼낸 번호가 측정 구간에서 빠지지 않도록).
+    warmup_tickets = itertools.count()
+    measured_tickets = itertools.count()
+
+    def take(tickets, limit):
+        with lock:
+            return next(tickets) < limit
+
+    def worker(index):
+        rng = random.Random(seed * 1000 + index)
+        warm_client = scenario.client()
+        client = scenario.client(recorder)
+        try:
+            # 워밍업은 측정하지 않습니다 (연결 수립, 캐시 적재, 첫 요청의 지연 초기화 등).
+            while take(warmup_tickets, warmup):
+                scenario.run_once(warm_client, rng)
+            warmup_done.wait()
+            while take(measured_tickets, ops):
+                scenario.run_once(client, rng)
+        except Exception as e:
+            errors.append(e)
+            warmup_done.abort()
+        finally:
+            warm_client.close()
+            client.close()
+
+    threads = [threading.Thread(target=worker, args=(i,), name=f"bench-{i}") for i in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    recorder.stop()
+    if errors:
+        raise errors[0]
+    return recorder.summary()
@@ -29,6 +29,35 @@ class Config:
     # 환경 변수 'UPLOAD_FOLDER'가 있으면 그 값을 사용하고, 없으면 BASE_DIR 아래 'uploads' 폴더를 기본값으로 사용합니다.
     UPLOAD_FOLDER = os.environ.get('UPLOAD_FOLDER', os.path.join(BASE_DIR, 'uploads'))
 
+    # UPLOAD_SHARD_DEPTH / UPLOAD_SHARD_WIDTH: UPLOAD_FOLDER 안의 디렉토리 분산(fan-out) 배치입니다.
+    # 기본값(2, 2)은 'ab/cd/<name>' 형태이며, 값을 바꾼 뒤에는 'flask migrate-layout'으로 기존 파일을 옮깁니다.
+    UPLOAD_SHARD_DEPTH = int(os.environ.get('UPLOAD_SHARD_DEPTH', 2))
+    UPLOAD_SHARD_WIDTH = int(os.environ.get('UPLOAD_SHARD_WIDTH', 2))
+
+    # STORAGE_BACKEND: 완성된 객체(blob)를 두는 저장소 드라이버입니다 (app/core/storage).
+    # 'local'(기본): UPLOAD_FOLDER
+    # 'tiered': UPLOAD_FOLDER(hot) + STORAGE_COLD_FOLDER(cold, 느리고 저렴한 볼륨).
+    #           STORAGE_TIER_AFTER_DAYS 동안 읽히지 않은 객체를 'flask tier-objects'가 cold로 옮깁니다.
+    #           접근 시각 기록은 객체당 STORAGE_TIER_TOUCH_SECONDS에 한 번만 씁니다.
+    # 's3': S3 호환 저장소 (boto3 필요). MinIO 등은 S3_ENDPOINT_URL로 지정합니다.
+    # 업로드 임시 파일과 멀티파트 파트는 드라이버와 관계없이 UPLOAD_FOLDER에 둡니다.
+    STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', 'local')
+    STORAGE_COLD_FOLDER = os.environ.get('STORAGE_COLD_FOLDER', os.path.join(BASE_DIR, 'uploads-cold'))
+    STORAGE_TIER_AFTER_DAYS = float(os.environ.get('STORAGE_TIER_AFTER_DAYS', 30))
+    STORAGE_TIER_TOUCH_SECONDS = int(os.environ.get('STORAGE_TIER_TOUCH_SECONDS', 3600))
+    S3_BUCKET = os.environ.get('S3_BUCKET', '')
+    S3_PREFIX = os.environ.get('S3_PREFIX', '')
+    S3_ENDPOINT_URL = os.environ.get('S3_ENDPOINT_URL', '')  # 예) http://127.0.0.1:9000 (MinIO)
+    S3_REGION = os.environ.get('S3_REGION', '')
+    S3_ACCESS_KEY_ID = os.environ.get('S3_ACCESS_KEY_ID', '')
+    S3_SECRET_ACCESS_KEY = os.environ.get('S3_SECRET_ACCESS_KEY', '')
+
+    # DEFAULT_USER_QUOTA_BYTES: users.quota_bytes가 설정되지 않은 사용자의 저장 용량 할당량입니다.
+    # 0 이하이면 무제한(기본값)이며, 사용자별 값은 'flask set-quota <username> <bytes>'로 바꿉니다.
+    # 기본값을 무제한으로 두어 할당량 도입 전부터 쓰던 사용자가 업그레이드만으로 제한받지 않게 합니다.
+    # 값을 정한다면 MULTIPART_MAX_OBJECT_SIZE보다 작을 때 그보다 큰 파일은 올릴 수 없다는 점에 유의하세요.
+    DEFAULT_USER_QUOTA_BYTES = int(os.environ.get('DEFAULT_USER_QUOTA_BYTES', 0))
+
     ALLOWED_EXTENSIONS = {
         'txt', 'log', 'md', 'json', 'xml', 'csv',
         'pdf', 'doc', 'docx', 'xls', 'xlsx', 'ppt', 'pptx', 'hwp',
@@ -39,6 +68,85 @@ class Config:
     }
     MAX_CONTENT_LENGTH = 256 * 1024 * 1024  # 256 MB
 
+    # 저장 시 압축입니다. COMPRESSION_EXTENSIONS의 확장자 -> codec('auto', 'gzip', 'zstd') 형식의 새 blob을 압축해 저장하고,
+    # 크기가 COMPRESSION_MIN_SAVING 비율 이상 줄지 않으면 원본을 저장합니다. 'auto'는 zstandard 패키지가 있으면 zstd, 없으면 gzip.
+    # svg는 브라우저가 바로 여는 경우가 많아 모든 클라이언트가 받는 gzip으로 둡니다.
+    # 다운로드는 Accept-Encoding이 맞으면 압축된 바이트를 그대로(Content-Encoding), 아니면 풀어서 보냅니다.
+    COMPRESSION_ENABLED = os.environ.get('COMPRESSION_ENABLED', 'true').lower() == 'true'
+    COMPRESSION_EXTENSIONS = {
+        'txt': 'auto', 'log': 'auto', 'md': 'auto', 'csv': 'auto', 'json': 'auto', 'xml': 'auto',
+        'svg': 'gzip',
+    }
+    COMPRESSION_MIN_SAVING = float(os.environ.get('COMPRESSION_MIN_SAVING', 0.1))
+    COMPRESSION_GZIP_LEVEL = int(os.environ.get('COMPRESSION_GZIP_LEVEL', 6))
+    COMPRESSION_ZSTD_LEVEL = int(os.environ.get('COMPRESSION_ZSTD_LEVEL', 3))
+
+    # 파일 목록 API(/api/files)의 기본/최대 페이지 크기입니다.
+    FILE_LIST_DEFAULT_LIMIT = int(os.environ.get('FILE_LIST_DEFAULT_LIMIT', 100))
+    FILE_LIST_MAX_LIMIT = int(os.environ.get('FILE_LIST_MAX_LIMIT', 1000))
+    # 일괄 작업 API(/api/files/batch/...)가 한 요청에서 처리하는 최대 파일 수입니다.
+    FILE_BATCH_MAX_ITEMS = int(os.environ.get('FILE_BATCH_MAX_ITEMS', 1000))
+
+    # 아카이브 다운로드(/api/files/archive)가 한 번에 묶는 최대 파일 수와, zip에 압축하지 않고(stored) 담을 이미 압축된 형식입니다.
+    ARCHIVE_MAX_FILES = int(os.environ.get('ARCHIVE_MAX_FILES', 10000))
+    ARCHIVE_STORED_EXTENSIONS = {
+        'png', 'jpg', 'jpeg', 'gif', 'docx', 'xlsx', 'pptx',
+        'mp4', 'mov', 'avi', 'wmv', 'mkv', 'webm', 'mp3', 'ogg', 'flac',
+        'zip', 'gz', '7z',
+    }
+
+    # 파일 검색(/api/files/search)입니다. SEARCH_TEXT_EXTENSIONS 형식은 파일 앞부분 SEARCH_TEXT_MAX_BYTES의 텍스트도 색인하고,
+    # 순위를 매길 때 이름 일치를 본문 일치보다 SEARCH_FILENAME_WEIGHT배 무겁게 봅니다.
+    SEARCH_TEXT_EXTENSIONS = {'txt', 'md', 'csv'}
+    SEARCH_TEXT_MAX_BYTES = int(os.environ.get('SEARCH_TEXT_MAX_BYTES', 64 * 1024))  # 64 KB
+    SEARCH_FILENAME_WEIGHT = float(os.environ.get('SEARCH_FILENAME_WEIGHT', 10.0))
+
+    # 이미지 썸네일(/api/files/<id>/thumbnail)입니다. Pillow가 설치되어 있어야 하며, 없으면 엔드포인트가 501을 돌려줍니다.
+    # 업로드 직후 THUMBNAIL_PREGENERATE_SIZES를 THUMBNAIL_WORKERS개 스레드로 미리 만들고, 나머지 크기는 처음 요청할 때 만듭니다.
+    # 요청 시 아직 없으면 THUMBNAIL_WAIT_SECONDS까지 기다린 뒤 202를 돌려줍니다.
+    # 내용이 바뀌지 않으므로 소유자 응답은 THUMBNAIL_CACHE_MAX_AGE초, 권한이 바뀔 수 있는 공개 링크 응답은
+    # THUMBNAIL_PUBLIC_MAX_AGE초 동안 캐시하게 합니다.
+    THUMBNAIL_ENABLED = os.environ.get('THUMBNAIL_ENABLED', 'true').lower() == 'true'
+    THUMBNAIL_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'bmp'}
+    THUMBNAIL_SIZES = (128, 256, 512)
+    THUMBNAIL_DEFAULT_SIZE = 256
+    THUMBNAIL_PREGENERATE_SIZES = (256,)
+    THUMBNAIL_QUALITY = int(os.environ.get('THUMBNAIL_QUALITY', 80))
+    THUMBNAIL_WORKERS = int(os.environ.get('THUMBNAIL_WORKERS', 2))
+    THUMBNAIL_WAIT_SECONDS = float(os.environ.get('THUMBNAIL_WAIT_SECONDS', 5))
+    THUMBNAIL_FAILURE_TTL = int(os.environ.get('THUMBNAIL_FAILURE_TTL', 600))
+    THUMBNAIL_CACHE_MAX_AGE = int(os.environ.get('THUMBNAIL_CACHE_MAX_AGE', 365 * 24 * 3600))
+    THUMBNAIL_PUBLIC_MAX_AGE = int(os.environ.get('THUMBNAIL_PUBLIC_MAX_AGE', 3600))
+
+    # UPLOAD_CHUNK_SIZE: 업로드 본문을 읽어 디스크에 쓸 때 사용하는 청크 크기(bytes)입니다.
+    # UPLOAD_FSYNC: True이면 rename 전에 fsync를 호출해 전원 장애에도 내용을 보장합니다.
+    UPLOAD_CHUNK_SIZE = int(os.environ.get('UPLOAD_CHUNK_SIZE', 1024 * 1024))  # 1 MB
+    UPLOAD_FSYNC = os.environ.get('UPLOAD_FSYNC', 'false').lower() == 'true'
+
+    # FILE_DELIVERY_MODE: 다운로드 본문을 보내는 방법입니다.
+    # 'sendfile'(기본): 워커가 직접 전송 (WSGI 서버의 file_wrapper로 zero-copy)
+    # 'x-accel': nginx에 X-Accel-Redirect 헤더로 위임. FILE_DELIVERY_ACCEL_PREFIX는 UPLOAD_FOLDER를
+    #            가리키는 internal location이어야 합니다. 예)
+    #                location /_protected/ { internal; alias /srv/object-storage/uploads/; }
+    # 'x-sendfile': Apache mod_xsendfile 등에 X-Sendfile 헤더(절대 경로)로 위임
+    FILE_DELIVERY_MODE = os.environ.get('FILE_DELIVERY_MODE', 'sendfile')
+    FILE_DELIVERY_ACCEL_PREFIX = os.environ.get('FILE_DELIVERY_ACCEL_PREFIX', '/_protected/')
+
+    # 멀티파트(재개 가능) 업로드 설정입니다.
+    # 각 파트 요청은 MAX_CONTENT_LENGTH 제한을 받지만, 합쳐진 객체는 MULTIPART_MAX_OBJECT_SIZE까지 허용합니다.
+    # MULTIPART_EXPIRY_HOURS 동안 갱신되지 않은 업로드는 'flask reap-multipart'가 정리합니다.
+    MULTIPART_MIN_PART_SIZE = int(os.environ.get('MULTIPART_MIN_PART_SIZE', 5 * 1024 * 1024))  # 5 MB (마지막 파트 제외)
+    MULTIPART_MAX_PARTS = int(os.environ.get('MULTIPART_MAX_PARTS', 10000))
+    MULTIPART_MAX_OBJECT_SIZE = int(os.environ.get('MULTIPART_MAX_OBJECT_SIZE', 50 * 1024 * 1024 * 1024))  # 50 GB
+    MULTIPART_EXPIRY_HOURS = int(os.environ.get('MULTIPART_EXPIRY_HOURS', 24))
+
+    # 지연 삭제 큐(deletion_queue) 처리 설정입니다.
+    # DELETION_REAPER_INTERVAL: 각 워커의 백그라운드 reaper 실행 간격(초). 0이면 끄고 'flask reap-deletions'를 cron으로 실행합니다.
+    # DELETION_REAPER_MAX_PER_SECOND: 초당 최대 삭제 수 (디스크 I/O 제한, 0이면 무제한)
+    DELETION_REAPER_INTERVAL = int(os.environ.get('DELETION_REAPER_INTERVAL', 60))
+    DELETION_REAPER_BATCH_SIZE = int(os.environ.get('DELETION_REAPER_BATCH_SIZE', 100))
+    DELETION_REAPER_MAX_PER_SECOND = float(os.environ.get('DELETION_REAPER_MAX_PER_SECOND', 200))
+
     # DATABASE: SQLite 데이터베이스 파일의 경로입니다.
     # 환경 변수 'DATABASE_PATH'가 있으면 그 값을 사용하고,
     # 없으면 BASE_DIR 아래 'instance' 폴더 내 'object_storage.db'를 기본값으로 사용합니다.
@@ -46,12 +154,90 @@ class Config:
     DATABASE_FILENAME = 'object_storage.db'
     DATABASE = os.environ.get('DATABASE_PATH', os.path.join(BASE_DIR, 'instance', DATABASE_FILENAME))
 
+    # SQLite 연결 풀 및 PRAGMA 설정입니다. 연결은 프로세스 안에서 요청 간에 재사용되며 WAL 모드로 열립니다.
+    # DB_POOL_SIZE: 프로세스당 최대 연결 수, DB_POOL_TIMEOUT: 연결을 기다리는 최대 시간(초)
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 16))
+    DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 10))
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL') # WAL에서는 NORMAL로도 손상되지 않습니다.
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    SQLITE_CACHE_SIZE_KB = int(os.environ.get('SQLITE_CACHE_SIZE_KB', 16 * 1024)) # 연결당 16 MB
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)) # 256 MB
+
+
+    # METRICS_ENABLED: Prometheus 형식의 /metrics 엔드포인트와 요청/쿼리 시간 측정을 켭니다 (기본 꺼짐).
+    # METRICS_AUTH_TOKEN: 'Authorization: Bearer <토큰>' 헤더가 있어야 /metrics를 읽을 수 있습니다.
+    # 개발(DEBUG) / 테스트가 아닌데 토큰 없이 켜면 엔드포인트 경로와 사용자 수 등이 노출되지 않도록 측정을 켜지 않습니다.
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'false').lower() == 'true'
+    METRICS_AUTH_TOKEN = os.environ.get('METRICS_AUTH_TOKEN', '')
+
+    # SLOW_QUERY_THRESHOLD_MS: 이보다 오래 걸린 SQL 문장을 로그에 남깁니다 (0이면 끔).
+    SLOW_QUERY_THRESHOLD_MS = int(os.environ.get('SLOW_QUERY_THRESHOLD_MS', 200))
+
+    # 요청 프로파일링 (기본 꺼짐). 켜면 요청 중 PROFILING_SAMPLE_RATE 비율, 또는
+    # PROFILING_HEADER 헤더 값이 PROFILING_TOKEN과 같은 요청을 프로파일링하여
+    # instance/profiles/<엔드포인트>/ 아래에 파일로 남깁니다.
+    # PROFILING_MODE: 'sampling'(스택 샘플링, flamegraph용 collapsed 형식) 또는 'cprofile'(pstats)
+    PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', 'false').lower() == 'true'
+    PROFILING_SAMPLE_RATE = float(os.environ.get('PROFILING_SAMPLE_RATE', 0.0))
+    PROFILING_HEADER = os.environ.get('PROFILING_HEADER', 'X-Profile-Request')
+    PROFILING_TOKEN = os.environ.get('PROFILING_TOKEN', '')
+    PROFILING_MODE = os.environ.get('PROFILING_MODE', 'sampling')
+    PROFILING_INTERVAL_MS = float(os.environ.get('PROFILING_INTERVAL_MS', 5))
 
     # JWT_EXPIRATION_DELTA: JWT 토큰의 만료 시간을 설정합니다.
     # 환경 변수 'JWT_EXPIRATION_HOURS' (시간 단위)가 있으면 그 값을 사용하고, 없으면 24시간을 기본값으로 합니다.
     JWT_EXPIRATION_HOURS = int(os.environ.get('JWT_EXPIRATION_HOURS', 24))
     JWT_EXPIRATION_DELTA = datetime.timedelta(hours=JWT_EXPIRATION_HOURS)
 
+    # TOKEN_CACHE_ENABLED / TOKEN_CACHE_SIZE: 검증된 JWT 클레임 캐시(프로세스 단위)입니다.
+    # 같은 토큰으로 반복되는 요청에서 서명 검증을 건너뛰며, 항목은 토큰의 exp까지만 유지됩니다.
+    TOKEN_CACHE_ENABLED = os.environ.get('TOKEN_CACHE_ENABLED', 'true').lower() == 'true'
+    TOKEN_CACHE_SIZE = int(os.environ.get('TOKEN_CACHE_SIZE', 10000))
+    # TOKEN_REVOCATION_SYNC_INTERVAL_MS: 폐기된 토큰 목록(revoked_tokens)을 워커마다 메모리에 두고 이 간격마다 새 기록만 읽습니다.
+    # 같은 워커의 로그아웃은 바로, 다른 워커의 로그아웃 / 계정 삭제는 이 간격 안에 반영됩니다. 0이면 매 요청마다 읽습니다.
+    TOKEN_REVOCATION_SYNC_INTERVAL_MS = int(os.environ.get('TOKEN_REVOCATION_SYNC_INTERVAL_MS', 500))
+
+    # METADATA_CACHE_*: 다운로드 링크 / 파일 ID로 찾는 파일 메타데이터의 read-through 캐시입니다.
+    # 항목은 METADATA_CACHE_TTL초, 없는 링크는 METADATA_CACHE_NEGATIVE_TTL초 동안 기억하며 권한 변경과 삭제 시 바로 지웁니다.
+    # METADATA_CACHE_BACKEND가 'local'이면 다른 워커 프로세스의 변경(권한, 링크 비밀번호, 삭제)은 TTL이 지나야 반영되고,
+    # 'sqlite'이면 무효화를 METADATA_CACHE_PATH(기본 instance/metadata_cache.sqlite)로 공유해
+    # METADATA_CACHE_SYNC_INTERVAL_MS 안에 모든 워커에 반영됩니다.
+    METADATA_CACHE_ENABLED = os.environ.get('METADATA_CACHE_ENABLED', 'true').lower() == 'true'
+    METADATA_CACHE_SIZE = int(os.environ.get('METADATA_CACHE_SIZE', 10000))
+    METADATA_CACHE_TTL = float(os.environ.get('METADATA_CACHE_TTL', 30))
+    METADATA_CACHE_NEGATIVE_TTL = float(os.environ.get('METADATA_CACHE_NEGATIVE_TTL', 5))
+    # 기본값 'auto'는 ASGI_WORKERS가 1이면 'local', 그보다 많으면 'sqlite'를 씁니다
+    # (다른 WSGI 서버로 여러 프로세스를 띄운다면 'sqlite'로 지정하세요).
+    METADATA_CACHE_BACKEND = os.environ.get('METADATA_CACHE_BACKEND', 'auto')
+    METADATA_CACHE_PATH = os.environ.get('METADATA_CACHE_PATH', '')
+    METADATA_CACHE_SYNC_INTERVAL_MS = int(os.environ.get('METADATA_CACHE_SYNC_INTERVAL_MS', 500))
+
+    # 비밀번호 해시(bcrypt) 설정입니다. BCRYPT_ROUNDS는 새로 만드는 해시의 비용이며
+    # (기존 해시는 저장된 비용으로 검증), 해시는 BCRYPT_POOL_SIZE개의 전용 작업자에서 실행됩니다.
+    # 실행 중 + 대기 중인 작업이 BCRYPT_POOL_SIZE + BCRYPT_QUEUE_LIMIT를 넘으면 503을 반환합니다.
+    BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', 12))
+    BCRYPT_POOL_SIZE = int(os.environ.get('BCRYPT_POOL_SIZE', max(1, (os.cpu_count() or 2) // 2)))
+    BCRYPT_QUEUE_LIMIT = int(os.environ.get('BCRYPT_QUEUE_LIMIT', 32))
+
+    # 서명된 다운로드 URL(/api/signed/<token>)의 기본/최대 유효 기간(초)입니다.
+    # URL은 만료 전까지 권한 변경이나 삭제와 관계없이 유효하므로 짧게 유지합니다.
+    SIGNED_URL_TTL_SECONDS = int(os.environ.get('SIGNED_URL_TTL_SECONDS', 15 * 60))
+    SIGNED_URL_MAX_TTL_SECONDS = int(os.environ.get('SIGNED_URL_MAX_TTL_SECONDS', 24 * 60 * 60))
+
+    # ASGI 모드(asgi.py, uvicorn) 설정
+    # ASGI_WORKERS: 프로세스 수, ASGI_WORKER_THREADS: 프로세스당 라우트/DB 작업 스레드 수
+    # ASGI_IO_THREADS: 다운로드 파일 읽기 스레드 수 (전송 중인 연결 수와 무관하게 고정)
+    # ASGI_BUFFER_UPLOADS: 요청 본문을 다 받은 뒤 라우트를 실행 (느린 업로드가 작업 스레드를 붙잡지 않음)
+    #   ASGI_UPLOAD_SPOOL_BYTES보다 큰 본문은 UPLOAD_FOLDER에 받아 두고 업로드 라우트가 rename으로 넘겨받습니다.
+    ASGI_HOST = os.environ.get('ASGI_HOST', '0.0.0.0')
+    ASGI_PORT = int(os.environ.get('ASGI_PORT', 5050))
+    ASGI_WORKERS = int(os.environ.get('ASGI_WORKERS', os.cpu_count() or 1))
+    ASGI_WORKER_THREADS = int(os.environ.get('ASGI_WORKER_THREADS', 32))
+    ASGI_IO_THREADS = int(os.environ.get('ASGI_IO_THREADS', 16))
+    ASGI_BUFFER_UPLOADS = os.environ.get('ASGI_BUFFER_UPLOADS', 'true').lower() == 'true'
+    ASGI_UPLOAD_SPOOL_BYTES = int(os.environ.get('ASGI_UPLOAD_SPOOL_BYTES', 1024 * 1024)) # 이보다 크면 임시 파일로
+    ASGI_READ_CHUNK_SIZE = int(os.environ.get('ASGI_READ_CHUNK_SIZE', 256 * 1024))
+
 class DevelopmentConfig(Config):
     """개발 환경 설정"""
     DEBUG = True
@@ -1,11 +1,37 @@
-DROP TABLE IF EXISTS users;
+-- 외래 키가 켜져 있으므로 참조하는 쪽(자식) 테이블부터 지웁니다.
+DROP TABLE IF EXISTS files_fts;
+DROP TABLE IF EXISTS revoked_tokens;
+DROP TABLE IF EXISTS deletion_queue;
+DROP TABLE IF EXISTS user_usage;
+DROP TABLE IF EXISTS upload_parts;
+DROP TABLE IF EXISTS multipart_uploads;
 DROP TABLE IF EXISTS files; -- 나중에 파일 정보를 저장할 테이블 (미리 추가)
+DROP TABLE IF EXISTS blobs;
+DROP TABLE IF EXISTS users;
+DROP TABLE IF EXISTS schema_migrations;
+
+-- 적용된 스키마 마이그레이션 기록 ('flask migrate-db'). init-db는 모든 버전을 적용된 것으로 기록합니다.
+CREATE TABLE schema_migrations (
+    version INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
 
 CREATE TABLE users (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     username TEXT UNIQUE NOT NULL,
     password_hash TEXT NOT NULL,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    quota_bytes INTEGER -- 저장 용량 할당량 (NULL이면 DEFAULT_USER_QUOTA_BYTES, 0 이하는 무제한)
+);
+
+-- 사용자별 사용량. files INSERT/DELETE와 같은 트랜잭션에서 증감합니다 ('flask reconcile-usage'로 재계산).
+CREATE TABLE user_usage (
+    user_id INTEGER PRIMARY KEY,
+    bytes_used INTEGER NOT NULL DEFAULT 0, -- 파일 크기 합계 (bytes)
+    file_count INTEGER NOT NULL DEFAULT 0, -- 파일 수
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
 );
 
 -- 파일 메타데이터를 저장할 테이블 (과제 요구사항 기반)
@@ -13,11 +39,110 @@ CREATE TABLE files (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     user_id INTEGER NOT NULL, -- 파일 소유자 ID
     filename TEXT NOT NULL, -- 원본 파일 이름
+    extension TEXT, -- 소문자 확장자 (목록 필터용)
     filepath TEXT NOT NULL, -- 실제 파일 저장 경로
     filesize INTEGER NOT NULL, -- 파일 크기 (bytes)
     upload_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP, -- 업로드 시간
     permission TEXT DEFAULT 'private', -- 파일 접근 권한 ('public', 'private', 'password')
     access_password_hash TEXT, -- 'password' 접근 권한 시 사용될 비밀번호 해시
     download_link_id TEXT UNIQUE NOT NULL, -- 파일 다운로드 고유 링크 ID
-    FOREIGN KEY (user_id) REFERENCES users (id) -- users 테이블의 id 참조
-);
\ No newline at end of file
+    content_hash TEXT, -- 파일 내용의 SHA-256 (hex), 업로드 중 스트리밍으로 계산
+    codec TEXT, -- 저장 시 압축 codec ('gzip', 'zstd'). NULL이면 원본 그대로 저장
+    stored_size INTEGER, -- 저장소에 놓인 객체 크기 (압축 후 bytes). filesize는 원본 크기
+    FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE -- users 테이블의 id 참조, 사용자 삭제 시 함께 삭제
+);
+
+CREATE INDEX idx_files_content_hash ON files (content_hash);
+
+-- 파일 목록 키셋 페이지네이션용 복합 인덱스 (정렬 기준별 (user_id, 정렬 컬럼, id))
+CREATE INDEX idx_files_user_time ON files (user_id, upload_time, id);
+CREATE INDEX idx_files_user_name ON files (user_id, filename, id);
+CREATE INDEX idx_files_user_size ON files (user_id, filesize, id);
+CREATE INDEX idx_files_user_ext_time ON files (user_id, extension, upload_time, id);
+CREATE INDEX idx_files_user_perm_time ON files (user_id, permission, upload_time, id);
+
+-- 파일 이름 / 본문 전문 검색 색인 (GET /api/files/search). rowid = files.id.
+-- filename은 아래 트리거가 files와 맞추고, body(txt/md/csv 등의 앞부분 텍스트)는 업로드할 때 채웁니다.
+-- prefix 색인으로 2~3글자 접두사 검색도 색인을 탑니다.
+CREATE VIRTUAL TABLE files_fts USING fts5(
+    filename,
+    body,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+);
+
+CREATE TRIGGER files_fts_after_insert AFTER INSERT ON files BEGIN
+    INSERT INTO files_fts (rowid, filename, body) VALUES (new.id, new.filename, '');
+END;
+
+CREATE TRIGGER files_fts_after_delete AFTER DELETE ON files BEGIN
+    DELETE FROM files_fts WHERE rowid = old.id;
+END;
+
+CREATE TRIGGER files_fts_after_rename AFTER UPDATE OF filename ON files BEGIN
+    UPDATE files_fts SET filename = new.filename WHERE rowid = new.id;
+END;
+
+-- 내용 주소 기반 저장소: 같은 내용의 파일은 blob 하나를 공유합니다.
+-- files.filepath는 blobs.path를 가리키고, refcount가 0이 된 blob은 'flask gc-blobs'가 지웁니다.
+CREATE TABLE blobs (
+    hash TEXT PRIMARY KEY, -- 내용의 SHA-256 (hex)
+    path TEXT NOT NULL, -- UPLOAD_FOLDER 기준 blob 경로
+    size INTEGER NOT NULL, -- 원본 크기 (bytes)
+    refcount INTEGER NOT NULL DEFAULT 0, -- 이 blob을 가리키는 files 레코드 수
+    codec TEXT, -- 저장 시 압축 codec (NULL이면 원본)
+    stored_size INTEGER, -- 저장된 객체 크기 (압축 후 bytes)
+    gc_claimed_at REAL, -- gc_blobs()가 객체를 지우는 중이면 그 시작 시각 (unix time)
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX idx_blobs_unreferenced ON blobs (refcount) WHERE refcount <= 0;
+
+-- 진행 중인 멀티파트(재개 가능) 업로드
+CREATE TABLE multipart_uploads (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    upload_id TEXT UNIQUE NOT NULL, -- 클라이언트에 전달되는 업로드 ID
+    user_id INTEGER NOT NULL, -- 업로드 소유자 ID
+    filename TEXT NOT NULL, -- 완료 후 사용할 원본 파일 이름
+    status TEXT DEFAULT 'pending', -- 'pending', 'completing', 'aborted'
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, -- 마지막 파트 수신 시간 (만료 판단 기준)
+    FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
+);
+
+CREATE INDEX idx_multipart_uploads_user ON multipart_uploads (user_id);
+
+-- 멀티파트 업로드의 개별 파트 (파트마다 별도 파일로 저장)
+CREATE TABLE upload_parts (
+    upload_id TEXT NOT NULL,
+    part_number INTEGER NOT NULL, -- 1부터 시작하는 파트 번호
+    size INTEGER NOT NULL, -- 파트 크기 (bytes)
+    sha256 TEXT NOT NULL, -- 파트 내용의 SHA-256
+    partpath TEXT NOT NULL, -- UPLOAD_FOLDER 기준 파트 파일 경로
+    uploaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (upload_id, part_number),
+    FOREIGN KEY (upload_id) REFERENCES multipart_uploads (upload_id) ON DELETE CASCADE
+);
+
+-- 지연 삭제 큐. 요청 안에서 지우지 않은 파일/디렉토리 경로를 DB 변경과 같은 트랜잭션으로 기록하고
+-- 'flask reap-deletions'(또는 백그라운드 reaper)가 배치 단위로 지웁니다.
+CREATE TABLE deletion_queue (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    path TEXT NOT NULL, -- UPLOAD_FOLDER 기준 경로
+    reason TEXT, -- 'account', 'orphan', 'batch-delete' 등
+    enqueued_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    attempts INTEGER NOT NULL DEFAULT 0, -- 실패한 삭제 시도 수
+    last_error TEXT,
+    claimed_at REAL -- reaper가 지우는 중이면 그 시작 시각 (unix time)
+);
+
+-- 폐기된 JWT. key는 토큰의 SHA-256 다이제스트(로그아웃) 또는 'user:<id>'(계정 삭제의 모든 토큰)이며
+-- expires_at(epoch 초)이 지나면 토큰 자체가 만료되므로 기록을 지웁니다. 모든 요청이 확인합니다.
+-- 워커는 목록을 메모리에 두고 seq가 마지막으로 본 값보다 큰 행만 다시 읽습니다 (AUTOINCREMENT라 다시 쓰이지 않음).
+CREATE TABLE revoked_tokens (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    key TEXT NOT NULL UNIQUE,
+    expires_at REAL NOT NULL
+);
+
+CREATE INDEX idx_revoked_tokens_expires ON revoked_tokens (expires_at);
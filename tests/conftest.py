@@ -0,0 +1,59 @@
+# tests/conftest.py
+import os
+import pytest
+from config import DevelopmentConfig
+from app import create_app
+from app.core.database import init_db
+
+
+@pytest.fixture
+def make_app(tmp_path):
+    """임시 UPLOAD_FOLDER / DB를 쓰는 앱을 만듭니다. 키워드 인자로 설정 값을 덮어씁니다."""
+    def _make(**overrides):
+        class TestConfig(DevelopmentConfig):
+            TESTING = True
+            SECRET_KEY = 'test-secret-key-' + 'x' * 32
+            UPLOAD_FOLDER = str(tmp_path / 'uploads')
+            DATABASE = str(tmp_path / 'instance' / 'test.sqlite')
+            METADATA_CACHE_PATH = str(tmp_path / 'instance' / 'metadata_cache.sqlite')
+            BCRYPT_ROUNDS = 4
+            DELETION_REAPER_INTERVAL = 0
+            THUMBNAIL_PREGENERATE_SIZES = ()
+        for key, value in overrides.items():
+            setattr(TestConfig, key, value)
+        os.makedirs(os.path.dirname(TestConfig.DATABASE), exist_ok=True)
+        app = create_app(TestConfig)
+        with app.app_context():
+            init_db()
+        return app
+    return _make
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def login(client):
+    """사용자를 등록하고 로그인해 Authorization 헤더를 돌려줍니다."""
+    def _login(username='alice', password='pass1234'):
+        client.post('/api/auth/register', json={'username': username, 'password': password})
+        response = client.post('/api/auth/login', json={'username': username, 'password': password})
+        assert response.status_code == 200, response.get_json()
+        return {'Authorization': f"Bearer {response.get_json()['token']}"}
+    return _login
+
+
+@pytest.fixture
+def upload(client):
+    """본문을 /api/upload/stream으로 올리고 (상태 코드, JSON)을 돌려줍니다."""
+    def _upload(headers, filename, data):
+        response = client.post(f'/api/upload/stream?filename={filename}', data=data, headers=headers)
+        return response.status_code, response.get_json()
+    return _upload
@@ -0,0 +1,164 @@
+# tests/test_blobstore.py
+import io
+import os
+from app.core import blobstore
+from app.core.blobstore import StagedBlob, finish_blob, gc_blobs, register_blob
+from app.core.database import get_db
+from app.core.storage import get_storage
+from app.core.streaming import stream_to_temp
+from app.files import ingest
+
+
+def _blob_rows(app):
+    with app.app_context():
+        return [dict(row) for row in get_db().execute("SELECT hash, path, refcount FROM blobs")]
+
+
+def _filepath(app, file_id):
+    with app.app_context():
+        return get_db().execute("SELECT filepath FROM files WHERE id = ?", (file_id,)).fetchone()[0]
+
+
+def test_same_content_shares_one_blob(app, client, login, upload):
+    headers = login()
+    data = os.urandom(50_000)
+    _, first = upload(headers, 'a.zip', data)
+    _, second = upload(login('bob'), 'b.zip', data)
+    assert not first['deduplicated'] and second['deduplicated']
+    assert _filepath(app, first['file_id']) == _filepath(app, second['file_id'])
+    assert [row['refcount'] for row in _blob_rows(app)] == [2]
+
+    assert client.delete(f"/api/files/{first['file_id']}", headers=headers).status_code == 200
+    assert [row['refcount'] for row in _blob_rows(app)] == [1]
+
+
+def test_gc_removes_unreferenced_blob_and_object(app, client, login, upload):
+    headers = login()
+    _, body = upload(headers, 'a.zip', os.urandom(10_000))
+    path = _filepath(app, body['file_id'])
+    client.delete(f"/api/files/{body['file_id']}", headers=headers)
+    with app.app_context():
+        assert gc_blobs() == 1
+        assert not get_storage().exists(path)
+    assert _blob_rows(app) == []
+
+
+def test_new_objects_get_unique_keys(app, client, login, upload):
+    headers = login()
+    data = os.urandom(10_000)
+    _, first = upload(headers, 'a.zip', data)
+    old_path = _filepath(app, first['file_id'])
+    client.delete(f"/api/files/{first['file_id']}", headers=headers)
+    with app.app_context():
+        gc_blobs()
+    _, second = upload(headers, 'b.zip', data)
+    new_path = _filepath(app, second['file_id'])
+    assert new_path != old_path
+    assert os.path.basename(new_path).startswith(second['sha256'] + '.')
+
+
+def test_missing_object_is_replaced_on_next_upload(app, client, login, upload):
+    headers = login()
+    data = os.urandom(10_000)
+    _, first = upload(headers, 'a.zip', data)
+    with app.app_context():
+        get_storage().delete(_filepath(app, first['file_id']))
+    _, second = upload(headers, 'b.zip', data)
+    assert not second['deduplicated']
+    # 기존 레코드도 새 객체를 가리키므로 다시 받을 수 있습니다.
+    response = client.get(f"/api/files/{first['file_id']}/download", headers=headers)
+    assert response.status_code == 200 and response.data == data
+    assert [row['refcount'] for row in _blob_rows(app)] == [2]
+
+
+def test_register_retries_when_reused_blob_is_collected(app, client, login, upload, monkeypatch):
+    """stage_blob()이 재사용하기로 한 blob이 등록 전에 GC되면 새 객체를 놓고 다시 등록합니다."""
+    headers = login()
+    data = os.urandom(10_000)
+    _, first = upload(headers, 'a.zip', data)
+    client.delete(f"/api/files/{first['file_id']}", headers=headers)
+
+    real_stage = blobstore.stage_blob
+    def stage_then_collect(db, streamed, codec=None):
+        staged = real_stage(db, streamed, codec)
+        if staged.reuse_path:
+            assert gc_blobs() == 1
+        return staged
+    monkeypatch.setattr(ingest, 'stage_blob', stage_then_collect)
+
+    status, second = upload(headers, 'b.zip', data)
+    assert status == 201 and not second['deduplicated']
+    response = client.get(f"/api/files/{second['file_id']}/download", headers=headers)
+    assert response.data == data
+    rows = _blob_rows(app)
+    assert len(rows) == 1 and rows[0]['refcount'] == 1
+    with app.app_context():
+        assert get_storage().exists(rows[0]['path'])
+
+
+def test_losing_registration_deletes_its_object(app, login, upload):
+    """같은 내용을 다른 요청이 먼저 등록했으면 그 blob을 쓰고, 새로 놓은 객체는 지웁니다."""
+    data = os.urandom(10_000)
+    _, first = upload(login(), 'a.zip', data)
+    with app.app_context():
+        db = get_db()
+        storage = get_storage()
+        streamed = stream_to_temp(io.BytesIO(data), app.config['UPLOAD_FOLDER'])
+        relpath = blobstore.blob_relpath(streamed.sha256)
+        storage.put_file(relpath, streamed.temp_path)
+        staged = StagedBlob(streamed.sha256, streamed.size, None, relpath, None, streamed.size)
+        db.execute("BEGIN IMMEDIATE")
+        blob = register_blob(db, staged)
+        db.commit()
+        finish_blob(streamed, blob)
+        assert blob.deduplicated and blob.path == _filepath(app, first['file_id'])
+        assert not storage.exists(relpath)
+    assert [row['refcount'] for row in _blob_rows(app)] == [2]
+
+
+def test_gc_deletes_objects_outside_the_write_lock(app, client, login, upload, monkeypatch):
+    """GC가 객체를 지우는 동안 같은 내용이 다시 올라오면, 새 객체를 놓고 행을 넘겨받아 GC가 지우지 않습니다."""
+    headers = login()
+    data = os.urandom(10_000)
+    _, first = upload(headers, 'a.zip', data)
+    old_path = _filepath(app, first['file_id'])
+    client.delete(f"/api/files/{first['file_id']}", headers=headers)
+
+    reuploaded = {}
+    with app.app_context():
+        db = get_db()
+        storage = get_storage()
+        real_delete = storage.delete
+        def delete_during_reupload(key):
+            assert not db.in_transaction # 저장소 I/O 중에는 쓰기 잠금을 쥐지 않습니다.
+            if key == old_path and not reuploaded:
+                reuploaded.update(upload(headers, 'b.zip', data)[1])
+            return real_delete(key)
+        monkeypatch.setattr(storage, 'delete', delete_during_reupload)
+        assert gc_blobs() == 0
+
+    assert not reuploaded['deduplicated']
+    rows = _blob_rows(app)
+    assert len(rows) == 1 and rows[0]['refcount'] == 1 and rows[0]['path'] != old_path
+    response = client.get(f"/api/files/{reuploaded['file_id']}/download", headers=headers)
+    assert response.status_code == 200 and response.data == data
+
+
+def test_gc_keeps_claim_when_delete_fails(app, client, login, upload, monkeypatch):
+    headers = login()
+    _, body = upload(headers, 'a.zip', os.urandom(10_000))
+    client.delete(f"/api/files/{body['file_id']}", headers=headers)
+    with app.app_context():
+        storage = get_storage()
+        def failing_delete(key):
+            raise OSError('storage unavailable')
+        monkeypatch.setattr(storage, 'delete', failing_delete)
+        assert gc_blobs() == 0
+        claimed = get_db().execute("SELECT gc_claimed_at FROM blobs").fetchone()[0]
+        assert claimed is not None
+        monkeypatch.undo()
+        assert gc_blobs() == 0 # 표시가 만료되기 전에는 다시 가져가지 않습니다.
+        get_db().execute("UPDATE blobs SET gc_claimed_at = ?", (claimed - blobstore.GC_CLAIM_TIMEOUT - 1,))
+        get_db().commit()
+        assert gc_blobs() == 1
+    assert _blob_rows(app) == []
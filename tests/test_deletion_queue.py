@@ -0,0 +1,74 @@
+# tests/test_deletion_queue.py
+import os
+from app.core import reaper
+from app.core.database import get_db
+from app.core.reaper import enqueue_deletions, process_deletion_queue
+
+
+def _queue(app):
+    with app.app_context():
+        return [dict(row) for row in get_db().execute(
+            "SELECT path, attempts, last_error, claimed_at FROM deletion_queue ORDER BY id")]
+
+
+def _write(app, relpath, data=b'x'):
+    path = os.path.join(app.config['UPLOAD_FOLDER'], relpath)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+    return path
+
+
+def test_queue_removes_files_and_directories(app):
+    file_path = _write(app, 'legacy/old.bin')
+    part_path = _write(app, 'multipart/abc/00001.part')
+    with app.app_context():
+        db = get_db()
+        enqueue_deletions(db, ['legacy/old.bin', 'multipart/abc'], 'test')
+        db.commit()
+        stats = process_deletion_queue(batch_size=1)
+    assert stats == {"deleted": 2, "skipped": 0, "failed": 0}
+    assert not os.path.exists(file_path) and not os.path.exists(os.path.dirname(part_path))
+    assert _queue(app) == []
+
+
+def test_queue_skips_blobs_in_use(app, login, upload):
+    _, body = upload(login(), 'a.zip', os.urandom(1000))
+    with app.app_context():
+        db = get_db()
+        blob_path = db.execute("SELECT filepath FROM files WHERE id = ?", (body['file_id'],)).fetchone()[0]
+        enqueue_deletions(db, [blob_path], 'orphan')
+        db.commit()
+        assert process_deletion_queue()["skipped"] == 1
+    assert _queue(app) == []
+
+
+def test_removal_runs_outside_the_write_lock_and_failures_are_requeued(app, monkeypatch):
+    _write(app, 'legacy/ok.bin')
+    with app.app_context():
+        db = get_db()
+        enqueue_deletions(db, ['legacy/ok.bin', 'legacy/broken.bin'], 'test')
+        db.commit()
+        real_remove = reaper._remove_path
+        def remove(relpath):
+            assert not db.in_transaction
+            if relpath == 'legacy/broken.bin':
+                raise OSError('device busy')
+            real_remove(relpath)
+        monkeypatch.setattr(reaper, '_remove_path', remove)
+        assert process_deletion_queue() == {"deleted": 1, "skipped": 0, "failed": 1}
+    assert _queue(app) == [{"path": 'legacy/broken.bin', "attempts": 1, "last_error": 'device busy', "claimed_at": None}]
+
+
+def test_stale_claims_are_taken_again(app):
+    _write(app, 'legacy/stuck.bin')
+    with app.app_context():
+        db = get_db()
+        enqueue_deletions(db, ['legacy/stuck.bin'], 'test')
+        db.execute("UPDATE deletion_queue SET claimed_at = strftime('%s', 'now')") # 다른 실행이 지우는 중
+        db.commit()
+        assert process_deletion_queue()["deleted"] == 0
+        db.execute("UPDATE deletion_queue SET claimed_at = claimed_at - ?", (reaper.DELETION_CLAIM_TIMEOUT + 1,))
+        db.commit()
+        assert process_deletion_queue()["deleted"] == 1
+    assert _queue(app) == []
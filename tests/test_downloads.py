@@ -0,0 +1,109 @@
+# tests/test_downloads.py
+import os
+import pytest
+from app.core.delivery import _normalize_ranges, _parse_byte_ranges
+
+
+@pytest.fixture
+def stored(client, login, upload):
+    """(헤더, 다운로드 URL, 내용)을 돌려줍니다."""
+    headers = login()
+    data = os.urandom(10_000)
+    status, body = upload(headers, 'data.zip', data)
+    assert status == 201
+    return headers, f"/api/files/{body['file_id']}/download", data
+
+
+def test_single_range(client, stored):
+    headers, url, data = stored
+    response = client.get(url, headers={**headers, 'Range': 'bytes=100-199'})
+    assert response.status_code == 206
+    assert response.headers['Content-Range'] == f'bytes 100-199/{len(data)}'
+    assert response.data == data[100:200]
+
+    response = client.get(url, headers={**headers, 'Range': 'bytes=-50'}) # 끝에서 50바이트
+    assert response.status_code == 206 and response.data == data[-50:]
+
+    response = client.get(url, headers={**headers, 'Range': 'bytes=9990-'})
+    assert response.status_code == 206 and response.data == data[9990:]
+
+
+def test_multiple_ranges_are_sent_as_byteranges(client, stored):
+    headers, url, data = stored
+    response = client.get(url, headers={**headers, 'Range': 'bytes=0-9,500-509'})
+    assert response.status_code == 206
+    assert response.mimetype == 'multipart/byteranges'
+    body = response.data
+    assert f'Content-Range: bytes 0-9/{len(data)}'.encode() in body and data[:10] in body
+    assert f'Content-Range: bytes 500-509/{len(data)}'.encode() in body and data[500:510] in body
+
+
+def test_overlapping_ranges_are_merged(client, stored):
+    headers, url, data = stored
+    response = client.get(url, headers={**headers, 'Range': 'bytes=0-99,50-149'})
+    assert response.status_code == 206
+    assert response.headers['Content-Range'] == f'bytes 0-149/{len(data)}'
+    assert response.data == data[:150]
+
+
+def test_out_of_order_ranges_are_sorted(client, stored):
+    headers, url, data = stored
+    response = client.get(url, headers={**headers, 'Range': 'bytes=500-509, 0-9'})
+    assert response.status_code == 206 and response.mimetype == 'multipart/byteranges'
+    assert response.data.index(data[:10]) < response.data.index(data[500:510])
+
+
+@pytest.mark.parametrize('header, expected', [
+    ('bytes=0-9', [(0, 10)]),
+    ('bytes=0-9,-5, 20-', [(0, 10), (-5, None), (20, None)]),
+    ('bytes=50-149,0-99', [(50, 150), (0, 100)]),
+    ('Bytes = 1-1', [(1, 2)]),
+    ('bytes=9-0', None),
+    ('bytes=a-1', None),
+    ('bytes=-', None),
+    ('bytes=', None),
+    ('items=0-1', None),
+    ('bytes=１-2', None), # ASCII가 아닌 숫자
+])
+def test_parse_byte_ranges(header, expected):
+    assert _parse_byte_ranges(header) == expected
+
+
+def test_normalize_ranges_merges_and_clamps():
+    assert _normalize_ranges([(50, 150), (0, 100), (-10, None), (990, None)], 1000) == [(0, 150), (990, 1000)]
+    assert _normalize_ranges([(1000, None)], 1000) == []
+
+
+def test_unsatisfiable_range(client, stored):
+    headers, url, data = stored
+    response = client.get(url, headers={**headers, 'Range': f'bytes={len(data)}-'})
+    assert response.status_code == 416
+    assert response.headers['Content-Range'] == f'bytes */{len(data)}'
+
+
+def test_conditional_get_and_if_range(client, stored):
+    headers, url, data = stored
+    first = client.get(url, headers=headers)
+    etag = first.headers['ETag']
+    assert first.status_code == 200 and first.headers['Accept-Ranges'] == 'bytes'
+
+    assert client.get(url, headers={**headers, 'If-None-Match': etag}).status_code == 304
+    assert client.get(url, headers={**headers, 'If-None-Match': '"other"'}).status_code == 200
+
+    # If-Range가 현재 표현과 같으면 구간만, 다르면 전체를 보냅니다.
+    matching = client.get(url, headers={**headers, 'Range': 'bytes=0-9', 'If-Range': etag})
+    assert matching.status_code == 206 and matching.data == data[:10]
+    stale = client.get(url, headers={**headers, 'Range': 'bytes=0-9', 'If-Range': '"stale"'})
+    assert stale.status_code == 200 and stale.data == data
+
+
+def test_range_on_compressed_file_uses_original_bytes(client, login, upload):
+    headers = login()
+    data = b'hello range ' * 2000
+    status, body = upload(headers, 'notes.txt', data)
+    assert status == 201
+    response = client.get(f"/api/files/{body['file_id']}/download",
+                          headers={**headers, 'Range': 'bytes=6-16', 'Accept-Encoding': 'gzip, zstd'})
+    assert response.status_code == 206
+    assert 'Content-Encoding' not in response.headers
+    assert response.data == data[6:17]
@@ -0,0 +1,25 @@
+# tests/test_metadata_cache.py
+import time
+from app.core.cache import MISSING
+from app.core.metadata_cache import InvalidationJournal, MetadataCache, get_metadata_cache
+
+
+def test_auto_backend_shares_invalidations_between_workers(make_app):
+    assert get_metadata_cache(make_app(ASGI_WORKERS=1))._journal is None
+    assert get_metadata_cache(make_app(ASGI_WORKERS=4))._journal is not None
+    assert get_metadata_cache(make_app(ASGI_WORKERS=4, METADATA_CACHE_BACKEND='local'))._journal is None
+
+
+def test_invalidation_reaches_other_worker_within_sync_interval(app, tmp_path):
+    path = str(tmp_path / 'journal.sqlite')
+    worker_a = MetadataCache(100, ttl=60, negative_ttl=5, journal=InvalidationJournal(path, 120), sync_interval=0.05)
+    worker_b = MetadataCache(100, ttl=60, negative_ttl=5, journal=InvalidationJournal(path, 120), sync_interval=0.05)
+    for cache in (worker_a, worker_b):
+        cache.set('file:1', {'permission': 'public'}, cache.generation)
+
+    with app.app_context():
+        worker_a.invalidate(['file:1']) # 한 워커에서 비공개로 바꿈
+        assert worker_a.get('file:1') is MISSING
+        assert worker_b.get('file:1') is not MISSING # 동기화 간격 전
+        time.sleep(0.06)
+        assert worker_b.get('file:1') is MISSING
@@ -0,0 +1,21 @@
+# tests/test_metrics.py
+
+
+def test_metrics_are_off_by_default(client):
+    assert client.get('/metrics').status_code == 404
+
+
+def test_metrics_token_is_checked(make_app):
+    client = make_app(METRICS_ENABLED=True, METRICS_AUTH_TOKEN='s3cret').test_client()
+    assert client.get('/metrics').status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer 비밀'}).status_code == 401
+    response = client.get('/metrics', headers={'Authorization': 'Bearer s3cret'})
+    assert response.status_code == 200 and b'http_requests_total' in response.data
+
+
+def test_metrics_without_token_stay_off_outside_development(make_app):
+    app = make_app(METRICS_ENABLED=True, METRICS_AUTH_TOKEN='', DEBUG=False, TESTING=False)
+    assert app.test_client().get('/metrics').status_code == 404
+    dev = make_app(METRICS_ENABLED=True, METRICS_AUTH_TOKEN='')
+    assert dev.test_client().get('/metrics').status_code == 200
@@ -0,0 +1,89 @@
+# tests/test_multipart.py
+import hashlib
+import os
+import sqlite3
+from app.core.database import get_db
+from app.core.streaming import concat_to_temp
+from app.multipart import routes
+
+
+def _start(client, headers, filename='big.zip'):
+    response = client.post('/api/multipart/uploads', json={'filename': filename}, headers=headers)
+    assert response.status_code == 201
+    return response.get_json()['upload_id']
+
+
+def _put_part(client, headers, upload_id, number, data):
+    return client.put(f'/api/multipart/uploads/{upload_id}/parts/{number}', data=data, headers=headers)
+
+
+def test_concat_to_temp_hashes_while_writing(tmp_path):
+    paths = []
+    for i, data in enumerate([b'a' * 1000, b'', b'bc' * 700]):
+        path = tmp_path / f'{i}.part'
+        path.write_bytes(data)
+        paths.append(str(path))
+    streamed = concat_to_temp(paths, str(tmp_path / 'out'), chunk_size=256)
+    expected = b'a' * 1000 + b'bc' * 700
+    assert streamed.size == len(expected)
+    assert streamed.sha256 == hashlib.sha256(expected).hexdigest()
+    with open(streamed.temp_path, 'rb') as f:
+        assert f.read() == expected
+
+
+def test_complete_joins_parts_in_order(make_app):
+    app = make_app(MULTIPART_MIN_PART_SIZE=1024)
+    client = app.test_client()
+    client.post('/api/auth/register', json={'username': 'alice', 'password': 'pass1234'})
+    response = client.post('/api/auth/login', json={'username': 'alice', 'password': 'pass1234'})
+    headers = {'Authorization': f"Bearer {response.get_json()['token']}"}
+
+    upload_id = _start(client, headers)
+    parts = [os.urandom(2048), os.urandom(2048), os.urandom(100)]
+    # 순서를 섞어 보내도 번호 순서대로 합쳐집니다.
+    for number in (3, 1, 2):
+        assert _put_part(client, headers, upload_id, number, parts[number - 1]).status_code == 200
+
+    response = client.post(f'/api/multipart/uploads/{upload_id}/complete', json={}, headers=headers)
+    assert response.status_code == 201, response.get_json()
+    body = response.get_json()
+    content = b''.join(parts)
+    assert body['filesize_bytes'] == len(content)
+    assert body['sha256'] == hashlib.sha256(content).hexdigest()
+    with app.app_context():
+        db = get_db()
+        assert db.execute("SELECT bytes_used FROM user_usage").fetchone()[0] == len(content)
+        assert db.execute("SELECT COUNT(*) FROM upload_parts").fetchone()[0] == 0
+
+    download = client.get(f"/api/files/{body['file_id']}/download", headers=headers)
+    assert download.status_code == 200
+    assert download.get_data() == content
+
+
+def test_part_rejected_after_status_change_during_upload(app, client, login, monkeypatch):
+    headers = login()
+    upload_id = _start(client, headers)
+    real_stream_to_temp = routes.stream_to_temp
+
+    def _stream_then_complete(*args, **kwargs):
+        # 파트를 받는 사이 다른 요청이 완료를 시작함
+        streamed = real_stream_to_temp(*args, **kwargs)
+        with sqlite3.connect(app.config['DATABASE']) as other:
+            other.execute("UPDATE multipart_uploads SET status = 'completing' WHERE upload_id = ?", (upload_id,))
+        return streamed
+
+    monkeypatch.setattr(routes, 'stream_to_temp', _stream_then_complete)
+    response = _put_part(client, headers, upload_id, 1, os.urandom(1000))
+    assert response.status_code == 409
+    with app.app_context():
+        assert get_db().execute("SELECT COUNT(*) FROM upload_parts").fetchone()[0] == 0
+        part_dir = routes.upload_dir_abs(upload_id)
+    assert os.listdir(part_dir) == []
+
+
+def test_part_rejected_after_abort(client, login):
+    headers = login()
+    upload_id = _start(client, headers)
+    assert _put_part(client, headers, upload_id, 1, b'x' * 10).status_code == 200
+    assert client.delete(f'/api/multipart/uploads/{upload_id}', headers=headers).status_code == 200
+    assert _put_part(client, headers, upload_id, 2, b'y' * 10).status_code == 404
@@ -0,0 +1,21 @@
+# tests/test_profiling.py
+import os
+
+
+def _profiles(app):
+    root = os.path.join(app.instance_path, 'profiles')
+    return [name for _, _, names in os.walk(root) for name in names]
+
+
+def test_profiling_header_token(make_app, tmp_path):
+    app = make_app(PROFILING_ENABLED=True, PROFILING_TOKEN='let-me-profile', PROFILING_MODE='cprofile')
+    app.instance_path = str(tmp_path / 'instance')
+    client = app.test_client()
+
+    assert client.get('/api/files', headers={'X-Profile-Request': 'wrong'}).status_code == 401
+    # ASCII가 아닌 헤더 값도 500 없이 불일치로 처리합니다.
+    assert client.get('/api/files', headers={'X-Profile-Request': 'é'}).status_code == 401
+    assert _profiles(app) == []
+
+    client.get('/api/files', headers={'X-Profile-Request': 'let-me-profile'})
+    assert len(_profiles(app)) == 1
@@ -0,0 +1,55 @@
+# tests/test_quota.py
+import os
+from app.core.database import get_db
+from app.core.quota import get_usage, reconcile_usage
+
+
+def _usage(app, username='alice'):
+    with app.app_context():
+        user_id = get_db().execute("SELECT id FROM users WHERE username = ?", (username,)).fetchone()[0]
+        return get_usage(get_db(), user_id)
+
+
+def test_default_quota_is_unlimited(app, login, upload):
+    headers = login()
+    assert upload(headers, 'a.zip', os.urandom(1000))[0] == 201
+    assert _usage(app)['quota_bytes'] is None
+
+
+def test_usage_follows_uploads_and_deletes(app, client, login, upload):
+    alice, bob = login(), login('bob')
+    data = os.urandom(3000)
+    _, first = upload(alice, 'a.zip', data)
+    upload(alice, 'b.zip', os.urandom(500))
+    upload(bob, 'c.zip', data) # 중복 제거된 내용도 각자의 사용량에 포함
+    assert (_usage(app)['bytes_used'], _usage(app)['file_count']) == (3500, 2)
+    assert _usage(app, 'bob')['bytes_used'] == 3000
+
+    assert client.delete(f"/api/files/{first['file_id']}", headers=alice).status_code == 200
+    assert (_usage(app)['bytes_used'], _usage(app)['file_count']) == (500, 1)
+    with app.app_context():
+        assert reconcile_usage() == [] # 증감 기록이 files 테이블과 일치
+
+
+def test_upload_over_quota_is_rejected(app, login, upload):
+    headers = login()
+    with app.app_context():
+        get_db().execute("UPDATE users SET quota_bytes = 4000 WHERE username = 'alice'")
+        get_db().commit()
+    assert upload(headers, 'a.zip', os.urandom(3000))[0] == 201
+    status, body = upload(headers, 'b.zip', os.urandom(3000))
+    assert status == 413 and body['quota_bytes'] == 4000
+    assert _usage(app)['bytes_used'] == 3000
+    with app.app_context():
+        assert get_db().execute("SELECT COUNT(*) FROM files").fetchone()[0] == 1
+
+
+def test_reconcile_fixes_drift(app, login, upload):
+    headers = login()
+    upload(headers, 'a.zip', os.urandom(1234))
+    with app.app_context():
+        get_db().execute("UPDATE user_usage SET bytes_used = 99, file_count = 7")
+        get_db().commit()
+        drifted = reconcile_usage()
+    assert [(d['expected_bytes'], d['expected_files']) for d in drifted] == [(1234, 1)]
+    assert _usage(app)['bytes_used'] == 1234
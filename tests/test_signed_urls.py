@@ -0,0 +1,94 @@
+# tests/test_signed_urls.py
+import base64
+import json
+import os
+import time
+import pytest
+from urllib.parse import urlsplit
+from app.core import signing
+from app.core.signing import SignatureError, SignatureExpired, sign_download, verify_download
+
+
+@pytest.fixture
+def owned(client, login, upload):
+    """(헤더, 파일 ID, download_link_id, 내용)을 돌려줍니다."""
+    headers = login()
+    data = os.urandom(5000)
+    status, body = upload(headers, 'report.zip', data)
+    assert status == 201
+    return headers, body['file_id'], body['download_link_id'], data
+
+
+def _signed_path(response):
+    assert response.status_code == 200, response.get_json()
+    return urlsplit(response.get_json()['url']).path
+
+
+def test_owner_signed_url_downloads_without_auth(client, owned):
+    headers, file_id, _, data = owned
+    path = _signed_path(client.post(f'/api/files/{file_id}/signed-url', headers=headers))
+    response = client.get(path)
+    assert response.status_code == 200 and response.data == data
+    ranged = client.get(path, headers={'Range': 'bytes=10-19'})
+    assert ranged.status_code == 206 and ranged.data == data[10:20]
+
+
+def test_tampered_tokens_are_rejected(app):
+    with app.app_context():
+        token, _ = sign_download('blobs/aa/bb/x', 'x.zip', 'hash', None, ttl=60)
+        payload, signature = token.split('.')
+        assert verify_download(token)['filepath'] == 'blobs/aa/bb/x'
+
+        claims = json.loads(base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4)))
+        claims['p'] = 'blobs/cc/dd/other'
+        forged = base64.urlsafe_b64encode(json.dumps(claims).encode()).rstrip(b'=').decode()
+        for bad in (f'{forged}.{signature}', f'{payload}.{signature[:-1]}A', payload, f'{payload}.',
+                    f'{payload}.{signature[:-1]}é', f'{payload}.\udcff'):
+            with pytest.raises(SignatureError):
+                verify_download(bad)
+
+
+def test_token_signed_with_other_secret_is_rejected(app, make_app):
+    with app.app_context():
+        token, _ = sign_download('blobs/aa/bb/x', 'x.zip', None, None, ttl=60)
+    other = make_app(SECRET_KEY='another-secret-key-' + 'y' * 32)
+    with other.app_context():
+        with pytest.raises(SignatureError):
+            verify_download(token)
+
+
+def test_expired_token(app, client, owned, monkeypatch):
+    headers, file_id, _, _ = owned
+    path = _signed_path(client.post(f'/api/files/{file_id}/signed-url?ttl=30', headers=headers))
+    assert client.get(path).status_code == 200
+    real_time = time.time
+    monkeypatch.setattr(signing.time, 'time', lambda: real_time() + 31)
+    assert client.get(path).status_code == 410
+    with app.app_context(), pytest.raises(SignatureExpired):
+        verify_download(path.rsplit('/', 1)[1])
+
+
+def test_invalid_tokens_over_http(client):
+    assert client.get('/api/signed/not-a-token').status_code == 403
+    assert client.get('/api/signed/abc.%C3%A9').status_code == 403 # ASCII가 아닌 서명
+
+
+def test_ttl_is_clamped_and_validated(client, owned, app):
+    headers, file_id, _, _ = owned
+    max_ttl = app.config['SIGNED_URL_MAX_TTL_SECONDS']
+    response = client.post(f'/api/files/{file_id}/signed-url?ttl={max_ttl * 10}', headers=headers)
+    assert response.get_json()['expires_in'] == max_ttl
+    assert client.post(f'/api/files/{file_id}/signed-url?ttl=0', headers=headers).status_code == 400
+    assert client.post(f'/api/files/{file_id}/signed-url?ttl=abc', headers=headers).status_code == 400
+
+
+def test_share_link_signing_checks_permission_once(client, owned):
+    headers, file_id, link_id, data = owned
+    assert client.post(f'/api/download/{link_id}/sign').status_code == 403 # 비공개
+
+    client.put(f'/api/files/{file_id}/permission', json={'permission': 'password', 'password': 'open-sesame'},
+               headers=headers)
+    assert client.post(f'/api/download/{link_id}/sign').status_code == 401
+    assert client.post(f'/api/download/{link_id}/sign', json={'password': 'wrong'}).status_code == 401
+    path = _signed_path(client.post(f'/api/download/{link_id}/sign', json={'password': 'open-sesame'}))
+    assert client.get(path).data == data
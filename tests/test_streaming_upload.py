@@ -0,0 +1,143 @@
+# tests/test_streaming_upload.py
+import asyncio
+import hashlib
+import io
+import json
+import os
+import pytest
+from app.core.asgi import ASGIAdapter
+from app.core.streaming import SpooledUpload, UploadTooLarge, commit_temp, stream_to_temp
+
+
+class _ReadOnly:
+    """readinto가 없는 스트림 (read만 지원)."""
+
+    def __init__(self, data: bytes):
+        self._buf = io.BytesIO(data)
+
+    def read(self, size=-1):
+        return self._buf.read(size)
+
+
+@pytest.mark.parametrize('wrap', [io.BytesIO, _ReadOnly])
+def test_stream_to_temp_hashes_while_writing(tmp_path, wrap):
+    data = os.urandom(300_000)
+    streamed = stream_to_temp(wrap(data), str(tmp_path), chunk_size=64 * 1024)
+    assert streamed.size == len(data)
+    assert streamed.sha256 == hashlib.sha256(data).hexdigest()
+    with open(streamed.temp_path, 'rb') as f:
+        assert f.read() == data
+
+    final_path = str(tmp_path / 'ab' / 'final.bin')
+    commit_temp(streamed.temp_path, final_path)
+    assert not os.path.exists(streamed.temp_path)
+    assert os.path.getsize(final_path) == len(data)
+
+
+def test_stream_to_temp_limit_removes_temp_file(tmp_path):
+    with pytest.raises(UploadTooLarge):
+        stream_to_temp(io.BytesIO(b'x' * 1000), str(tmp_path), chunk_size=100, max_bytes=999)
+    assert os.listdir(tmp_path) == []
+
+
+def test_stream_upload_round_trip(client, login, upload):
+    headers = login()
+    data = os.urandom(2 * 1024 * 1024 + 17)
+    status, body = upload(headers, 'blob.zip', data)
+    assert status == 201, body
+    assert body['sha256'] == hashlib.sha256(data).hexdigest()
+    assert body['filesize_bytes'] == len(data)
+
+    response = client.get(f"/api/files/{body['file_id']}/download", headers=headers)
+    assert response.status_code == 200
+    assert response.data == data
+
+
+def test_stream_upload_requires_filename(client, login):
+    response = client.post('/api/upload/stream', data=b'abc', headers=login())
+    assert response.status_code == 400
+
+
+def test_spooled_upload_is_adopted_without_copy(tmp_path):
+    data = os.urandom(5000)
+    spooled = SpooledUpload(str(tmp_path / 'spool'), spool_bytes=1024)
+    for i in range(0, len(data), 700):
+        spooled.write_chunk(data[i:i + 700])
+    spooled.finish()
+    streamed = stream_to_temp(io.BytesIO(b'unused'), str(tmp_path / 'target'), spooled=spooled)
+    assert streamed.size == len(data) and streamed.sha256 == hashlib.sha256(data).hexdigest()
+    assert os.path.dirname(streamed.temp_path) == str(tmp_path / 'target')
+    spooled.close() # 넘겨준 파일은 지우지 않음
+    with open(streamed.temp_path, 'rb') as f:
+        assert f.read() == data
+    assert os.listdir(tmp_path / 'spool') == []
+
+
+def test_spooled_upload_in_memory_and_cleanup(tmp_path):
+    small = SpooledUpload(str(tmp_path), spool_bytes=1024)
+    small.write_chunk(b'abc')
+    small.finish()
+    assert small.path is None and small.adopt(str(tmp_path)) is None
+    assert small.read() == b'abc'
+
+    large = SpooledUpload(str(tmp_path), spool_bytes=10)
+    large.write_chunk(b'x' * 100)
+    assert os.path.exists(large.path)
+    large.close()
+    assert os.listdir(tmp_path) == []
+
+
+def _asgi_request(app, method, path, body=b'', headers=(), chunk_size=64 * 1024):
+    adapter = ASGIAdapter(app)
+    messages = [{'type': 'http.request', 'body': body[i:i + chunk_size], 'more_body': i + chunk_size < len(body)}
+                for i in range(0, len(body), chunk_size)] or [{'type': 'http.request', 'body': b''}]
+    sent = []
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        await asyncio.sleep(3600) # 응답을 다 보낼 때까지 연결 유지
+
+    async def send(message):
+        sent.append(message)
+
+    path, _, query = path.partition('?')
+    scope = {'type': 'http', 'method': method, 'path': path, 'query_string': query.encode(),
+             'headers': [(b'content-length', str(len(body)).encode())] + [
+                 (name.lower().encode(), value.encode()) for name, value in headers]}
+    try:
+        asyncio.run(adapter(scope, receive, send))
+    finally:
+        adapter.executor.shutdown()
+        adapter.io_executor.shutdown()
+    status = sent[0]['status']
+    return status, b''.join(m.get('body', b'') for m in sent[1:])
+
+
+def test_asgi_buffered_upload_is_written_once(make_app, monkeypatch):
+    app = make_app(ASGI_BUFFER_UPLOADS=True, ASGI_UPLOAD_SPOOL_BYTES=64 * 1024)
+    client = app.test_client()
+    client.post('/api/auth/register', json={'username': 'alice', 'password': 'pass1234'})
+    token = client.post('/api/auth/login', json={'username': 'alice', 'password': 'pass1234'}).get_json()['token']
+
+    adopted = []
+    original_adopt = SpooledUpload.adopt
+
+    def _adopt(self, *args, **kwargs):
+        adopted.append(original_adopt(self, *args, **kwargs))
+        return adopted[-1]
+    monkeypatch.setattr(SpooledUpload, 'adopt', _adopt)
+
+    data = os.urandom(300_000)
+    status, body = _asgi_request(app, 'POST', '/api/upload/stream?filename=a.zip', data,
+                                 headers=[('Authorization', f'Bearer {token}')])
+    assert status == 201, body
+    assert json.loads(body)['sha256'] == hashlib.sha256(data).hexdigest()
+    # 어댑터가 받아 둔 파일을 그대로 넘겨받음 (다시 복사하지 않음)
+    assert len(adopted) == 1 and adopted[0] is not None and adopted[0].size == len(data)
+    leftovers = [name for name in os.listdir(app.config['UPLOAD_FOLDER']) if name.startswith('.upload-')]
+    assert leftovers == []
+
+    response = client.get(f"/api/files/{json.loads(body)['file_id']}/download",
+                          headers={'Authorization': f'Bearer {token}'})
+    assert response.data == data
@@ -0,0 +1,56 @@
+# tests/test_token_revocation.py
+import sqlite3
+import time
+import jwt
+from app.core.database import get_db
+from app.core.decorators import RevocationSet
+
+
+def _user_id(app, headers):
+    token = headers['Authorization'].split(' ')[1]
+    return jwt.decode(token, app.config['SECRET_KEY'], algorithms=['HS256'])['user_id']
+
+
+def _revoke_from_other_worker(app, key, expires_at=None):
+    """다른 워커 프로세스의 로그아웃 / 계정 삭제처럼 DB에만 기록합니다."""
+    with sqlite3.connect(app.config['DATABASE']) as other:
+        other.execute("INSERT OR REPLACE INTO revoked_tokens (key, expires_at) VALUES (?, ?)",
+                      (key, expires_at or time.time() + 3600))
+
+
+def test_logout_is_rejected_immediately_in_same_worker(make_app):
+    app = make_app(TOKEN_REVOCATION_SYNC_INTERVAL_MS=60_000)
+    client = app.test_client()
+    client.post('/api/auth/register', json={'username': 'alice', 'password': 'pass1234'})
+    token = client.post('/api/auth/login', json={'username': 'alice', 'password': 'pass1234'}).get_json()['token']
+    headers = {'Authorization': f'Bearer {token}'}
+    assert client.get('/api/files', headers=headers).status_code == 200
+    assert client.post('/api/auth/logout', headers=headers).status_code == 200
+    assert client.get('/api/files', headers=headers).status_code == 401
+
+
+def test_other_worker_revocation_applies_after_sync_interval(make_app):
+    app = make_app(TOKEN_REVOCATION_SYNC_INTERVAL_MS=50)
+    client = app.test_client()
+    client.post('/api/auth/register', json={'username': 'alice', 'password': 'pass1234'})
+    token = client.post('/api/auth/login', json={'username': 'alice', 'password': 'pass1234'}).get_json()['token']
+    headers = {'Authorization': f'Bearer {token}'}
+    assert client.get('/api/files', headers=headers).status_code == 200
+
+    _revoke_from_other_worker(app, f"user:{_user_id(app, headers)}")
+    time.sleep(0.06)
+    assert client.get('/api/files', headers=headers).status_code == 401
+
+
+def test_revocation_set_reads_only_new_rows_and_drops_expired(app):
+    with app.test_request_context():
+        _revoke_from_other_worker(app, 'expired', time.time() - 1)
+        _revoke_from_other_worker(app, 'old', time.time() + 3600)
+        revocations = RevocationSet(sync_interval=0)
+        assert revocations.is_revoked('old') and not revocations.is_revoked('expired')
+        assert 'expired' not in revocations._entries
+
+        get_db().execute("DELETE FROM revoked_tokens WHERE key = 'old'") # 이미 읽은 행은 다시 읽지 않음
+        get_db().commit()
+        _revoke_from_other_worker(app, 'new')
+        assert revocations.is_revoked('old') and revocations.is_revoked('new')